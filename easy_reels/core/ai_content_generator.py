@@ -1,9 +1,12 @@
 from groq import Groq
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Tuple
+import re
 import sys
 import json
 import os
+import time
 import base64
+import threading
 from pathlib import Path
 
 # Add project root to path
@@ -13,6 +16,9 @@ sys.path.insert(0, str(project_root))
 try:
     from easy_reels.core.config_manager import config
     from easy_reels.core.template_manager import TemplateManager
+    from easy_reels.core.ai_response_cache import ai_response_cache
+    from easy_reels.core.groq_retry import groq_retry, AIRequestError, AIEmptyReplyError
+    from easy_reels.core.groq_key_pool import groq_key_pool
 except ImportError as e:
     print(f"Import error: {e}")
     # Fallback imports
@@ -25,6 +31,106 @@ except ImportError as e:
 
 template_manager = None
 
+GROQ_MODEL = "llama-3.1-8b-instant"
+GROQ_TEMPERATURE = 0.7
+
+# Texts that mark a failed generation step, not content (API failures raise AIRequestError)
+ERROR_MESSAGES = [
+    'AI Title Generation Failed',
+    'Template not found or invalid',
+    'Groq client not configured',
+    'API Error',
+    'Generation Failed',
+    'generated_title',
+    'API returned'
+]
+
+COMBINED_PROMPT = """You will write two things for the same Instagram reel: a title and a caption.
+
+## Task 1 - "title"
+{title_prompt}
+
+## Task 2 - "caption"
+{caption_prompt}
+
+Reply with only a JSON object with exactly these two string fields, and no other text:
+{{"title": "<the title from Task 1>", "caption": "<the caption from Task 2, line breaks as \\n>"}}"""
+
+
+def is_error_reply(text: str) -> bool:
+    return any(err in text for err in ERROR_MESSAGES)
+
+
+def reply_content(chat_completion) -> str:
+    """Stripped text of a chat completion; AIEmptyReplyError (retried) when there is none."""
+    message = chat_completion.choices[0].message if chat_completion.choices else None
+    content = message.content if message else None
+    if not content or not content.strip():
+        raise AIEmptyReplyError("API returned no content")
+    return content.strip()
+
+
+def parse_combined_reply(content: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    (title, caption) from a combined JSON reply; each is None when missing or unusable.
+    Tolerates code fences and text around the object.
+    """
+    if not content or is_error_reply(content):
+        return None, None
+    text = re.sub(r"^```(?:json)?\s*|\s*```$", "", content.strip())
+    try:
+        data = json.loads(text, strict=False)
+    except ValueError:
+        match = re.search(r"\{.*\}", text, re.DOTALL)
+        if not match:
+            return None, None
+        try:
+            data = json.loads(match.group(0), strict=False)
+        except ValueError:
+            return None, None
+    if not isinstance(data, dict):
+        return None, None
+
+    title = data.get("title")
+    caption = data.get("caption")
+    title = title.strip().split("\n")[0].strip().strip('"').strip() if isinstance(title, str) else ""
+    caption = caption.strip() if isinstance(caption, str) else ""
+    return (title if title and not is_error_reply(title) else None,
+            caption if caption and not is_error_reply(caption) else None)
+
+
+def combined_reply_complete(content: str) -> bool:
+    """Whether a combined reply has both parts (only such replies are worth caching)."""
+    return all(parse_combined_reply(content))
+
+
+class GenerationMetrics:
+    """How often the combined request is used, and why it falls back to separate calls."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.stats = {"combined": 0, "combined_ok": 0, "caption_fallbacks": 0, "full_fallbacks": 0,
+                      "fallback_reasons": {}}
+
+    def record(self, outcome: str, reason: str = None):
+        with self.lock:
+            self.stats["combined"] += 1
+            self.stats[outcome] += 1
+            if reason:
+                reasons = self.stats["fallback_reasons"]
+                reasons[reason] = reasons.get(reason, 0) + 1
+
+    def get_stats(self) -> Dict:
+        with self.lock:
+            stats = dict(self.stats, fallback_reasons=dict(self.stats["fallback_reasons"]))
+        fallbacks = stats["caption_fallbacks"] + stats["full_fallbacks"]
+        stats["fallback_rate"] = fallbacks / stats["combined"] if stats["combined"] else 0.0
+        return stats
+
+
+# Shared by all generators
+generation_metrics = GenerationMetrics()
+
 # ============================================================================
 # API KEY MANAGER - MERGED INTO AI CONTENT GENERATOR
 # ============================================================================
@@ -81,7 +187,8 @@ class ApiKeyManager:
         # Default settings
         default_settings = {
             "last_used_key": "default" if "default" in self.api_keys else None,
-            "auto_validate": True
+            "auto_validate": True,
+            "pool_mode": False
         }
         self.save_settings(default_settings)
         return default_settings
@@ -204,6 +311,33 @@ class ApiKeyManager:
             return self.save_settings()
         return False
     
+    def is_pool_mode(self) -> bool:
+        """Whether requests are spread over all enabled keys instead of the current one."""
+        return bool(self.settings.get("pool_mode", False))
+    
+    def set_pool_mode(self, enabled: bool) -> bool:
+        self.settings["pool_mode"] = bool(enabled)
+        return self.save_settings()
+    
+    def set_key_enabled(self, key_id: str, enabled: bool) -> bool:
+        """Include or leave out a key in pool mode."""
+        if key_id not in self.api_keys:
+            return False
+        self.api_keys[key_id]["enabled"] = bool(enabled)
+        return self.save_keys()
+    
+    def get_pool_keys(self) -> Dict[str, Dict]:
+        """Keys requests may use: every enabled key in pool mode, else the current key."""
+        if self.is_pool_mode():
+            enabled = {key_id: data for key_id, data in self.api_keys.items()
+                       if data.get("enabled", True) and data.get("key")}
+            if enabled:
+                return enabled
+        current_id = self.settings.get("last_used_key")
+        if current_id in self.api_keys:
+            return {current_id: self.api_keys[current_id]}
+        return {}
+    
     def validate_key(self, api_key: str) -> bool:
         """Validate API key by making a test request."""
         try:
@@ -212,7 +346,7 @@ class ApiKeyManager:
             # Simple test request
             response = client.chat.completions.create(
                 messages=[{"role": "user", "content": "Hi"}],
-                model="llama-3.1-8b-instant",
+                model=GROQ_MODEL,
                 max_tokens=10
             )
             return True
@@ -226,6 +360,7 @@ class AIContentGenerator:
     
     def __init__(self, template_manager_instance: TemplateManager):
         self.client = None
+        self.api_key = None
         self.api_key_manager = ApiKeyManager()
         self.template_manager = template_manager_instance
         self.configure_groq()
@@ -255,15 +390,27 @@ class AIContentGenerator:
                     source = "environment"
             
             if selected_key:
-                self.client = Groq(api_key=selected_key)
+                # Retries are handled by groq_retry (typed errors, rate-limit headers, time budget)
+                self.client = Groq(api_key=selected_key, max_retries=0)
+                self.api_key = selected_key
                 print(f"✅ Groq API client configured from {source}")
                 
+                # Keys requests are sent with: all enabled keys in pool mode, else the selected one
+                pool_keys = self.api_key_manager.get_pool_keys() if self.api_key_manager else {}
+                if not (self.api_key_manager and self.api_key_manager.is_pool_mode()):
+                    pool_keys = {key_id: data for key_id, data in pool_keys.items() if data.get("key") == selected_key} \
+                        or {"selected": {"name": source, "key": selected_key}}
+                groq_key_pool.set_keys(pool_keys)
+                if len(pool_keys) > 1:
+                    print(f"🔑 Key pool: spreading requests over {len(pool_keys)} keys")
+                
                 # Log current API key info if using manager
                 if self.api_key_manager and not api_key:
                     key_info = self.api_key_manager.get_current_key_info()
                     if key_info:
                         print(f"🔑 Using API key: {key_info['name']}")
             else:
+                groq_key_pool.set_keys({})
                 print("❌ No GROQ API key found")
                 
         except Exception as e:
@@ -298,6 +445,24 @@ class AIContentGenerator:
         """Get current API key info."""
         return self.api_key_manager.get_current_key_info()
     
+    def set_pool_mode(self, enabled: bool) -> bool:
+        """Switch between the current key and the pool of enabled keys, and reconfigure."""
+        if self.api_key_manager.set_pool_mode(enabled):
+            self.configure_groq()
+            return True
+        return False
+    
+    def set_api_key_enabled(self, key_id: str, enabled: bool) -> bool:
+        """Include or leave out a key in pool mode, and reconfigure."""
+        if self.api_key_manager.set_key_enabled(key_id, enabled):
+            self.configure_groq()
+            return True
+        return False
+    
+    def get_key_usage(self) -> List[Dict]:
+        """Live per-key usage of the keys in use."""
+        return groq_key_pool.get_usage()
+    
     def get_api_key_status(self) -> Dict:
         """Get current API key status and information."""
         if self.api_key_manager:
@@ -309,7 +474,9 @@ class AIContentGenerator:
                     "key_id": key_info["id"],
                     "created_date": key_info.get("created_date", "Unknown"),
                     "has_client": bool(self.client),
-                    "total_keys": len(self.api_key_manager.get_key_names())
+                    "total_keys": len(self.api_key_manager.get_key_names()),
+                    "pool_mode": self.api_key_manager.is_pool_mode(),
+                    "pool_keys": len(groq_key_pool.get_usage())
                 }
             else:
                 return {
@@ -326,61 +493,78 @@ class AIContentGenerator:
             }
 
             
-    def _get_groq_completion(self, prompt: str) -> str:
-        if not self.client:
-            return "Groq client not configured."
+    def template_version(self, template_id: str = None) -> str:
+        """Id and last modification of the template a prompt comes from (part of the AI cache key)."""
+        if not self.template_manager:
+            return "legacy"
+        if template_id:
+            template = self.template_manager.get_template(template_id)
+        else:
+            # Resolved like the prompt builders do (this may select a fallback template)
+            template = self.get_current_template()
+            template_id = self.template_manager.settings.get("last_used_template")
+        if not template:
+            return "default"
+        return f"{template_id}:{template.get('modified_date') or template.get('created_date', '')}"
+
+    def completion_key(self, prompt: str, json_mode: bool = False, max_tokens: int = 1000,
+                       template_version: str = "") -> str:
+        """AI cache key of a request, shared by the sync and async clients."""
+        return ai_response_cache.key(GROQ_MODEL, GROQ_TEMPERATURE, prompt, template_version,
+                                     max_tokens=max_tokens, json_mode=json_mode)
+
+    def _get_groq_completion(self, prompt: str, json_mode: bool = False, max_tokens: int = 1000,
+                             template_version: str = "", bypass_cache: bool = False,
+                             cache_if=None) -> str:
+        """
+        Completion for a prompt, from the AI response cache when the same request was
+        answered before. `bypass_cache` sends it again (the new reply replaces the cached one).
+        With `cache_if`, only replies it accepts are cached (a cached one it rejects is dropped).
+        """
+        cache_key = self.completion_key(prompt, json_mode, max_tokens, template_version)
+        cached = ai_response_cache.get(cache_key, bypass=bypass_cache)
+        if cached is not None:
+            if cache_if is None or cache_if(cached):
+                print("♻️ Using cached AI response")
+                return cached
+            ai_response_cache.delete(cache_key)
+
+        started = time.perf_counter()
+        content = self._request_groq_completion(prompt, json_mode, max_tokens)
+        if cache_if is None or cache_if(content):
+            ai_response_cache.put(cache_key, content, time.perf_counter() - started)
+        return content
+
+    def _request_groq_completion(self, prompt: str, json_mode: bool = False, max_tokens: int = 1000) -> str:
+        """
+        Reply text of one completion request. Rate limits and transient errors are retried
+        within the request's time budget; a request that still fails raises AIRequestError.
+        """
+        print(f"🔍 Sending prompt to API: '{prompt[:100]}...'")
+        options = {"response_format": {"type": "json_object"}} if json_mode else {}
         
-        try:
-            print(f"🔍 Sending prompt to API: '{prompt[:100]}...'")
-            
-            chat_completion = self.client.chat.completions.create(
-                messages=[{"role": "user", "content": prompt}],
-                model="llama-3.1-8b-instant",  # Changed from "openai/gpt-oss-20b"
-                temperature=0.7,
-                max_tokens=1000
-            )
-            
-            print(f"🔍 Full API response structure exists: {bool(chat_completion.choices)}")
-            
-            # Check if choices exist
-            if not chat_completion.choices:
-                print("⚠️ WARNING: API returned no choices")
-                return "API returned no choices - using original caption"
-            
-            # Check if message exists
-            message = chat_completion.choices[0].message
-            if not message:
-                print("⚠️ WARNING: API returned no message")
-                return "API returned no message - using original caption"
-            
-            # Check content
-            content = message.content
-            print(f"🔍 Raw API response: '{content}'")
-            print(f"🔍 Response type: {type(content)}")
-            print(f"🔍 Response length: {len(content) if content else 'None'}")
-            
-            if content is None:
-                print("⚠️ WARNING: API returned None content")
-                return "API returned None content - check your API key and model"
-            elif content == "":
-                print("⚠️ WARNING: API returned empty string")
-                return "API returned empty content - try a different prompt"
-            else:
-                stripped_content = content.strip()
-                print(f"🔍 Stripped content: '{stripped_content}'")
-                print(f"🔍 Stripped length: {len(stripped_content)}")
-                
-                if stripped_content:
-                    return stripped_content
-                else:
-                    print("⚠️ WARNING: API returned only whitespace")
-                    return "API returned whitespace only - try a different prompt"
-                    
-        except Exception as e:
-            print(f"❌ Groq API error: {e}")
-            import traceback
-            print(f"❌ Full traceback: {traceback.format_exc()}")
-            return f"API Error: {e} - check your API key"
+        def request(timeout: float) -> str:
+            # Each attempt takes the best key of the pool (another one after a throttle)
+            key_id, _ = groq_key_pool.acquire()
+            try:
+                raw = groq_key_pool.client(key_id).chat.completions.with_raw_response.create(
+                    messages=[{"role": "user", "content": prompt}],
+                    model=GROQ_MODEL,
+                    temperature=GROQ_TEMPERATURE,
+                    max_tokens=max_tokens,
+                    timeout=timeout,
+                    **options
+                )
+                chat_completion = raw.parse()
+            except Exception as e:
+                raise groq_key_pool.failed(key_id, e) from e
+            groq_key_pool.succeeded(key_id, raw.headers, chat_completion)
+            return reply_content(chat_completion)
+        
+        content = groq_retry.call(request)
+        print(f"🔍 Raw API response: '{content}'")
+        print(f"🔍 Response length: {len(content)}")
+        return content
             
     def get_current_template(self) -> Dict:
         """Get the current template or fallback to default."""
@@ -414,7 +598,8 @@ class AIContentGenerator:
 # Keep it engaging and relatable."""
         }
         
-    def generate_title(self, original_caption: str, ocr_text: str = "", template_id: str = None) -> str:
+    def generate_title(self, original_caption: str, ocr_text: str = "", template_id: str = None,
+                       bypass_cache: bool = False) -> str:
         try:
             if not original_caption or not original_caption.strip():
                 original_caption = "No caption provided."
@@ -437,18 +622,22 @@ class AIContentGenerator:
                 prompt = template['title_prompt'].format(original_caption=original_caption)
             
             print(f"🔍 Sending title prompt to API...")
-            title = self._get_groq_completion(prompt)
+            title = self._get_groq_completion(prompt, template_version=self.template_version(template_id),
+                                              bypass_cache=bypass_cache)
             print(f"🔍 Received title: '{title}'")
             
             return title.split('\n')[0].strip()
             
+        except AIRequestError:
+            raise
         except Exception as e:
             print(f"❌ Title generation error: {e}")
             import traceback
             print(traceback.format_exc())
             return f"Generation Failed: {str(e)}"
 
-    def generate_caption(self, original_caption: str, ocr_text: str = "", generated_title: str = "", template_id: str = None) -> str:
+    def generate_caption(self, original_caption: str, ocr_text: str = "", generated_title: str = "", template_id: str = None,
+                         bypass_cache: bool = False) -> str:
         """Generate caption using original caption, OCR text, and the newly generated title."""
         if not original_caption or not original_caption.strip():
             original_caption = "No caption provided."
@@ -482,40 +671,110 @@ class AIContentGenerator:
             prompt = template['caption_prompt'].format(original_caption=original_caption)
 
         try:
-            return self._get_groq_completion(prompt)
+            return self._get_groq_completion(prompt, template_version=self.template_version(template_id),
+                                             bypass_cache=bypass_cache)
+        except AIRequestError:
+            raise
         except Exception as e:
             print(f"❌ Caption generation error: {e}")
             return f"AI Caption Generation Failed. Original Caption:\n\n{original_caption}"
 
-    def generate_complete_content(self, original_caption: str, ocr_text: str = "", template_id: str = None) -> Dict:
+    def build_combined_prompt(self, original_caption: str, ocr_text: str = "", template_id: str = None) -> Optional[str]:
+        """The template's title and caption instructions as one JSON request (None if the template lacks one)."""
+        if not original_caption or not original_caption.strip():
+            original_caption = "No caption provided."
+        if not ocr_text or not ocr_text.strip():
+            ocr_text = "No text detected in video"
+
+        template = self.template_manager.get_template(template_id) if template_id and self.template_manager else self.get_current_template()
+        if not template or 'title_prompt' not in template or 'caption_prompt' not in template:
+            generation_metrics.record("full_fallbacks", "template")
+            return None
+
+        values = {
+            '{original_caption}': original_caption,
+            '{ocr_text}': ocr_text,
+            '{generated_title}': 'the title you write in Task 1'
+        }
+        parts = {}
+        for name in ('title_prompt', 'caption_prompt'):
+            part = template[name]
+            for placeholder, value in values.items():
+                part = part.replace(placeholder, value)
+            parts[name] = part.strip()
+        return COMBINED_PROMPT.format(**parts)
+
+    def accept_combined_reply(self, reply: str) -> Tuple[Optional[str], Optional[str]]:
+        """(title, caption) of a combined reply, None for a part that must be generated separately."""
+        title, caption = parse_combined_reply(reply)
+
+        if title and caption:
+            generation_metrics.record("combined_ok")
+        elif title:
+            generation_metrics.record("caption_fallbacks", "caption_missing")
+        else:
+            generation_metrics.record("full_fallbacks", "unparseable")
+            caption = None
+        if not (title and caption):
+            stats = generation_metrics.get_stats()
+            print(f"⚠️ Combined reply unusable, generating {'caption' if title else 'title and caption'} "
+                  f"separately (fallback rate {stats['fallback_rate']:.0%} of {stats['combined']})")
+        return title, caption
+
+    def generate_combined(self, original_caption: str, ocr_text: str = "", template_id: str = None,
+                          bypass_cache: bool = False) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Title and caption from one request: the template's title and caption instructions
+        are sent together and the model replies with a JSON object. Returns
+        (title, caption); None for a part that must be generated separately.
+        """
+        prompt = self.build_combined_prompt(original_caption, ocr_text, template_id)
+        if prompt is None:
+            return None, None
+        print(f"🔍 Sending combined title + caption prompt to API...")
+        reply = self._get_groq_completion(prompt, json_mode=True, max_tokens=1200,
+                                          template_version=self.template_version(template_id),
+                                          bypass_cache=bypass_cache, cache_if=combined_reply_complete)
+        return self.accept_combined_reply(reply)
+
+    def generate_complete_content(self, original_caption: str, ocr_text: str = "", template_id: str = None,
+                                  combined: bool = None, combined_reply: Tuple = None,
+                                  bypass_cache: bool = False) -> Dict:
+        """
+        Title and caption for a reel. With `combined` (default: AI_COMBINED_REQUEST) both
+        come from one JSON request; the two-call path (title, then caption given the
+        title) is used when that reply cannot be parsed. `combined_reply` is the
+        (title, caption) of a combined request already sent elsewhere (async path).
+        `bypass_cache` asks the API again instead of reusing cached replies (regenerate).
+        """
         current_template = template_id or (self.template_manager.settings.get("last_used_template") if self.template_manager else None)
         print(f"🎨 Generating content with template: {current_template or 'default'}")
         
-        # Generate title with validation
-        title = self.generate_title(original_caption, ocr_text, template_id)
-        print(f"🔍 Raw title generated: '{title}'")
-        print(f"🔍 Title length: {len(title)}")
-        print(f"🔍 Title is empty: {not title}")
-        print(f"🔍 Original caption: '{original_caption[:100]}'")
-        print(f"🔍 OCR text: '{ocr_text[:100] if ocr_text else 'None'}'")
+        if combined_reply is not None:
+            combined = True
+            title, caption = combined_reply
+        else:
+            if combined is None:
+                combined = config.ai_combined_request
+            title, caption = self.generate_combined(original_caption, ocr_text, template_id,
+                                                    bypass_cache) if combined else (None, None)
+        request_mode = "combined" if title and caption else ("fallback" if combined else "separate")
         
-        # Validate title - reject error messages
-        error_messages = [
-            'AI Title Generation Failed',
-            'Template not found or invalid',
-            'Groq client not configured',
-            'API Error',
-            'Generation Failed',  # Add this
-            'generated_title',
-            ''
-        ]
+        if title is None:
+            # Generate title with validation
+            title = self.generate_title(original_caption, ocr_text, template_id, bypass_cache=bypass_cache)
+            print(f"🔍 Raw title generated: '{title}'")
+            print(f"🔍 Title length: {len(title)}")
+            print(f"🔍 Title is empty: {not title}")
+            print(f"🔍 Original caption: '{original_caption[:100]}'")
+            print(f"🔍 OCR text: '{ocr_text[:100] if ocr_text else 'None'}'")
         
-        # Check each error message individually
-        triggered_errors = [err for err in error_messages if err and err in title]
+        # Validate title - reject error messages
+        triggered_errors = [err for err in ERROR_MESSAGES if err in title]
         if triggered_errors:
             print(f"⚠️ Title contained error keywords: {triggered_errors}")
         
-        if not title or not title.strip() or any(err in title for err in error_messages if err):
+        if not title or not title.strip() or triggered_errors:
             print('⚠️ Title generation failed, extracting fallback from caption')
             # Extract first sentence from original caption as fallback
             if original_caption and original_caption.strip():
@@ -529,14 +788,17 @@ class AIContentGenerator:
             print(f"📝 Using fallback title: '{title}'")
         
         # Pass validated title to caption generator
-        caption = self.generate_caption(original_caption, ocr_text, generated_title=title, template_id=template_id)
+        if caption is None:
+            caption = self.generate_caption(original_caption, ocr_text, generated_title=title, template_id=template_id,
+                                            bypass_cache=bypass_cache)
         
         return {
             'title': title,
             'caption': caption,
             'template_used': current_template,
             'original_caption': original_caption,
-            'ocr_text': ocr_text
+            'ocr_text': ocr_text,
+            'request_mode': request_mode
         }
                 
     def preview_template(self, template_id: str, sample_caption: str) -> Dict:
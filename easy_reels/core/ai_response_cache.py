@@ -0,0 +1,118 @@
+"""
+Disk cache of AI completions.
+
+Re-running a batch or regenerating a reel sends the same prompts to Groq again. A
+completion is kept in SQLite under a hash of everything that determines it: model,
+temperature, request options, the rendered prompt and the version of the template it
+came from. Entries expire after AI_CACHE_TTL_HOURS, and the least recently used ones
+are evicted beyond AI_CACHE_MAX_ENTRIES. Error replies are never cached.
+
+Each entry keeps the latency of the request that produced it, so a hit also counts
+the time it saved.
+"""
+
+import json
+import time
+import hashlib
+from typing import Dict, Optional
+
+from .config_manager import config
+from .sqlite_store import SQLiteStore, trim
+
+STAT_KEYS = ("hits", "misses", "bypassed", "saved_seconds")
+
+
+class AIResponseCache:
+    """Completion text by request hash, in SQLite so it is shared across runs and processes."""
+
+    def __init__(self, db_path: str = "temp/ai_responses.sqlite3"):
+        self.db = SQLiteStore(db_path, self.setup)
+        self.lock = self.db.lock
+        self.stats = {"hits": 0, "misses": 0, "bypassed": 0, "saved_seconds": 0.0}
+
+    @staticmethod
+    def setup(conn):
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS ai_responses (
+                request_key TEXT PRIMARY KEY,
+                response TEXT,
+                latency REAL,
+                created REAL,
+                last_used REAL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS ai_responses_last_used ON ai_responses (last_used)")
+
+    @staticmethod
+    def key(model: str, temperature: float, prompt: str, template_version: str = "", **options) -> str:
+        """Hash of a request; `options` are the other request arguments (max_tokens, response_format...)."""
+        payload = json.dumps([model, temperature, template_version or "", prompt, options], sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, request_key: str, bypass: bool = False) -> Optional[str]:
+        """Cached completion for a request, or None. `bypass` forces a fresh request (counted as such)."""
+        if bypass or not config.ai_cache_enabled:
+            with self.lock:
+                self.stats["bypassed" if bypass else "misses"] += 1
+            return None
+        now = time.time()
+        with self.db.transaction() as conn:
+            row = conn.execute("SELECT response, latency, created FROM ai_responses WHERE request_key = ?",
+                               (request_key,)).fetchone()
+            if row and now - row[2] > config.ai_cache_ttl_hours * 3600:
+                conn.execute("DELETE FROM ai_responses WHERE request_key = ?", (request_key,))
+                row = None
+            if row:
+                conn.execute("UPDATE ai_responses SET last_used = ? WHERE request_key = ?", (now, request_key))
+                self.stats["hits"] += 1
+                self.stats["saved_seconds"] += row[1] or 0.0
+            else:
+                self.stats["misses"] += 1
+        return row[0] if row else None
+
+    def put(self, request_key: str, response: str, latency: float):
+        """Store a completion, then drop expired entries and trim to the size limit."""
+        if not config.ai_cache_enabled:
+            return
+        now = time.time()
+        with self.db.transaction() as conn:
+            conn.execute("INSERT OR REPLACE INTO ai_responses (request_key, response, latency, created, last_used) "
+                         "VALUES (?, ?, ?, ?, ?)", (request_key, response, latency, now, now))
+            trim(conn, "ai_responses", "request_key", config.ai_cache_ttl_hours * 3600, config.ai_cache_max_entries)
+
+    def delete(self, request_key: str):
+        with self.db.transaction() as conn:
+            conn.execute("DELETE FROM ai_responses WHERE request_key = ?", (request_key,))
+
+    def clear(self):
+        with self.db.transaction() as conn:
+            conn.execute("DELETE FROM ai_responses")
+
+    def get_stats(self, since: Dict = None) -> Dict:
+        """
+        Hit/miss counts, hit rate and seconds saved; with `since` (an earlier get_stats())
+        only what happened after it, e.g. during one batch.
+        """
+        with self.db.transaction() as conn:
+            entries = conn.execute("SELECT COUNT(*) FROM ai_responses").fetchone()[0]
+            stats = dict(self.stats)
+        if since:
+            for name in STAT_KEYS:
+                stats[name] -= since.get(name, 0)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        stats["entries"] = entries
+        return stats
+
+
+def describe_cache_stats(stats: Dict) -> str:
+    """One-line summary for batch logs."""
+    text = (f"AI cache: {stats['hits']}/{stats['hits'] + stats['misses']} hits ({stats['hit_rate']:.0%}), "
+            f"saved {stats['saved_seconds']:.1f}s")
+    if stats.get("bypassed"):
+        text += f", {stats['bypassed']} bypassed"
+    return text
+
+
+# Global AI response cache instance
+ai_response_cache = AIResponseCache()
@@ -0,0 +1,218 @@
+"""
+Concurrent AI generation on Groq's async client.
+
+Batch jobs submit their generation request as soon as their download is ready. An
+asyncio loop in a background thread keeps up to `concurrency` requests in flight
+(AI_CONCURRENCY) while the batch thread goes on rendering. Each result is kept by job
+key with its latency: the time spent waiting for a free slot, the time of the API
+request itself and the time until the content was ready.
+
+The combined title + caption request goes through the async client, or is answered
+from the AI response cache under the same key the synchronous client uses. Validating
+the reply - and the rare two-call fallback - reuse AIContentGenerator's synchronous
+path in a worker thread, so both paths produce the same content.
+"""
+
+import asyncio
+import inspect
+import functools
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, Hashable, Optional
+
+from groq import AsyncGroq
+
+from .config_manager import config
+from .ai_content_generator import GROQ_MODEL, GROQ_TEMPERATURE, reply_content, combined_reply_complete
+from .ai_response_cache import ai_response_cache
+from .groq_retry import groq_retry
+from .groq_key_pool import groq_key_pool
+
+
+class AsyncGenerationQueue:
+    """
+    AI content for many jobs at once, at most `concurrency` requests in flight.
+    `bypass_cache` requests fresh replies instead of cached ones.
+    """
+
+    def __init__(self, generator, concurrency: int = None, bypass_cache: bool = False):
+        self.generator = generator
+        self.bypass_cache = bypass_cache
+        self.concurrency = max(1, concurrency or config.ai_concurrency)
+        self.lock = threading.Lock()
+        self.futures: Dict[Hashable, Future] = {}
+        self.results: Dict[Hashable, Dict] = {}
+        self.stats = {"submitted": 0, "completed": 0, "failed": 0, "in_flight": 0, "max_in_flight": 0}
+
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True, name="ai-generation")
+        self.thread.start()
+        # Loop-bound objects are created on the loop itself
+        asyncio.run_coroutine_threadsafe(self._setup(), self.loop).result()
+
+    async def _setup(self):
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+        self.clients: Dict[str, tuple] = {}  # pool key id -> (api key, client bound to this loop)
+
+    def _client(self, key_id: str, api_key: str) -> AsyncGroq:
+        known_key, client = self.clients.get(key_id, (None, None))
+        if client is None or known_key != api_key:
+            if client is not None:
+                asyncio.ensure_future(client.close())  # the key was changed in the manager
+            client = AsyncGroq(api_key=api_key, max_retries=0)
+            self.clients[key_id] = (api_key, client)
+        return client
+
+    def submit(self, key: Hashable, original_caption: str, ocr_text: str = "", template_id: str = None) -> Future:
+        """
+        Start generating content for `key` (a job index, a template id...). Returns a
+        future of the result record; submitting a key again returns the same future.
+        """
+        with self.lock:
+            if key in self.futures:
+                return self.futures[key]
+            self.stats["submitted"] += 1
+            future = asyncio.run_coroutine_threadsafe(
+                self._generate(key, original_caption or "", ocr_text or "", template_id), self.loop
+            )
+            self.futures[key] = future
+        return future
+
+    def result(self, key: Hashable, timeout: float = None) -> Optional[Dict]:
+        """The result record for `key`, waiting for it (None if it was never submitted)."""
+        with self.lock:
+            future = self.futures.get(key)
+        return future.result(timeout) if future is not None else None
+
+    def generate_all(self, items: Dict[Hashable, Dict]) -> Dict[Hashable, Dict]:
+        """
+        Generate for every {key: {'original_caption', 'ocr_text', 'template_id'}} at once
+        and return {key: result record}.
+        """
+        futures = {key: self.submit(key, item.get('original_caption', ''), item.get('ocr_text', ''),
+                                    item.get('template_id'))
+                   for key, item in items.items()}
+        return {key: future.result() for key, future in futures.items()}
+
+    async def _generate(self, key, original_caption: str, ocr_text: str, template_id: str) -> Dict:
+        record = {'key': key, 'ai_content': None, 'error': None, 'cached': False,
+                  'queued': 0.0, 'api_latency': None, 'latency': 0.0}
+        submitted = time.perf_counter()
+        async with self.semaphore:
+            started = time.perf_counter()
+            record['queued'] = started - submitted
+            self._track(+1)
+            try:
+                combined_reply = None
+                if groq_key_pool.has_keys() and config.ai_combined_request:
+                    prompt = self.generator.build_combined_prompt(original_caption, ocr_text, template_id)
+                    combined_reply = (None, None)
+                    if prompt:
+                        reply = await self._cached_complete(prompt, template_id, record)
+                        combined_reply = self.generator.accept_combined_reply(reply)
+                # Validation (and any fallback calls) on the generator's synchronous path
+                record['ai_content'] = await asyncio.get_running_loop().run_in_executor(None, functools.partial(
+                    self.generator.generate_complete_content, original_caption, ocr_text, template_id,
+                    combined_reply=combined_reply, bypass_cache=self.bypass_cache
+                ))
+            except Exception as e:
+                record['error'] = str(e)
+            finally:
+                record['latency'] = time.perf_counter() - started
+                self._track(-1, failed=record['error'] is not None)
+        with self.lock:
+            self.results[key] = record
+        return record
+
+    async def _cached_complete(self, prompt: str, template_id: str, record: Dict) -> str:
+        """
+        The combined reply from the AI response cache, else from the API. Only replies with
+        both a title and a caption are cached, so an unusable one is asked for again next run.
+        """
+        cache_key = self.generator.completion_key(prompt, json_mode=True, max_tokens=1200,
+                                                  template_version=self.generator.template_version(template_id))
+        loop = asyncio.get_running_loop()
+        cached = await loop.run_in_executor(None, ai_response_cache.get, cache_key, self.bypass_cache)
+        if cached is not None:
+            if combined_reply_complete(cached):
+                record['cached'] = True
+                return cached
+            await loop.run_in_executor(None, ai_response_cache.delete, cache_key)
+        reply = await self._complete(prompt, record)
+        if combined_reply_complete(reply):
+            await loop.run_in_executor(None, ai_response_cache.put, cache_key, reply, record['api_latency'])
+        return reply
+
+    async def _complete(self, prompt: str, record: Dict) -> str:
+        """
+        Reply text of the combined JSON request, retried like the sync path (rate limits,
+        transient errors, time budget); raises AIRequestError when it fails for good.
+        """
+        async def request(timeout: float) -> str:
+            # Each attempt takes the best key of the pool (another one after a throttle)
+            key_id, api_key = groq_key_pool.acquire()
+            try:
+                raw = await self._client(key_id, api_key).chat.completions.with_raw_response.create(
+                    messages=[{"role": "user", "content": prompt}],
+                    model=GROQ_MODEL,
+                    temperature=GROQ_TEMPERATURE,
+                    max_tokens=1200,
+                    response_format={"type": "json_object"},
+                    timeout=timeout
+                )
+                response = raw.parse()
+                if inspect.isawaitable(response):
+                    response = await response
+            except Exception as e:
+                raise groq_key_pool.failed(key_id, e) from e
+            groq_key_pool.succeeded(key_id, raw.headers, response)
+            return reply_content(response)
+
+        started = time.perf_counter()
+        try:
+            return await groq_retry.call_async(request, label="Groq async request")
+        finally:
+            record['api_latency'] = time.perf_counter() - started
+
+    def _track(self, delta: int, failed: bool = False):
+        with self.lock:
+            self.stats["in_flight"] += delta
+            self.stats["max_in_flight"] = max(self.stats["max_in_flight"], self.stats["in_flight"])
+            if delta < 0:
+                self.stats["completed"] += 1
+                self.stats["failed"] += int(failed)
+
+    def get_stats(self) -> Dict:
+        """Counts and latency percentiles (seconds) of the finished requests."""
+        with self.lock:
+            stats = dict(self.stats)
+            latencies = sorted(record['latency'] for record in self.results.values())
+            stats["cached"] = sum(1 for record in self.results.values() if record['cached'])
+        if latencies:
+            stats["latency_p50"] = latencies[len(latencies) // 2]
+            stats["latency_p95"] = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+            stats["latency_max"] = latencies[-1]
+        return stats
+
+    def close(self):
+        """Cancel requests that have not finished and stop the loop thread."""
+        with self.lock:
+            pending = [future for future in self.futures.values() if not future.done()]
+        for future in pending:
+            future.cancel()
+        for _, client in list(self.clients.values()):
+            try:
+                asyncio.run_coroutine_threadsafe(client.close(), self.loop).result(timeout=5)
+            except Exception:
+                pass
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=5)
+        if not self.thread.is_alive():
+            self.loop.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,419 @@
+"""
+Two-phase batch pipeline.
+
+Phase one (prepare) downloads, probes, OCRs and generates AI content for every URL
+concurrently, so titles and captions can be reviewed before any rendering happens.
+AI requests go out on the async generation queue as soon as each download is ready,
+so they do not hold a download worker.
+Phase two (render) encodes only the approved jobs on a pool of render processes.
+
+With `skip_duplicates`, every download is fingerprinted before AI generation: a
+repost of an already rendered reel (or of an earlier URL in the same batch) is
+flagged as 'duplicate' for the review table instead of being prepared.
+"""
+
+import os
+import re
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, CancelledError, as_completed, wait, FIRST_COMPLETED
+from typing import Callable, Dict, List
+
+from .async_generation import AsyncGenerationQueue
+from .config_manager import config
+from .instagram_downloader import InstagramDownloader
+from .media_store import media_store
+from .video_processor import VideoProcessor, probe_video, detect_crop_dimensions, create_title_image, plan_trim
+from .video_fingerprint import (
+    FingerprintIndex, get_fingerprint, check_duplicate, describe_duplicate, record_rendered
+)
+
+
+def render_job(input_path: str, ai_content: dict, options: dict, branding_assets: dict = None) -> str:
+    """Render one approved job. Runs inside a render pool process."""
+    processor = VideoProcessor()
+    return processor.process_video(
+        input_path,
+        ai_content,
+        branding_assets=branding_assets,
+        options=options
+    )
+
+
+class BatchPipeline:
+    """Runs the cheap steps for a whole batch first, and the expensive render only for approved jobs."""
+
+    def __init__(self,
+                 ai_generator,
+                 prepare_workers: int = 4,
+                 render_workers: int = 2,
+                 log_callback: Callable[[str], None] = None,
+                 stop_event: threading.Event = None,
+                 skip_duplicates: bool = False):
+        self.ai_generator = ai_generator
+        self.skip_duplicates = skip_duplicates
+        # Fingerprints of the current run, so a repost later in the same list is caught
+        self.run_index = FingerprintIndex(path=None)
+        self.prepare_workers = max(1, prepare_workers)
+        self.render_workers = max(1, render_workers)
+        self.log = log_callback or print
+        self.stop_event = stop_event or threading.Event()
+
+    def fingerprint(self, key: str, video_path: str):
+        """
+        (fingerprint, duplicate) for a download. The fingerprint is always computed (it
+        is recorded once the reel is rendered); duplicates are only looked up when
+        `skip_duplicates` is on.
+        """
+        try:
+            if not self.skip_duplicates:
+                return get_fingerprint(video_path), None
+            return check_duplicate(video_path, key, self.run_index)
+        except Exception as e:
+            self.log(f"⚠️ Fingerprinting {key[:50]} failed: {e}")
+            return [], None
+
+    def release_claim(self, job: Dict):
+        """Give up a failed job's place in the run index, so a repost of it later in the run is not skipped."""
+        if job.pop('claimed', False):
+            self.run_index.release(job['url'])
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # PHASE ONE: DOWNLOAD, PROBE, OCR, AI
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    def prepare_job(self, index: int, url: str, generate_title: bool = True, generate_ai: bool = True) -> Dict:
+        """
+        Download, probe, OCR and generate AI content for one URL. A near-duplicate is
+        returned as 'duplicate' before any AI content is generated. Without `generate_ai`
+        the job is returned as 'generating' for the caller to submit its AI request.
+        """
+        job = {
+            'index': index,
+            'url': url,
+            'status': 'pending',
+            'approved': False,
+            'video_path': None,
+            'error': None
+        }
+
+        try:
+            if self.stop_event.is_set():
+                job['status'] = 'skipped'
+                return job
+
+            metadata = InstagramDownloader().download_reel(url)
+            job['video_path'] = metadata['video_path']
+            job['original_caption'] = metadata['original_caption']
+            job['ocr_text'] = metadata['original_title']
+            job['probe'] = media_store.cached_artefact(
+                job['video_path'], 'probe', lambda: probe_video(job['video_path'])
+            )
+            job['generate_title'] = generate_title
+
+            job['fingerprint'], duplicate = self.fingerprint(url, job['video_path'])
+            if duplicate:
+                job['status'] = 'duplicate'
+                job['duplicate_of'] = duplicate
+                job['error'] = describe_duplicate(duplicate)
+                return job
+            job['claimed'] = self.skip_duplicates and bool(job['fingerprint'])
+
+            if self.stop_event.is_set():
+                job['status'] = 'skipped'
+                return job
+
+            if not generate_ai:
+                job['status'] = 'generating'
+                return job
+
+            ai_content = self.ai_generator.generate_complete_content(
+                job['original_caption'], ocr_text=job['ocr_text']
+            )
+            if not generate_title:
+                ai_content['title'] = ""
+            job['ai_content'] = ai_content
+
+            job['status'] = 'ready'
+            job['approved'] = True
+
+        except Exception as e:
+            job['status'] = 'failed'
+            job['error'] = str(e)
+            self.release_claim(job)
+
+        return job
+
+    def apply_ai_result(self, job: Dict, record: Dict) -> bool:
+        """Store an async generation result on the job (or mark it failed). Returns success."""
+        if record is None or record.get('error') or not record.get('ai_content'):
+            job['status'] = 'failed'
+            job['error'] = (record or {}).get('error') or "AI generation failed"
+            return False
+        ai_content = record['ai_content']
+        if not job.get('generate_title', True):
+            ai_content['title'] = ""
+        job['ai_content'] = ai_content
+        job['ai_latency'] = record['latency']
+        return True
+
+    def log_ai_stats(self, ai_queue: AsyncGenerationQueue):
+        stats = ai_queue.get_stats()
+        if stats.get('completed'):
+            self.log(f"🤖 AI: {stats['completed']} requests ({stats['cached']} from cache), up to "
+                     f"{stats['max_in_flight']} in flight, latency p50 {stats['latency_p50']:.1f}s "
+                     f"p95 {stats['latency_p95']:.1f}s")
+
+    def prepare_all(self,
+                    urls: List[str],
+                    generate_title: bool = True,
+                    on_job_ready: Callable[[Dict], None] = None) -> List[Dict]:
+        """Run phase one for every URL concurrently. Jobs are returned in submission order."""
+        self.log(f"🔄 Phase 1: preparing {len(urls)} URLs ({self.prepare_workers} workers)...")
+        jobs = []
+        self.run_index = FingerprintIndex(path=None)
+
+        with AsyncGenerationQueue(self.ai_generator) as ai_queue, \
+                ThreadPoolExecutor(max_workers=self.prepare_workers) as executor:
+            # Download futures map to None, AI futures to their job
+            pending = {
+                executor.submit(self.prepare_job, index, url, generate_title, False): None
+                for index, url in enumerate(urls)
+            }
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    job = pending.pop(future)
+                    if job is None:
+                        job = future.result()
+                        if job['status'] == 'generating':
+                            pending[ai_queue.submit(job['index'], job['original_caption'], job['ocr_text'])] = job
+                            continue
+                    else:
+                        try:
+                            record = future.result()
+                        except CancelledError:
+                            record = {'error': "Stopped"}
+                        if self.apply_ai_result(job, record):
+                            job['status'] = 'ready'
+                            job['approved'] = True
+                        else:
+                            self.release_claim(job)
+                    self.report_prepared(job, on_job_ready)
+                    jobs.append(job)
+            self.log_ai_stats(ai_queue)
+
+        jobs.sort(key=lambda j: j['index'])
+        return jobs
+
+    def report_prepared(self, job: Dict, on_job_ready: Callable[[Dict], None] = None):
+        if job['status'] == 'ready':
+            self.log(f"✅ Prepared URL {job['index'] + 1}: {job['ai_content'].get('title', '')[:60]}")
+        elif job['status'] == 'failed':
+            self.log(f"❌ Preparing URL {job['index'] + 1} failed: {job['error']}")
+        elif job['status'] == 'duplicate':
+            self.log(f"🔁 URL {job['index'] + 1} flagged: {job['error']}")
+        if on_job_ready:
+            on_job_ready(job)
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # PHASE TWO: RENDER APPROVED JOBS
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    def render_approved(self,
+                        jobs: List[Dict],
+                        options: Dict,
+                        assign_output: Callable[[Dict], str],
+                        branding_assets: Dict = None,
+                        on_job_rendered: Callable[[Dict], None] = None) -> List[Dict]:
+        """
+        Render approved jobs on the render pool. Output paths are assigned by
+        `assign_output` in submission order, so daily-limit numbering stays deterministic
+        even though renders finish out of order. Flagged duplicates approved in the review
+        get their AI content here.
+        """
+        approved = [job for job in jobs if job.get('approved') and job.get('status') in ('ready', 'duplicate')]
+        missing = [job for job in approved if 'ai_content' not in job]
+        if missing and not self.stop_event.is_set():
+            with AsyncGenerationQueue(self.ai_generator) as ai_queue:
+                records = ai_queue.generate_all({
+                    job['index']: {'original_caption': job['original_caption'], 'ocr_text': job['ocr_text']}
+                    for job in missing
+                })
+            for job in missing:
+                self.apply_ai_result(job, records.get(job['index']))
+        approved = [job for job in approved if job['status'] != 'failed']
+        self.log(f"🎬 Phase 2: rendering {len(approved)} approved jobs ({self.render_workers} workers)...")
+
+        with ProcessPoolExecutor(max_workers=self.render_workers) as pool:
+            futures = {}
+            for job in approved:
+                if self.stop_event.is_set():
+                    break
+                job_options = dict(options)
+                job_options['output_path'] = assign_output(job)
+                job['status'] = 'rendering'
+                future = pool.submit(render_job, job['video_path'], job['ai_content'], job_options, branding_assets)
+                futures[future] = job
+
+            for future in as_completed(futures):
+                job = futures[future]
+                if self.stop_event.is_set():
+                    for pending in futures:
+                        pending.cancel()
+                try:
+                    job['output_path'] = future.result()
+                    job['status'] = 'rendered'
+                    record_rendered(job['url'], job.get('fingerprint'), job['output_path'])
+                except CancelledError:
+                    job['status'] = 'skipped'
+                except Exception as e:
+                    job['status'] = 'failed'
+                    job['error'] = str(e)
+                    self.release_claim(job)
+                if on_job_rendered:
+                    on_job_rendered(job)
+
+        return approved
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # FAN-OUT: ONE DOWNLOAD, SEVERAL BRANDED OUTPUTS
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    @staticmethod
+    def template_output_directory(template: Dict, base_output_dir: str) -> str:
+        """A template's own 'output_directory', or <base>/<account handle> for its account."""
+        if template.get('output_directory'):
+            return template['output_directory']
+        handle = template.get('account_handle') or template.get('name') or 'default'
+        folder = re.sub(r'[<>:"/\\|?*@\s]+', '_', handle).strip('_') or 'default'
+        return str(Path(base_output_dir) / folder)
+
+    def fan_out(self,
+                url: str,
+                template_ids: List[str],
+                options: Dict,
+                assign_output: Callable[[str, str], str],
+                generate_title: bool = True) -> List[Dict]:
+        """
+        Produce one branded video per template from a single download.
+
+        Download, OCR, probe and crop detection run once; AI content is generated per
+        template concurrently; all variants are rendered from one shared decode.
+        `assign_output(template_id, output_dir)` returns each variant's output path
+        (so every account keeps its own daily-limit numbering).
+        """
+        template_manager = self.ai_generator.template_manager
+        variants = []
+        video_path = None
+        claim = {'url': url, 'claimed': False}
+
+        try:
+            self.log(f"🔀 Fan-out: {url[:50]}... -> {len(template_ids)} templates")
+            metadata = InstagramDownloader().download_reel(url)
+            video_path = metadata['video_path']
+            caption, ocr_text = metadata['original_caption'], metadata['original_title']
+
+            # Fingerprinting also caches the crop, so the lookup below does not decode again
+            fingerprint, duplicate = self.fingerprint(url, video_path)
+            if duplicate:
+                self.log(f"⏭️ Skipping fan-out for {url[:50]}: {describe_duplicate(duplicate)}")
+                return [{'template_id': t, 'url': url, 'status': 'skipped', 'error': describe_duplicate(duplicate)}
+                        for t in template_ids]
+            claim['claimed'] = self.skip_duplicates and bool(fingerprint)
+            crop_info = media_store.cached_artefact(
+                video_path, 'crop_info', lambda: detect_crop_dimensions(video_path)
+            )
+
+            # One shared decode covers the longest template limit; each variant's encoder
+            # then stops at its own template's limit
+            limits = {t: (template_manager.get_template(t) or {}).get('max_duration') for t in template_ids}
+            max_duration = None if not all(limits.values()) else max(float(limit) for limit in limits.values())
+            trim = None
+            if max_duration or options.get('trim_dead_air'):
+                trim_dead_air = bool(options.get('trim_dead_air'))
+                trim = media_store.cached_artefact(
+                    video_path, f"trim:{max_duration}:{trim_dead_air}",
+                    lambda: plan_trim(video_path, max_duration=max_duration, trim_dead_air=trim_dead_air)
+                )
+
+            with AsyncGenerationQueue(self.ai_generator,
+                                      concurrency=min(len(template_ids), config.ai_concurrency)) as ai_queue:
+                records = ai_queue.generate_all({
+                    template_id: {'original_caption': caption, 'ocr_text': ocr_text, 'template_id': template_id}
+                    for template_id in template_ids
+                })
+            for template_id in template_ids:
+                variant = {'template_id': template_id, 'url': url, 'status': 'pending', 'error': None,
+                           'generate_title': generate_title}
+                if self.apply_ai_result(variant, records.get(template_id)):
+                    variant['status'] = 'ready'
+                variants.append(variant)
+
+            ready = [v for v in variants if v['status'] == 'ready']
+            if self.stop_event.is_set() or not ready:
+                return variants
+
+            # Output paths assigned in template order, one numbering sequence per account folder
+            for variant in ready:
+                if self.stop_event.is_set():
+                    break
+                template = template_manager.get_template(variant['template_id']) or {}
+                output_dir = self.template_output_directory(template, options['output_directory'])
+                Path(output_dir).mkdir(parents=True, exist_ok=True)
+                variant['output_path'] = assign_output(variant['template_id'], output_dir)
+                title = variant['ai_content'].get('title', '')
+                variant['title_image_path'] = create_title_image(title) if title and title.strip() else None
+                variant['add_branding'] = options.get('add_branding', True)
+                variant['add_logo'] = options.get('add_logo', True)
+                limit = limits[variant['template_id']]
+                variant['max_duration'] = float(limit) if limit else None
+
+            if self.stop_event.is_set():
+                for variant in ready:
+                    variant['status'] = 'skipped'
+                return variants
+
+            from .frame_pipeline import render_variants_with_frame_pipeline
+            render_options = dict(options, crop_info=crop_info)
+            if trim:
+                render_options.update({'start_time': trim['start_time'], 'end_time': trim['end_time']})
+            render_variants_with_frame_pipeline(video_path, ready, render_options, stop_event=self.stop_event)
+
+            processor = VideoProcessor()
+            for variant in ready:
+                variant['caption_path'] = processor.save_caption_to_file(
+                    variant['ai_content'].get('caption', ''), variant['output_path'],
+                    Path(variant['output_path']).parent
+                )
+                variant['status'] = 'rendered'
+                self.log(f"✅ {variant['template_id']}: {variant['output_path']}")
+            record_rendered(url, fingerprint, ready[0]['output_path'])
+
+        except Exception as e:
+            stopped = self.stop_event.is_set()
+            self.log(f"🛑 Fan-out stopped for {url[:50]}" if stopped else f"❌ Fan-out failed for {url[:50]}: {e}")
+            if not variants:
+                variants = [{'template_id': t, 'url': url} for t in template_ids]
+            for variant in variants:
+                if variant.get('status') != 'rendered':
+                    variant['status'] = 'skipped' if stopped else 'failed'
+                    variant['error'] = str(e)
+
+        finally:
+            if not any(variant.get('status') == 'rendered' for variant in variants):
+                self.release_claim(claim)
+            for variant in variants:
+                title_image = variant.get('title_image_path')
+                if title_image and os.path.exists(title_image):
+                    try: os.remove(title_image)
+                    except Exception: pass
+            media_store.remove_if_unmanaged(video_path)
+
+        return variants
+
+    def cleanup(self, jobs: List[Dict]):
+        """Remove source videos of every job, except those kept by the media store for reuse."""
+        for job in jobs:
+            media_store.remove_if_unmanaged(job.get('video_path'))
+        media_store.flush()
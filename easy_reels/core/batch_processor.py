@@ -11,7 +11,9 @@ import threading
 
 from .config_manager import config
 from .instagram_downloader import InstagramDownloader
+from .media_store import media_store
 from .ai_content_generator import AIContentGenerator
+from .ai_response_cache import ai_response_cache, describe_cache_stats
 from .video_processor import VideoProcessor
 from .batch_settings_manager import batch_settings
 from .file_naming_manager import FileNamingManager, BatchProgressTracker
@@ -152,9 +154,8 @@ class BatchProcessor:
                 with open(caption_path, 'w', encoding='utf-8') as f:
                     f.write(ai_content.get('caption', ''))
 
-            # Cleanup temp file
-            if os.path.exists(video_path):
-                os.remove(video_path)
+            # Cleanup temp file (stored downloads are kept for retries)
+            media_store.remove_if_unmanaged(video_path)
 
             metadata['total_time'] = time.time() - start_time
             metadata['output_path'] = final_video
@@ -171,11 +172,8 @@ class BatchProcessor:
             self.log_progress(0.0, f"Error: {error_msg}")
 
             # Cleanup on error
-            try:
-                if 'video_path' in locals() and os.path.exists(video_path):
-                    os.remove(video_path)
-            except:
-                pass
+            if 'video_path' in locals():
+                media_store.remove_if_unmanaged(video_path)
 
             return False, error_msg, metadata
 
@@ -208,6 +206,7 @@ class BatchProcessor:
 
             # Initialize progress tracker
             progress_tracker = BatchProgressTracker(len(urls))
+            cache_baseline = ai_response_cache.get_stats()
 
             # Check daily limit if using custom naming
             if batch_settings.get_custom_naming_enabled():
@@ -266,12 +265,14 @@ class BatchProcessor:
 
             # Generate final summary
             final_summary = progress_tracker.get_final_summary()
+            final_summary['ai_cache'] = ai_response_cache.get_stats(since=cache_baseline)
 
             # Save failed URLs report if any failures
             if progress_tracker.failed_urls and batch_settings.get("SAVE_FAILED_URLS", True):
                 progress_tracker.save_failed_urls_report("output")
 
-            self.log_progress(1.0, f"Batch completed: {final_summary['successful']} successful, {final_summary['failed']} failed")
+            self.log_progress(1.0, f"Batch completed: {final_summary['successful']} successful, {final_summary['failed']} failed "
+                                   f"({describe_cache_stats(final_summary['ai_cache'])})")
 
             return final_summary
 
@@ -39,6 +39,133 @@ class ConfigManager:
         """Get Instagram password from environment."""
         return os.getenv("INSTAGRAM_PASSWORD")
 
+    @property
+    def mezzanine_cache_mb(self) -> int:
+        """Disk budget for the mezzanine (re-render) cache in MB, from MEZZANINE_CACHE_MB."""
+        try:
+            return int(os.getenv("MEZZANINE_CACHE_MB", "2048"))
+        except ValueError:
+            return 2048
+
+    @property
+    def prefetch_budget_mb(self) -> int:
+        """Disk budget for prefetched batch downloads in MB, from PREFETCH_BUDGET_MB."""
+        try:
+            return int(os.getenv("PREFETCH_BUDGET_MB", "2048"))
+        except ValueError:
+            return 2048
+
+    @property
+    def media_store_mb(self) -> int:
+        """Disk budget for stored reel downloads in MB, from MEDIA_STORE_MB."""
+        try:
+            return int(os.getenv("MEDIA_STORE_MB", "4096"))
+        except ValueError:
+            return 4096
+
+    @property
+    def media_pin_lease_hours(self) -> float:
+        """How long a job's pin keeps a stored reel from eviction if it is never released, from MEDIA_PIN_LEASE_HOURS."""
+        try:
+            return float(os.getenv("MEDIA_PIN_LEASE_HOURS", "6"))
+        except ValueError:
+            return 6.0
+
+    @property
+    def post_metadata_ttl_hours(self) -> float:
+        """How long cached post metadata is trusted, from POST_METADATA_TTL_HOURS."""
+        try:
+            return float(os.getenv("POST_METADATA_TTL_HOURS", "24"))
+        except ValueError:
+            return 24.0
+
+    @property
+    def instagram_max_requests_per_second(self) -> float:
+        """Ceiling for Instagram metadata calls, from INSTAGRAM_MAX_RPS."""
+        try:
+            return float(os.getenv("INSTAGRAM_MAX_RPS", "0.5"))
+        except ValueError:
+            return 0.5
+
+    @property
+    def ocr_frames(self) -> int:
+        """Frames sampled for OCR, from OCR_FRAMES (1 = middle frame only)."""
+        try:
+            return max(1, int(os.getenv("OCR_FRAMES", "6")))
+        except ValueError:
+            return 6
+
+    @property
+    def ocr_text_check(self) -> bool:
+        """Skip OCR on frames that show no text, from OCR_TEXT_CHECK (default on)."""
+        return os.getenv("OCR_TEXT_CHECK", "1").strip().lower() not in ("0", "false", "no", "off")
+
+    @property
+    def ocr_cache_ttl_hours(self) -> float:
+        """Hours cached OCR text of a frame stays valid, from OCR_CACHE_TTL_HOURS."""
+        try:
+            return max(0.0, float(os.getenv("OCR_CACHE_TTL_HOURS", "720")))
+        except ValueError:
+            return 720.0
+
+    @property
+    def ocr_cache_max_entries(self) -> int:
+        """Cached OCR frame texts kept before the least recently used are evicted, from OCR_CACHE_MAX_ENTRIES."""
+        try:
+            return max(1, int(os.getenv("OCR_CACHE_MAX_ENTRIES", "20000")))
+        except ValueError:
+            return 20000
+
+    @property
+    def ai_combined_request(self) -> bool:
+        """Ask for title and caption in one AI request, from AI_COMBINED_REQUEST (default on)."""
+        return os.getenv("AI_COMBINED_REQUEST", "1").strip().lower() not in ("0", "false", "no", "off")
+
+    @property
+    def ai_concurrency(self) -> int:
+        """AI requests in flight at once in batch mode, from AI_CONCURRENCY."""
+        try:
+            return max(1, int(os.getenv("AI_CONCURRENCY", "4")))
+        except ValueError:
+            return 4
+
+    @property
+    def ai_request_budget(self) -> float:
+        """Seconds an AI request may take including retries, from AI_REQUEST_BUDGET."""
+        try:
+            return max(5.0, float(os.getenv("AI_REQUEST_BUDGET", "90")))
+        except ValueError:
+            return 90.0
+
+    @property
+    def ai_max_attempts(self) -> int:
+        """Attempts per AI request on rate limits and transient errors, from AI_MAX_ATTEMPTS."""
+        try:
+            return max(1, int(os.getenv("AI_MAX_ATTEMPTS", "5")))
+        except ValueError:
+            return 5
+
+    @property
+    def ai_cache_enabled(self) -> bool:
+        """Reuse cached AI completions for identical prompts, from AI_CACHE (default on)."""
+        return os.getenv("AI_CACHE", "1").strip().lower() not in ("0", "false", "no", "off")
+
+    @property
+    def ai_cache_ttl_hours(self) -> float:
+        """Hours a cached AI completion stays valid, from AI_CACHE_TTL_HOURS."""
+        try:
+            return max(0.0, float(os.getenv("AI_CACHE_TTL_HOURS", "168")))
+        except ValueError:
+            return 168.0
+
+    @property
+    def ai_cache_max_entries(self) -> int:
+        """Cached AI completions kept before the least recently used are evicted, from AI_CACHE_MAX_ENTRIES."""
+        try:
+            return max(1, int(os.getenv("AI_CACHE_MAX_ENTRIES", "5000")))
+        except ValueError:
+            return 5000
+
     def validate_credentials(self) -> Dict[str, bool]:
         """Validate that required credentials are available."""
         return {
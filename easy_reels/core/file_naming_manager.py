@@ -73,6 +73,42 @@ class FileNamingManager:
         return str(self.output_dir / caption_name)
 
 
+def next_day_limit_filename(output_dir: str, start_day: int, daily_limit: int, reserved: set = None) -> tuple:
+    """
+    Next "<day>-<number>.mp4" name for the daily limit system (e.g. 6-1.mp4 ... 6-12.mp4, then 7-1.mp4).
+
+    `reserved` holds filenames already handed out but not yet written to disk (renders that
+    run in parallel), so consecutive calls keep advancing. The chosen name is added to it.
+
+    Returns tuple: (video_filename, caption_filename, day_number, video_number)
+    """
+    existing_names = set(reserved or ())
+    if os.path.exists(output_dir):
+        existing_names.update(os.listdir(output_dir))
+
+    existing_files = []
+    for file in existing_names:
+        match = re.match(r'^(\d+)-(\d+)\.mp4$', file)
+        if match:
+            existing_files.append((int(match.group(1)), int(match.group(2))))
+
+    if not existing_files:
+        current_day, current_num = start_day, 1
+    else:
+        last_day, last_num = max(existing_files)
+        if last_num >= daily_limit:
+            current_day, current_num = last_day + 1, 1
+        else:
+            current_day, current_num = last_day, last_num + 1
+
+    video_name = f"{current_day}-{current_num}.mp4"
+    caption_name = f"{current_day}-{current_num}_caption.txt"
+    if reserved is not None:
+        reserved.add(video_name)
+
+    return video_name, caption_name, current_day, current_num
+
+
 class BatchProgressTracker:
     """Tracks progress across batch processing operations."""
 
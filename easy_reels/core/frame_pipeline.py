@@ -0,0 +1,615 @@
+"""
+Multi-process frame pipeline - decode, composite and encode overlap.
+
+MoviePy decodes, composites and pipes frames to ffmpeg from a single Python thread.
+Here a decoder process, a compositor process and an encoder process hand frames to
+each other through a ring of fixed 1080x1920 BGR slots in `multiprocessing.shared_memory`.
+Only slot indexes travel through the queues, so frames are never copied between stages:
+
+    decoder    crops + scales the source frame straight into the slot's video rows
+    compositor paints the static header/title/logo canvas around it in place
+    encoder    writes the slot's memoryview to ffmpeg's stdin and frees the slot
+
+When every slot is in flight the decoder blocks on the free queue (back-pressure).
+The layout is the STACKED layout of `create_final_video`.
+"""
+
+import os
+import sys
+import time
+import subprocess
+import multiprocessing as mp
+from multiprocessing import shared_memory
+from pathlib import Path
+from queue import Empty
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from .video_processor import (
+    SCREEN_SIZE, compute_stacked_layout, create_title_image, create_final_video, probe_video,
+    get_ffmpeg_exe
+)
+
+DEFAULT_SLOTS = 8
+
+
+def _attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+    """Attach to the ring without letting this process' resource tracker unlink it on exit."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name)
+        if os.name == "posix":
+            try:
+                from multiprocessing import resource_tracker
+                resource_tracker.unregister(shm._name, "shared_memory")
+            except Exception:
+                pass
+        return shm
+
+
+def _slot_view(shm: shared_memory.SharedMemory, n_slots: int) -> np.ndarray:
+    screen_w, screen_h = SCREEN_SIZE
+    return np.ndarray((n_slots, screen_h, screen_w, 3), dtype=np.uint8, buffer=shm.buf)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# LAYOUT: STATIC CANVAS + OVERLAYS
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _load_rgba(path: str, width: int) -> Image.Image:
+    img = Image.open(path).convert("RGBA")
+    height = max(1, int(round(img.height * width / img.width)))
+    return img.resize((width, height), Image.LANCZOS)
+
+
+def build_frame_layout(content_size: tuple, title_image_path: str = None, options: dict = None) -> dict:
+    """
+    Precompute everything that does not change per frame: the video rectangle, a static
+    BGR canvas with header/title/logo already painted on black, and the overlays that
+    intersect the video rectangle (those must be alpha-blended onto every frame).
+    Mirrors the STACKED layout of `create_final_video`.
+    """
+    options = options or {}
+    screen_w, screen_h = SCREEN_SIZE
+    content_w, content_h = content_size
+
+    add_branding = options.get('add_branding', True)
+    add_logo = options.get('add_logo', True)
+
+    # Tall videos get no title, exactly like create_final_video
+    if content_h > screen_h * 0.70:
+        title_image_path = None
+
+    canvas = Image.new("RGBA", (screen_w, screen_h), (0, 0, 0, 255))
+    top_element = None
+    if title_image_path and os.path.exists(title_image_path):
+        title = Image.open(title_image_path).convert("RGBA")
+        if add_branding:
+            profpic_path = "assets/profpic.jpg"
+            if not os.path.exists(profpic_path):
+                raise Exception(f"Profile pic not found: {profpic_path}.")
+            header = _load_rgba(profpic_path, screen_w)
+            top_element = Image.new("RGBA", (screen_w, header.height + 10 + title.height), (0, 0, 0, 0))
+            top_element.alpha_composite(header, ((screen_w - header.width) // 2, 0))
+            top_element.alpha_composite(title, ((screen_w - title.width) // 2, header.height + 10))
+        else:
+            top_element = title
+
+    logo = None
+    logo_path = "assets/logo.png"
+    if add_logo and os.path.exists(logo_path):
+        logo = _load_rgba(logo_path, 225)
+
+    layout = compute_stacked_layout(
+        screen_h, content_h,
+        top_h=top_element.height if top_element else 0,
+        has_logo=bool(logo)
+    )
+    video_y = int(layout['video_y'])
+    video_rows = max(0, min(content_h, screen_h - video_y))
+
+    placed = []
+    if top_element is not None:
+        placed.append((top_element, (screen_w - top_element.width) // 2, int(layout['top_y'])))
+    if logo is not None:
+        placed.append((logo, (screen_w - logo.width) // 2, layout['logo_y']))
+
+    overlays = []
+    for img, x, y in placed:
+        canvas.alpha_composite(img, (max(0, x), max(0, y)))
+        # Part of the overlay that sits on top of the video must be blended per frame
+        y0, y1 = max(y, video_y), min(y + img.height, video_y + video_rows)
+        if y0 < y1:
+            rgba = np.asarray(img)[y0 - y:y1 - y]
+            overlays.append({
+                'x': x,
+                'y': y0,
+                'bgr': np.ascontiguousarray(rgba[:, :, 2::-1]).astype(np.uint16),
+                'alpha': rgba[:, :, 3:4].astype(np.uint16)
+            })
+
+    static_bgr = np.ascontiguousarray(np.asarray(canvas.convert("RGB"))[:, :, ::-1])
+    return {
+        'video_y': video_y,
+        'video_rows': video_rows,
+        'content_size': (content_w, content_h),
+        'static_bgr': static_bgr,
+        'overlays': overlays
+    }
+
+
+def composite_in_place(frame: np.ndarray, layout: dict):
+    """Paint the static canvas around the video rows and blend overlays onto them, in place."""
+    video_y, video_rows = layout['video_y'], layout['video_rows']
+    static_bgr = layout['static_bgr']
+
+    if video_y > 0:
+        np.copyto(frame[:video_y], static_bgr[:video_y])
+    if video_y + video_rows < frame.shape[0]:
+        np.copyto(frame[video_y + video_rows:], static_bgr[video_y + video_rows:])
+
+    blend_overlays(frame, layout['overlays'])
+
+
+def blend_overlays(frame: np.ndarray, overlays: list):
+    """Alpha-blend the overlays that sit on top of the video rows, in place."""
+    for overlay in overlays:
+        h, w = overlay['alpha'].shape[:2]
+        x0, x1 = max(0, overlay['x']), min(frame.shape[1], overlay['x'] + w)
+        region = frame[overlay['y']:overlay['y'] + h, x0:x1]
+        alpha = overlay['alpha'][:, x0 - overlay['x']:x1 - overlay['x']]
+        bgr = overlay['bgr'][:, x0 - overlay['x']:x1 - overlay['x']]
+        region[...] = ((region.astype(np.uint16) * (255 - alpha) + bgr * alpha) // 255).astype(np.uint8)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# PIPELINE STAGES (each runs in its own process)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _decoder_stage(shm_name, n_slots, free_q, decoded_q, error_q, input_path, crop_info, content_size,
+                   video_y, start_time, max_frames):
+    shm = _attach_shared_memory(shm_name)
+    slots = _slot_view(shm, n_slots)
+    cap = None
+    try:
+        cap = cv2.VideoCapture(input_path)
+        if not cap.isOpened():
+            raise Exception(f"Could not open video: {input_path}")
+        if start_time:
+            cap.set(cv2.CAP_PROP_POS_MSEC, start_time * 1000)
+
+        content_w, content_h = content_size
+        screen_h = slots.shape[1]
+        visible_rows = min(content_h, screen_h - video_y)
+        frames = 0
+        while max_frames is None or frames < max_frames:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            if crop_info:
+                frame = frame[crop_info['y']:crop_info['y'] + crop_info['h'],
+                              crop_info['x']:crop_info['x'] + crop_info['w']]
+
+            slot = free_q.get()  # blocks while every slot is in flight
+            target = slots[slot, video_y:video_y + visible_rows]
+            if visible_rows == content_h:
+                cv2.resize(frame, (content_w, content_h), dst=target, interpolation=cv2.INTER_AREA)
+            else:
+                target[...] = cv2.resize(frame, (content_w, content_h), interpolation=cv2.INTER_AREA)[:visible_rows]
+            decoded_q.put(slot)
+            frames += 1
+    except Exception as e:
+        error_q.put(f"decoder: {e}")
+    finally:
+        decoded_q.put(None)
+        if cap is not None:
+            cap.release()
+        del slots
+        shm.close()
+
+
+def _compositor_stage(shm_name, n_slots, decoded_q, composed_q, error_q, layout):
+    shm = _attach_shared_memory(shm_name)
+    slots = _slot_view(shm, n_slots)
+    try:
+        while True:
+            slot = decoded_q.get()
+            if slot is None:
+                break
+            composite_in_place(slots[slot], layout)
+            composed_q.put(slot)
+    except Exception as e:
+        error_q.put(f"compositor: {e}")
+    finally:
+        composed_q.put(None)
+        del slots
+        shm.close()
+
+
+def _encoder_stage(shm_name, n_slots, composed_q, free_q, error_q, ffmpeg_cmd):
+    shm = _attach_shared_memory(shm_name)
+    screen_w, screen_h = SCREEN_SIZE
+    slot_bytes = screen_w * screen_h * 3
+    proc = None
+    try:
+        proc = subprocess.Popen(ffmpeg_cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        while True:
+            slot = composed_q.get()
+            if slot is None:
+                break
+            frame_bytes = shm.buf[slot * slot_bytes:(slot + 1) * slot_bytes]
+            try:
+                proc.stdin.write(frame_bytes)
+            finally:
+                frame_bytes.release()
+            free_q.put(slot)
+        proc.stdin.close()
+        stderr = proc.stderr.read()
+        if proc.wait() != 0:
+            error_q.put(f"encoder: ffmpeg exited with {proc.returncode}: {stderr.decode(errors='ignore')[-500:]}")
+    except Exception as e:
+        error_q.put(f"encoder: {e}")
+        if proc is not None:
+            proc.kill()
+    finally:
+        shm.close()
+
+
+def _fan_out_decoder_stage(shm_name, n_slots, free_q, variant_queues, refcounts, error_q, input_path,
+                           crop_info, content_size, start_time, max_frames):
+    """Decode once: crop + scale each frame into rows 0..content_h of a slot, publish it to every variant."""
+    shm = _attach_shared_memory(shm_name)
+    slots = _slot_view(shm, n_slots)
+    cap = None
+    try:
+        cap = cv2.VideoCapture(input_path)
+        if not cap.isOpened():
+            raise Exception(f"Could not open video: {input_path}")
+        if start_time:
+            cap.set(cv2.CAP_PROP_POS_MSEC, start_time * 1000)
+
+        content_w, content_h = content_size
+        rows = min(content_h, slots.shape[1])
+        frames = 0
+        while max_frames is None or frames < max_frames:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            if crop_info:
+                frame = frame[crop_info['y']:crop_info['y'] + crop_info['h'],
+                              crop_info['x']:crop_info['x'] + crop_info['w']]
+
+            slot = free_q.get()
+            if rows == content_h:
+                cv2.resize(frame, (content_w, content_h), dst=slots[slot, :rows], interpolation=cv2.INTER_AREA)
+            else:
+                slots[slot, :rows] = cv2.resize(frame, (content_w, content_h), interpolation=cv2.INTER_AREA)[:rows]
+            with refcounts.get_lock():
+                refcounts[slot] = len(variant_queues)
+            for queue in variant_queues:
+                queue.put(slot)
+            frames += 1
+    except Exception as e:
+        error_q.put(f"decoder: {e}")
+    finally:
+        for queue in variant_queues:
+            queue.put(None)
+        if cap is not None:
+            cap.release()
+        del slots
+        shm.close()
+
+
+def _variant_stage(shm_name, n_slots, in_q, free_q, refcounts, error_q, layout, ffmpeg_cmd, max_frames=None):
+    """
+    Composite + encode one branded variant from the shared content slots. After
+    `max_frames` (the variant's own length limit) slots are still released, not encoded.
+    """
+    shm = _attach_shared_memory(shm_name)
+    slots = _slot_view(shm, n_slots)
+    proc = None
+    try:
+        # The static canvas never changes, so it is painted once; per frame only the
+        # video rows are refreshed and overlays on top of them re-blended.
+        frame = layout['static_bgr'].copy()
+        video_y, video_rows = layout['video_y'], layout['video_rows']
+
+        proc = subprocess.Popen(ffmpeg_cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        written = 0
+        while True:
+            slot = in_q.get()
+            if slot is None:
+                break
+            encode = max_frames is None or written < max_frames
+            if encode:
+                np.copyto(frame[video_y:video_y + video_rows], slots[slot, :video_rows])
+            with refcounts.get_lock():
+                refcounts[slot] -= 1
+                if refcounts[slot] == 0:
+                    free_q.put(slot)
+            if encode:
+                blend_overlays(frame, layout['overlays'])
+                proc.stdin.write(memoryview(frame))
+                written += 1
+        proc.stdin.close()
+        stderr = proc.stderr.read()
+        if proc.wait() != 0:
+            error_q.put(f"variant: ffmpeg exited with {proc.returncode}: {stderr.decode(errors='ignore')[-500:]}")
+    except Exception as e:
+        error_q.put(f"variant: {e}")
+        if proc is not None:
+            proc.kill()
+    finally:
+        del slots
+        shm.close()
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# PUBLIC API
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def _build_ffmpeg_command(input_path: str, output_path: str, fps: float, start_time: float, duration: float,
+                          preset: str) -> list:
+    """Raw BGR frames on stdin for video, audio taken from the source over the same time window."""
+    screen_w, screen_h = SCREEN_SIZE
+    return [
+        get_ffmpeg_exe(), "-y", "-loglevel", "error",
+        "-f", "rawvideo", "-pix_fmt", "bgr24", "-s", f"{screen_w}x{screen_h}", "-r", f"{fps}", "-i", "-",
+        "-ss", f"{start_time}", "-t", f"{duration}", "-i", input_path,
+        "-map", "0:v", "-map", "1:a?",
+        "-c:v", "libx264", "-preset", preset, "-pix_fmt", "yuv420p",
+        "-c:a", "aac", "-shortest", output_path
+    ]
+
+
+def _prepare_source(input_path: str, options: dict) -> dict:
+    """Probe the source and derive content size and the time window to render."""
+    probe = probe_video(input_path)
+    if not probe:
+        raise Exception(f"Could not probe video: {input_path}")
+    fps = probe['fps'] or 30
+
+    screen_w = SCREEN_SIZE[0]
+    crop_info = options.get('crop_info')
+    src_w, src_h = (crop_info['w'], crop_info['h']) if crop_info else (probe['width'], probe['height'])
+
+    start_time = options.get('start_time') or 0
+    end_time = min(options.get('end_time') or probe['duration'], probe['duration'])
+    duration = end_time - start_time
+    if options.get('preview_seconds'):
+        duration = min(duration, options['preview_seconds'])
+
+    return {
+        'fps': fps,
+        'crop_info': crop_info,
+        'content_size': (screen_w, int(round(src_h * screen_w / src_w))),
+        'start_time': start_time,
+        'duration': duration,
+        'max_frames': int(round(duration * fps)) if duration > 0 else None
+    }
+
+
+def _supervise(processes: list, error_q, stop_event=None) -> list:
+    """
+    Wait for the stage processes; return collected errors (terminating the rest on
+    failure, or when `stop_event` is set).
+    """
+    errors = []
+    while any(p.is_alive() for p in processes):
+        if stop_event is not None and stop_event.is_set():
+            errors.append("stopped")
+            break
+        try:
+            errors.append(error_q.get(timeout=0.2))
+            break
+        except Empty:
+            pass
+        if any(p.exitcode not in (None, 0) for p in processes):
+            errors.append("a pipeline stage crashed")
+            break
+    while True:
+        try:
+            errors.append(error_q.get_nowait())
+        except Empty:
+            break
+
+    if errors:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+    return errors
+
+
+def render_with_frame_pipeline(input_path: str, output_path: str, title_text: str = "", options: dict = None) -> str:
+    """
+    Render the final video through the decoder/compositor/encoder processes.
+
+    Options: the same 'add_branding', 'add_logo', 'preset', 'crop_info',
+    'title_image_path' and 'preview_seconds' as `create_final_video`, plus
+    'pipeline_slots' (ring size, default 8).
+    """
+    options = options or {}
+    screen_w, screen_h = SCREEN_SIZE
+    n_slots = max(2, int(options.get('pipeline_slots', DEFAULT_SLOTS)))
+    source = _prepare_source(input_path, options)
+
+    title_image = options.get('title_image_path')
+    temp_title_image = None
+    if title_text and title_text.strip() and not (title_image and os.path.exists(title_image)):
+        temp_title_image = title_image = create_title_image(title_text)
+    if not (title_text and title_text.strip()):
+        title_image = None
+
+    ffmpeg_cmd = _build_ffmpeg_command(
+        input_path, output_path, source['fps'], source['start_time'], source['duration'],
+        options.get('preset', 'medium')
+    )
+
+    ctx = mp.get_context("spawn")
+    shm = shared_memory.SharedMemory(create=True, size=n_slots * screen_w * screen_h * 3)
+    processes = []
+    try:
+        layout = build_frame_layout(source['content_size'], title_image, options)
+
+        free_q, decoded_q, composed_q, error_q = ctx.Queue(), ctx.Queue(), ctx.Queue(), ctx.Queue()
+        for slot in range(n_slots):
+            free_q.put(slot)
+
+        processes = [
+            ctx.Process(target=_decoder_stage, daemon=True, args=(
+                shm.name, n_slots, free_q, decoded_q, error_q, input_path, source['crop_info'],
+                source['content_size'], layout['video_y'], source['start_time'], source['max_frames'])),
+            ctx.Process(target=_compositor_stage, daemon=True, args=(
+                shm.name, n_slots, decoded_q, composed_q, error_q, layout)),
+            ctx.Process(target=_encoder_stage, daemon=True, args=(
+                shm.name, n_slots, composed_q, free_q, error_q, ffmpeg_cmd)),
+        ]
+        print(f"--> Frame pipeline: {n_slots} shared slots, writing {output_path}")
+        for process in processes:
+            process.start()
+
+        errors = _supervise(processes, error_q)
+        if errors:
+            raise Exception(f"Frame pipeline failed: {'; '.join(errors)}")
+
+        print("--> Final video created successfully!")
+        return output_path
+
+    finally:
+        for process in processes:
+            process.join(timeout=5)
+        shm.close()
+        shm.unlink()
+        if temp_title_image and os.path.exists(temp_title_image):
+            try: os.remove(temp_title_image)
+            except Exception: pass
+
+
+def render_variants_with_frame_pipeline(input_path: str, variants: list, options: dict = None,
+                                        stop_event=None) -> list:
+    """
+    Render several branded variants of one source from a single shared decode.
+
+    Each variant is a dict with 'output_path' and optional 'title_image_path',
+    'add_branding', 'add_logo' and 'max_duration' (seconds, cut short of the shared
+    window). Shared options ('crop_info', 'preset', 'start_time', 'end_time',
+    'preview_seconds', 'pipeline_slots') apply to all variants. A slot returns to the
+    decoder only after every variant has copied it. Setting `stop_event` terminates the
+    workers and removes the partly written outputs.
+    """
+    options = options or {}
+    screen_w, screen_h = SCREEN_SIZE
+    n_slots = max(2, int(options.get('pipeline_slots', DEFAULT_SLOTS)))
+    source = _prepare_source(input_path, options)
+
+    ctx = mp.get_context("spawn")
+    shm = shared_memory.SharedMemory(create=True, size=n_slots * screen_w * screen_h * 3)
+    processes, errors = [], []
+    try:
+        free_q, error_q = ctx.Queue(), ctx.Queue()
+        for slot in range(n_slots):
+            free_q.put(slot)
+        refcounts = ctx.Array('i', n_slots)
+
+        variant_queues = []
+        for variant in variants:
+            variant_options = dict(options, **{k: v for k, v in variant.items() if k in ('add_branding', 'add_logo')})
+            layout = build_frame_layout(source['content_size'], variant.get('title_image_path'), variant_options)
+            duration, max_frames = source['duration'], source['max_frames']
+            if variant.get('max_duration') and variant['max_duration'] < duration:
+                duration = float(variant['max_duration'])
+                max_frames = int(round(duration * source['fps']))
+            ffmpeg_cmd = _build_ffmpeg_command(
+                input_path, variant['output_path'], source['fps'], source['start_time'], duration,
+                options.get('preset', 'medium')
+            )
+            queue = ctx.Queue()
+            variant_queues.append(queue)
+            processes.append(ctx.Process(target=_variant_stage, daemon=True, args=(
+                shm.name, n_slots, queue, free_q, refcounts, error_q, layout, ffmpeg_cmd, max_frames)))
+
+        processes.insert(0, ctx.Process(target=_fan_out_decoder_stage, daemon=True, args=(
+            shm.name, n_slots, free_q, variant_queues, refcounts, error_q, input_path, source['crop_info'],
+            source['content_size'], source['start_time'], source['max_frames'])))
+
+        print(f"--> Frame pipeline fan-out: 1 decode -> {len(variants)} variants")
+        for process in processes:
+            process.start()
+
+        errors = _supervise(processes, error_q, stop_event)
+        if "stopped" in errors:
+            raise Exception("Frame pipeline fan-out stopped")
+        if errors:
+            raise Exception(f"Frame pipeline fan-out failed: {'; '.join(errors)}")
+
+        return [variant['output_path'] for variant in variants]
+
+    finally:
+        for process in processes:
+            process.join(timeout=5)
+        shm.close()
+        shm.unlink()
+        if "stopped" in errors:
+            for variant in variants:
+                if os.path.exists(variant['output_path']):
+                    try: os.remove(variant['output_path'])
+                    except Exception: pass
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# BENCHMARK (CPU-only)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def make_test_clip(output_path: str, seconds: float = 5, size: tuple = (720, 1280), fps: int = 30) -> str:
+    """Write a synthetic moving-pattern clip (no audio) so the pipeline can be exercised without reels."""
+    width, height = size
+    writer = cv2.VideoWriter(output_path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+    yy, xx = np.mgrid[0:height, 0:width]
+    for i in range(int(seconds * fps)):
+        frame = np.zeros((height, width, 3), dtype=np.uint8)
+        frame[..., 0] = (xx + i * 4) % 256
+        frame[..., 1] = (yy + i * 2) % 256
+        frame[..., 2] = ((xx + yy) // 4 + i) % 256
+        writer.write(frame)
+    writer.release()
+    return output_path
+
+
+def benchmark_frame_pipeline(input_path: str = None, title_text: str = "Benchmark title for the frame pipeline",
+                             options: dict = None) -> dict:
+    """Render the same input through MoviePy (`create_final_video`) and the frame pipeline and time both."""
+    temp_dir = Path("temp")
+    temp_dir.mkdir(exist_ok=True)
+    if input_path is None:
+        input_path = make_test_clip(str(temp_dir / "bench_source.mp4"))
+
+    options = dict(options or {})
+    title_image = create_title_image(title_text)
+    options['title_image_path'] = title_image
+    results = {'input': input_path}
+    try:
+        moviepy_out = str(temp_dir / "bench_moviepy.mp4")
+        start = time.perf_counter()
+        create_final_video(input_path, title_text, moviepy_out, dict(options))
+        results['moviepy_seconds'] = time.perf_counter() - start
+
+        pipeline_out = str(temp_dir / "bench_pipeline.mp4")
+        start = time.perf_counter()
+        render_with_frame_pipeline(input_path, pipeline_out, title_text, dict(options))
+        results['pipeline_seconds'] = time.perf_counter() - start
+
+        results['speedup'] = results['moviepy_seconds'] / results['pipeline_seconds']
+    finally:
+        if title_image and os.path.exists(title_image):
+            os.remove(title_image)
+
+    print(f"--> MoviePy: {results['moviepy_seconds']:.2f}s | Frame pipeline: {results['pipeline_seconds']:.2f}s "
+          f"| Speedup: {results['speedup']:.2f}x")
+    return results
+
+
+if __name__ == "__main__":
+    benchmark_frame_pipeline(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,202 @@
+"""
+Groq API keys in use, with live per-key usage.
+
+In key-pool mode every enabled key of the ApiKeyManager is in the pool and each
+request goes to the key with the fewest requests in flight and the most quota left.
+Groq reports each key's remaining requests and tokens (x-ratelimit-* headers) on
+every reply; a key whose quota is used up, or that was answered with 429, is skipped
+until its reset time, and a key rejected as invalid (401/403) is not used again until
+the keys are reconfigured. A failure caused by one key is retried at once on another.
+Outside pool mode the pool holds just the selected key, so its usage is tracked too.
+"""
+
+import time
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from groq import Groq
+
+from .groq_retry import (AIRequestError, AIRateLimitError, AIAuthError, classify_error,
+                         parse_reset, rate_limit_delay)
+
+DEFAULT_THROTTLE = 10.0  # seconds a 429 without any wait hint takes a key out of rotation
+
+
+class AIKeyUnavailableError(AIRequestError):
+    """The key used was throttled or rejected, and another key can take the retry."""
+    kind = "key_switch"
+    retryable = True
+
+
+def _header_int(headers, name: str) -> Optional[int]:
+    try:
+        return int(float(headers.get(name)))
+    except (TypeError, ValueError):
+        return None
+
+
+class GroqKeyPool:
+    """Usage and availability of each Groq key, shared by every generator and client."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.keys: Dict[str, Dict] = {}
+        self.clients: Dict[str, Groq] = {}
+
+    def set_keys(self, keys: Dict[str, Dict]):
+        """Use {key_id: {'name', 'key'}}. Usage of keys that did not change is kept."""
+        with self.lock:
+            current = {}
+            for key_id, key_data in keys.items():
+                state = self.keys.get(key_id)
+                if state is None or state['api_key'] != key_data['key']:
+                    state = self._new_state(key_id, key_data)
+                    self.clients.pop(key_id, None)
+                state['name'] = key_data.get('name', key_id)
+                current[key_id] = state
+            for key_id in set(self.clients) - set(current):
+                del self.clients[key_id]
+            self.keys = current
+
+    @staticmethod
+    def _new_state(key_id: str, key_data: Dict) -> Dict:
+        return {'id': key_id, 'name': key_data.get('name', key_id), 'api_key': key_data['key'],
+                'requests': 0, 'tokens': 0, 'errors': 0, 'throttles': 0, 'in_flight': 0,
+                'remaining_requests': None, 'limit_requests': None, 'requests_reset_at': 0.0,
+                'remaining_tokens': None, 'limit_tokens': None, 'tokens_reset_at': 0.0,
+                'throttled_until': 0.0, 'invalid': False, 'last_error': None}
+
+    def has_keys(self) -> bool:
+        with self.lock:
+            return bool(self.keys)
+
+    def _blocked_until(self, state: Dict, now: float) -> float:
+        """When the key may be used again (0 when it can be used now)."""
+        until = state['throttled_until']
+        if state['remaining_requests'] == 0 and state['requests_reset_at'] > now:
+            until = max(until, state['requests_reset_at'])
+        if state['remaining_tokens'] == 0 and state['tokens_reset_at'] > now:
+            until = max(until, state['tokens_reset_at'])
+        return until if until > now else 0.0
+
+    @staticmethod
+    def _headroom(state: Dict) -> float:
+        """Smallest share of the request and token quotas left (1.0 while unknown)."""
+        shares = [state[f'remaining_{quota}'] / state[f'limit_{quota}']
+                  for quota in ('requests', 'tokens')
+                  if state[f'remaining_{quota}'] is not None and state[f'limit_{quota}']]
+        return min(shares) if shares else 1.0
+
+    def _usable(self, now: float) -> List[Dict]:
+        return [state for state in self.keys.values()
+                if not state['invalid'] and not self._blocked_until(state, now)]
+
+    def acquire(self) -> Tuple[str, str]:
+        """(key_id, api_key) for the next request; raises when no key can take it."""
+        with self.lock:
+            now = time.monotonic()
+            usable = self._usable(now)
+            if not usable:
+                valid = [state for state in self.keys.values() if not state['invalid']]
+                if not valid:
+                    raise AIAuthError("No valid Groq API key - add or fix a key in the API key manager")
+                wait = min(self._blocked_until(state, now) for state in valid) - now
+                raise AIRateLimitError(f"All {len(valid)} API key(s) are rate limited", 429, max(0.0, wait))
+            state = min(usable, key=lambda s: (s['in_flight'], -self._headroom(s), s['requests']))
+            state['in_flight'] += 1
+            state['requests'] += 1
+            return state['id'], state['api_key']
+
+    def client(self, key_id: str) -> Groq:
+        """Synchronous client of a key (created once; SDK retries off, groq_retry retries)."""
+        with self.lock:
+            if key_id not in self.clients:
+                self.clients[key_id] = Groq(api_key=self.keys[key_id]['api_key'], max_retries=0)
+            return self.clients[key_id]
+
+    def _update_budgets(self, state: Dict, headers, now: float):
+        if not headers:
+            return
+        for quota in ('requests', 'tokens'):
+            remaining = _header_int(headers, f'x-ratelimit-remaining-{quota}')
+            if remaining is not None:
+                state[f'remaining_{quota}'] = remaining
+            limit = _header_int(headers, f'x-ratelimit-limit-{quota}')
+            if limit is not None:
+                state[f'limit_{quota}'] = limit
+            reset = parse_reset(headers.get(f'x-ratelimit-reset-{quota}'))
+            if reset is not None:
+                state[f'{quota}_reset_at'] = now + reset
+
+    def succeeded(self, key_id: str, headers=None, completion=None):
+        """Record a reply: tokens used and the quota left according to its headers."""
+        usage = getattr(completion, 'usage', None)
+        with self.lock:
+            state = self.keys.get(key_id)
+            if state is None:
+                return
+            state['in_flight'] -= 1
+            state['tokens'] += getattr(usage, 'total_tokens', 0) or 0
+            self._update_budgets(state, headers, time.monotonic())
+
+    def failed(self, key_id: str, error: Exception) -> AIRequestError:
+        """
+        Record a failed request and return the error to raise. Throttled or rejected keys
+        are taken out of rotation; when another key is free the error asks for an
+        immediate retry (which will use that key).
+        """
+        typed = classify_error(error)
+        headers = getattr(getattr(error, 'response', None), 'headers', None)
+        with self.lock:
+            state = self.keys.get(key_id)
+            if state is None:
+                return typed
+            now = time.monotonic()
+            state['in_flight'] -= 1
+            state['errors'] += 1
+            state['last_error'] = f"{typed.kind}: {typed}"[:200]
+            self._update_budgets(state, headers, now)
+            if isinstance(typed, AIRateLimitError):
+                state['throttles'] += 1
+                wait = typed.retry_after if typed.retry_after is not None else rate_limit_delay(headers)
+                state['throttled_until'] = now + (wait if wait is not None else DEFAULT_THROTTLE)
+            elif isinstance(typed, AIAuthError):
+                state['invalid'] = True
+            else:
+                return typed
+            others = [other for other in self._usable(now) if other['id'] != key_id]
+        if others:
+            print(f"🔑 Key '{state['name']}' {'rejected' if state['invalid'] else 'throttled'}, "
+                  f"switching to another key")
+            return AIKeyUnavailableError(f"{typed} (key '{state['name']}')", typed.status, 0.0)
+        return typed
+
+    def get_usage(self) -> List[Dict]:
+        """Per-key usage for display: counts, quota left and status."""
+        with self.lock:
+            now = time.monotonic()
+            usage = []
+            for state in self.keys.values():
+                blocked = self._blocked_until(state, now)
+                entry = {name: value for name, value in state.items()
+                         if name not in ('api_key', 'requests_reset_at', 'tokens_reset_at', 'throttled_until')}
+                entry['status'] = ('invalid' if state['invalid'] else
+                                   f'throttled {blocked - now:.0f}s' if blocked else 'ok')
+                usage.append(entry)
+            return usage
+
+
+def describe_key_usage(entry: Dict) -> str:
+    """One line of live usage for the API key manager."""
+    parts = [f"{entry['requests']} req", f"{entry['tokens']} tok"]
+    for quota, label in (('requests', 'req'), ('tokens', 'tok')):
+        if entry[f'remaining_{quota}'] is not None:
+            limit = f"/{entry[f'limit_{quota}']}" if entry[f'limit_{quota}'] else ""
+            parts.append(f"{entry[f'remaining_{quota}']}{limit} {label} left")
+    if entry['in_flight']:
+        parts.append(f"{entry['in_flight']} in flight")
+    return f"{entry['status']} · " + " · ".join(parts)
+
+
+# Keys in use by every AIContentGenerator and AsyncGenerationQueue
+groq_key_pool = GroqKeyPool()
@@ -0,0 +1,249 @@
+"""
+Typed Groq errors and retries.
+
+Exceptions raised by the Groq SDK are mapped to AIRequestError subclasses that say
+whether another attempt can help. Rate limits (429), server errors (5xx), timeouts,
+dropped connections and empty replies are retried with exponential backoff and
+jitter. When the server says how long to wait - Retry-After, or the
+x-ratelimit-reset-* headers once a quota is used up - that wait is used instead.
+
+Every request has a time budget (AI_REQUEST_BUDGET): the HTTP timeout of each attempt
+is what is left of it, and a retry that could not start in time is not attempted.
+The last error is then raised, so a failed generation is reported instead of quietly
+turning into fallback content.
+"""
+
+import re
+import time
+import random
+import asyncio
+import threading
+from typing import Awaitable, Callable, Dict, Optional
+
+import groq
+
+from .config_manager import config
+from .rate_limiter import parse_retry_after, throttle_signal
+
+
+class AIRequestError(Exception):
+    """An AI request that failed. `retryable` says whether another attempt can succeed."""
+    kind = "error"
+    retryable = False
+
+    def __init__(self, message: str, status: int = None, retry_after: float = None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+class AIRateLimitError(AIRequestError):
+    kind = "rate_limit"
+    retryable = True
+
+
+class AIServerError(AIRequestError):
+    kind = "server"
+    retryable = True
+
+
+class AITimeoutError(AIRequestError):
+    kind = "timeout"
+    retryable = True
+
+
+class AIConnectionError(AIRequestError):
+    kind = "connection"
+    retryable = True
+
+
+class AIEmptyReplyError(AIRequestError):
+    kind = "empty_reply"
+    retryable = True
+
+
+class AIAuthError(AIRequestError):
+    kind = "auth"
+
+
+class AIBadRequestError(AIRequestError):
+    kind = "bad_request"
+
+
+def parse_reset(value) -> Optional[float]:
+    """Seconds from a Groq reset header such as "7.66s", "2m59.56s" or "850ms"."""
+    if value is None:
+        return None
+    text = str(value).strip()
+    try:
+        return max(0.0, float(text))
+    except ValueError:
+        pass
+    parts = re.findall(r"([0-9.]+)\s*(ms|h|m|s)", text)
+    if not parts:
+        return None
+    units = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+    return sum(float(number) * units[unit] for number, unit in parts)
+
+
+def rate_limit_delay(headers) -> Optional[float]:
+    """
+    Seconds to wait according to the response headers: Retry-After, else the reset time
+    of whichever quota (requests or tokens) is used up. None when the headers say nothing.
+    """
+    if not headers:
+        return None
+    retry_after = parse_retry_after(headers.get("retry-after"))
+    if retry_after is not None:
+        return retry_after
+    waits = []
+    for quota in ("requests", "tokens"):
+        remaining = headers.get(f"x-ratelimit-remaining-{quota}")
+        if remaining is not None and str(remaining).strip() in ("0", "0.0"):
+            reset = parse_reset(headers.get(f"x-ratelimit-reset-{quota}"))
+            if reset is not None:
+                waits.append(reset)
+    return max(waits) if waits else None
+
+
+def _sdk_error(name: str):
+    return getattr(groq, name, None) or ()
+
+
+def classify_error(error: Exception) -> AIRequestError:
+    """The AIRequestError for an exception raised while calling Groq."""
+    if isinstance(error, AIRequestError):
+        return error
+    message = f"{type(error).__name__}: {error}"
+    if isinstance(error, (_sdk_error("APITimeoutError"), TimeoutError, asyncio.TimeoutError)):
+        return AITimeoutError(message)
+    if isinstance(error, _sdk_error("APIConnectionError")):
+        return AIConnectionError(message)
+
+    status = getattr(error, "status_code", None)
+    if status is not None:
+        headers = getattr(getattr(error, "response", None), "headers", None)
+        if status == 429:
+            return AIRateLimitError(message, status, rate_limit_delay(headers))
+        if status in (401, 403):
+            return AIAuthError(message, status)
+        if status == 408:
+            return AITimeoutError(message, status)
+        if status >= 500:
+            return AIServerError(message, status, rate_limit_delay(headers))
+        return AIBadRequestError(message, status)
+
+    throttled, retry_after = throttle_signal(error)
+    if throttled:
+        return AIRateLimitError(message, 429, retry_after)
+    return AIRequestError(message)
+
+
+class RetryPolicy:
+    """
+    Runs an AI request until it succeeds, fails for good, or its time budget is spent.
+    `budget` and `max_attempts` default to AI_REQUEST_BUDGET and AI_MAX_ATTEMPTS.
+    """
+
+    def __init__(self, budget: float = None, max_attempts: int = None,
+                 base_backoff: float = 1.0, max_backoff: float = 30.0):
+        self.budget = budget
+        self.max_attempts = max_attempts
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.lock = threading.Lock()
+        self.stats = {"requests": 0, "attempts": 0, "retries": 0, "failed": 0,
+                      "waited_seconds": 0.0, "errors": {}}
+
+    def next_delay(self, error: AIRequestError, attempt: int, deadline: float) -> Optional[float]:
+        """Seconds to wait before the next attempt, or None to give up."""
+        if not error.retryable or attempt >= (self.max_attempts or config.ai_max_attempts):
+            return None
+        if error.retry_after is not None:
+            # The server's wait, spread a little so concurrent requests do not return together
+            delay = error.retry_after + random.uniform(0, 0.5)
+        else:
+            backoff = min(self.max_backoff, self.base_backoff * 2 ** (attempt - 1))
+            delay = backoff * random.uniform(0.75, 1.25)
+        # Not worth waiting if no time would be left for the attempt itself
+        if time.monotonic() + delay + 1.0 > deadline:
+            return None
+        return delay
+
+    def _start(self) -> float:
+        with self.lock:
+            self.stats["requests"] += 1
+        return time.monotonic() + (self.budget or config.ai_request_budget)
+
+    def _record(self, error: AIRequestError = None, delay: float = None):
+        with self.lock:
+            self.stats["attempts"] += 1
+            if error is not None:
+                self.stats["errors"][error.kind] = self.stats["errors"].get(error.kind, 0) + 1
+                if delay is None:
+                    self.stats["failed"] += 1
+                else:
+                    self.stats["retries"] += 1
+                    self.stats["waited_seconds"] += delay
+
+    def _give_up(self, error: AIRequestError, attempt: int, label: str) -> AIRequestError:
+        if error.retryable:
+            if attempt >= (self.max_attempts or config.ai_max_attempts):
+                reason = f"gave up after {attempt} attempts"
+            else:
+                reason = f"no time left for a retry within the {self.budget or config.ai_request_budget:.0f}s budget"
+            error.args = (f"{error.args[0]} ({reason})",)
+        print(f"❌ {label} failed after {attempt} attempt(s): {error}")
+        return error
+
+    def _log_retry(self, error: AIRequestError, attempt: int, delay: float, label: str):
+        print(f"⚠️ {label}: {error.kind} ({error}), retrying in {delay:.1f}s "
+              f"(attempt {attempt + 1}/{self.max_attempts or config.ai_max_attempts})")
+
+    def call(self, request: Callable[[float], object], label: str = "Groq request"):
+        """Run `request(timeout)` with retries; `timeout` is what is left of the budget."""
+        deadline = self._start()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                result = request(max(1.0, deadline - time.monotonic()))
+            except Exception as e:
+                error = classify_error(e)
+                delay = self.next_delay(error, attempt, deadline)
+                self._record(error, delay)
+                if delay is None:
+                    raise self._give_up(error, attempt, label) from e
+                self._log_retry(error, attempt, delay, label)
+                time.sleep(delay)
+                continue
+            self._record()
+            return result
+
+    async def call_async(self, request: Callable[[float], Awaitable], label: str = "Groq request"):
+        """`call` for a coroutine function; waits without blocking the event loop."""
+        deadline = self._start()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                result = await request(max(1.0, deadline - time.monotonic()))
+            except Exception as e:
+                error = classify_error(e)
+                delay = self.next_delay(error, attempt, deadline)
+                self._record(error, delay)
+                if delay is None:
+                    raise self._give_up(error, attempt, label) from e
+                self._log_retry(error, attempt, delay, label)
+                await asyncio.sleep(delay)
+                continue
+            self._record()
+            return result
+
+    def get_stats(self) -> Dict:
+        with self.lock:
+            return dict(self.stats, errors=dict(self.stats["errors"]))
+
+
+# Shared by the sync and async Groq clients
+groq_retry = RetryPolicy()
@@ -1,13 +1,15 @@
 import instaloader
-import requests
 import os
 import sys
-import io
-from contextlib import redirect_stderr
+import time
 from pathlib import Path
 from typing import Tuple, Dict
-from .ocr_extractor import OCRExtractor
+from .ocr_extractor import ocr_extractor
 from .config_manager import config
+from .instagram_session import instagram_session
+from .media_fetcher import media_fetcher
+from .media_store import media_store
+from .post_metadata_cache import post_metadata_cache, CachedPost
 
 
 def parse_instagram_url(url: str) -> str:
@@ -35,59 +37,88 @@ def parse_instagram_url(url: str) -> str:
 
 
 def initialize_instaloader():
-    """Initializes and logs into Instaloader quietly."""
-    print("Initializing Instaloader and logging in...")
-
-    L = instaloader.Instaloader(
-        quiet=False,
-        download_pictures=False,
-        download_video_thumbnails=False,
-        save_metadata=False,
-        compress_json=False,
-        download_geotags=False,
-        download_comments=False
-    )
-
-    try:
-        L.load_session_from_file(config.instagram_username)
-        print("Loaded existing session")
-    except FileNotFoundError:
-        L.login(config.instagram_username, config.instagram_password)
-        L.save_session_to_file()
-        print("Login successful!")
-
-    return L
+    """Returns the process-wide logged-in Instaloader (created and logged in on first use)."""
+    return instagram_session.get_loader()
 
 
-def get_post(L, shortcode):
-    """Fetches the post data while filtering out unwanted logs."""
+def get_post(L, shortcode, session=None):
+    """
+    Fetches the post data. Unwanted logs are filtered by the shared session's context,
+    and an expired session is re-authenticated once.
+    """
     print("PROGRESS:STATUS:--> Fetching video metadata...")
+    session = session or instagram_session
 
-    log_catcher = io.StringIO()
-    post = None
-
-    with redirect_stderr(log_catcher):
-        try:
-            post = instaloader.Post.from_shortcode(L.context, shortcode)
-        except Exception as e:
-            print(f"PROGRESS:ERROR:An error occurred while fetching post: {e}")
-            raise
+    try:
+        if L is None or L is session.loader:
+            return session.get_post(shortcode)
+        return instaloader.Post.from_shortcode(L.context, shortcode)
+    except Exception as e:
+        print(f"PROGRESS:ERROR:An error occurred while fetching post: {e}")
+        raise
+
+
+def refresh_video_url(post, session=None, metadata_cache=None) -> str:
+    """Re-fetch the post to get a new signed video URL (the CDN URLs expire) and cache it."""
+    fresh_post = get_post(None, post.shortcode, session)
+    (metadata_cache or post_metadata_cache).put_post(fresh_post)
+    return fresh_post.video_url
+
+
+def get_post_cached(shortcode: str, session=None, metadata_cache=None):
+    """Cached post metadata if fresh enough, otherwise a GraphQL fetch (which is then cached)."""
+    metadata_cache = metadata_cache or post_metadata_cache
+    record = metadata_cache.get(shortcode)
+    if record:
+        print("PROGRESS:STATUS:--> Using cached video metadata")
+        if record.get("url_expires") and record["url_expires"] < time.time():
+            print("--> Cached video URL is past its expiry, it will be refreshed if the CDN rejects it")
+        return CachedPost(record)
+    post = get_post(None, shortcode, session)
+    if post:
+        metadata_cache.put_post(post)
+    return post
 
-    log_output = log_catcher.getvalue()
-    for line in log_output.splitlines():
-        if not ("JSON Query to" in line and "/info/" in line) and not ("Unable to fetch high-quality" in line):
-            print(line)
 
-    return post
+def extract_ocr_text(video_path: str, text_check_out: dict = None) -> str:
+    """
+    OCR text of the video, read from several frames ("" if none was found or OCR failed).
+    The text-presence decision (see ocr_extractor.text_likelihood) is copied into
+    `text_check_out` when given.
+    """
+    print(f"PROGRESS:STATUS:--> Extracting text from video using OCR...")
+    try:
+        ocr_result = ocr_extractor.extract_text(video_path)
+        original_title = ocr_result.get('text', '')
+        text_check = ocr_result.get('text_check')
+        if text_check:
+            if text_check_out is not None:
+                text_check_out.update(text_check)
+            if not text_check['likely']:
+                print(f"PROGRESS:STATUS:--> No text on screen (confidence {text_check['confidence']:.2f}), OCR skipped")
+        
+        if original_title:
+            print(f"PROGRESS:STATUS:--> OCR found text: {original_title[:50]}...")
+        else:
+            print(f"PROGRESS:STATUS:--> No text detected in video")
+            original_title = ""
+    except Exception as e:
+        print(f"PROGRESS:WARNING:--> OCR failed: {e}")
+        original_title = ""
+    return original_title
 
 
-def download_video_with_metadata(post, output_path: str) -> Dict[str, str]:
+def download_video_with_metadata(post, output_path: str, ocr: bool = True, fetcher=None,
+                                 refresh_url=None) -> Dict[str, str]:
     """
     Downloads video and extracts metadata including OCR text.
     
     Args:
         post: Instaloader Post object
         output_path: Path where video will be saved
+        ocr: Run OCR on the video (callers with a cached result pass False)
+        fetcher: MediaFetcher to use (the shared one by default)
+        refresh_url: Returns a fresh video URL once the signed one expired
     
     Returns:
         dict with:
@@ -95,16 +126,14 @@ def download_video_with_metadata(post, output_path: str) -> Dict[str, str]:
             - 'original_caption': Instagram post caption
             - 'original_title': OCR extracted text from video
             - 'url': Post URL
+            - 'download_stats': Throughput and SHA-256 of the download (see MediaFetcher.fetch)
     """
     print(f"PROGRESS:STATUS:--> Downloading video to {os.path.basename(output_path)}...")
     
-    # Download video
-    video_url = post.video_url
-    with requests.get(video_url, stream=True) as r:
-        r.raise_for_status()
-        with open(output_path, 'wb') as f:
-            for chunk in r.iter_content(chunk_size=8192):
-                f.write(chunk)
+    # Download video over the shared keep-alive pool (resumable, expired URLs refreshed)
+    download_stats = (fetcher or media_fetcher).fetch(
+        post.video_url, output_path, refresh_url=refresh_url or (lambda: refresh_video_url(post))
+    )
     
     print(f"PROGRESS:STATUS:--> Video downloaded successfully")
     
@@ -112,26 +141,14 @@ def download_video_with_metadata(post, output_path: str) -> Dict[str, str]:
     original_caption = post.caption if post.caption else ""
     
     # Extract text from video using OCR
-    print(f"PROGRESS:STATUS:--> Extracting text from video using OCR...")
-    try:
-        ocr = OCRExtractor()
-        ocr_result = ocr.extract_text_from_middle_frame(output_path)
-        original_title = ocr_result.get('text', '')
-        
-        if original_title:
-            print(f"PROGRESS:STATUS:--> OCR found text: {original_title[:50]}...")
-        else:
-            print(f"PROGRESS:STATUS:--> No text detected in video")
-            original_title = ""
-    except Exception as e:
-        print(f"PROGRESS:WARNING:--> OCR failed: {e}")
-        original_title = ""
+    original_title = extract_ocr_text(output_path) if ocr else ""
     
     return {
         'video_path': output_path,
         'original_caption': original_caption,
         'original_title': original_title,
-        'url': f"https://www.instagram.com/p/{post.shortcode}/"
+        'url': f"https://www.instagram.com/p/{post.shortcode}/",
+        'download_stats': download_stats
     }
 
 
@@ -145,13 +162,7 @@ def download_video(post, output_path: str) -> str:
     """
     print(f"PROGRESS:STATUS:--> Downloading video to {os.path.basename(output_path)}...")
     
-    video_url = post.video_url
-    
-    with requests.get(video_url, stream=True) as r:
-        r.raise_for_status()
-        with open(output_path, 'wb') as f:
-            for chunk in r.iter_content(chunk_size=8192):
-                f.write(chunk)
+    media_fetcher.fetch(post.video_url, output_path, refresh_url=lambda: refresh_video_url(post))
     
     return output_path
 
@@ -159,8 +170,14 @@ def download_video(post, output_path: str) -> str:
 class InstagramDownloader:
     """Instagram downloader with OCR support and fixed URL parsing."""
 
-    def __init__(self):
-        self.loader = None
+    def __init__(self, session=None, store=None, metadata_cache=None, fetcher=None, download_dir: str = "temp"):
+        # The process-wide instances (see instagram_session, media_store...) unless private
+        # ones are given, e.g. by the stand-in benchmark
+        self.session = session or instagram_session
+        self.store = store or media_store
+        self.metadata_cache = metadata_cache or post_metadata_cache
+        self.fetcher = fetcher or media_fetcher
+        self.download_dir = Path(download_dir)
 
     def download_reel(self, url: str) -> Dict[str, str]:
         """
@@ -183,29 +200,62 @@ class InstagramDownloader:
             shortcode = parse_instagram_url(url)
             print(f"Extracted shortcode: {shortcode}")
 
-            # Initialize instaloader
-            L = initialize_instaloader()
-
-            # Get post data
-            post = get_post(L, shortcode)
-
-            if not post:
-                raise Exception("Failed to retrieve post data")
-
-            if not post.is_video:
-                raise Exception("This post does not contain a video")
-
-            # Create output path
-            temp_dir = Path("temp")
-            temp_dir.mkdir(exist_ok=True)
-
-            output_filename = f"reel_{shortcode}.mp4"
-            output_path = temp_dir / output_filename
-
-            # Download video WITH metadata (including OCR) ← KEY CHANGE!
-            metadata = download_video_with_metadata(post, str(output_path))
-
-            print(f"Download completed: {output_path}")
+            with self.store.lock_for(shortcode):
+                # Reuse a previous download of this reel (retries, re-processing, fan-out)
+                # The returned file is pinned until the caller's remove_if_unmanaged
+                stored = self.store.get(shortcode, pin=True)
+                if stored:
+                    print(f"♻️ Reusing stored media: {stored['video_path']}")
+                    return {
+                        'video_path': stored['video_path'],
+                        'original_caption': stored.get('original_caption', ''),
+                        'original_title': stored.get('original_title', ''),
+                        'url': stored.get('url', url)
+                    }
+
+                # Post data from the metadata cache, or through the shared logged-in session.
+                # A cached video URL that has expired is refreshed by the fetcher on failure.
+                post = get_post_cached(shortcode, self.session, self.metadata_cache)
+
+                if not post:
+                    raise Exception("Failed to retrieve post data")
+
+                if not post.is_video:
+                    raise Exception("This post does not contain a video")
+
+                # Create output path (a .part left by a failed run is resumed)
+                temp_dir = self.download_dir
+                temp_dir.mkdir(parents=True, exist_ok=True)
+
+                output_filename = f"reel_{shortcode}.mp4"
+                output_path = temp_dir / output_filename
+
+                # Download video; the fetcher hashes it while streaming
+                metadata = download_video_with_metadata(
+                    post, str(output_path), ocr=False, fetcher=self.fetcher,
+                    refresh_url=lambda: refresh_video_url(post, self.session, self.metadata_cache)
+                )
+                digest = metadata['download_stats'].get('sha256')
+
+                # OCR once per content: a repost of a stored video reuses its text
+                metadata['original_title'] = None
+                text_check = {}
+                if self.store.has_content(digest):
+                    metadata['original_title'] = self.store.get_artefact(digest, 'ocr_text')
+                if metadata['original_title'] is None:
+                    metadata['original_title'] = extract_ocr_text(str(output_path), text_check)
+
+                stored = self.store.put(shortcode, str(output_path), {
+                    'original_caption': metadata['original_caption'],
+                    'original_title': metadata['original_title'],
+                    'url': metadata['url']
+                }, sha256=digest, pin=True)
+                self.store.put_artefact(stored['sha256'], 'ocr_text', metadata['original_title'])
+                if text_check:
+                    self.store.put_artefact(stored['sha256'], 'text_check', text_check)
+                metadata['video_path'] = stored['video_path']
+
+            print(f"Download completed: {metadata['video_path']}")
             
             # Log what we extracted
             if metadata['original_title']:
@@ -248,4 +298,4 @@ def download_instagram_reel_legacy(url: str) -> Tuple[str, str]:
     Use download_instagram_reel() for new code.
     """
     downloader = InstagramDownloader()
-    return downloader.download_reel_legacy(url)
\ No newline at end of file
+    return downloader.download_reel_legacy(url)
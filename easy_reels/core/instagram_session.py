@@ -0,0 +1,188 @@
+"""
+Process-wide Instagram session.
+
+One logged-in Instaloader context is created on first use and shared by every
+download (single mode, batch threads, fan-out). The session file is loaded once and
+the account logs in again only when Instagram reports the session as expired.
+
+A 429 is not slept off inside Instaloader (its RateController waits minutes while
+holding the query lock): it is raised to the shared adaptive rate limiter, which
+pauses every caller and retries. The 429's Retry-After header is attached to the
+raised exception, so the limiter waits as long as Instagram asked.
+
+Instaloader's noisy retry messages are dropped by a filter wrapped around the
+context's own log/error methods, instead of redirecting the process-wide stderr.
+"""
+
+import threading
+import instaloader
+from instaloader.exceptions import (
+    LoginRequiredException, QueryReturnedForbiddenException, ConnectionException,
+    TooManyRequestsException
+)
+
+from .config_manager import config
+from .rate_limiter import metadata_rate_limiter
+
+# Log lines Instaloader prints for retries we do not care about
+NOISY_LOG_LINES = (
+    lambda line: "JSON Query to" in line and "/info/" in line,
+    lambda line: "Unable to fetch high-quality" in line,
+    lambda line: "JSON Query to" in line and "429" in line,  # reported by the rate limiter
+)
+
+
+def is_noisy_log_line(message: str) -> bool:
+    return any(is_noisy(message) for is_noisy in NOISY_LOG_LINES)
+
+
+def install_log_filter(context):
+    """Wrap context.log/context.error so noisy lines are dropped. Affects only this context."""
+    original_log, original_error = context.log, context.error
+
+    def filtered_log(*msg, sep='', end='\n', flush=False):
+        if not is_noisy_log_line(sep.join(str(m) for m in msg)):
+            original_log(*msg, sep=sep, end=end, flush=flush)
+
+    def filtered_error(msg, repeat_at_end=True):
+        if not is_noisy_log_line(str(msg)):
+            original_error(msg, repeat_at_end=repeat_at_end)
+
+    context.log = filtered_log
+    context.error = filtered_error
+
+
+def is_session_expired(error: Exception) -> bool:
+    """True when Instagram rejected the request because the login is no longer valid."""
+    if isinstance(error, (LoginRequiredException, QueryReturnedForbiddenException)):
+        return True
+    if isinstance(error, ConnectionException):
+        text = str(error).lower()
+        return "login" in text or "401" in text
+    return False
+
+
+def install_header_capture(context):
+    """
+    Wrap context.get_json so the headers of each response are kept for the rate
+    controller (Instaloader fills them in before it reports a 429).
+    """
+    original_get_json = context.get_json
+
+    def get_json(*args, response_headers=None, **kwargs):
+        if response_headers is None:
+            response_headers = {}
+        context._rate_controller.response_headers.value = response_headers
+        return original_get_json(*args, response_headers=response_headers, **kwargs)
+
+    context.get_json = get_json
+
+
+class SharedLimiterRateController(instaloader.RateController):
+    """Instaloader's rate controller, with 429 handling left to `metadata_rate_limiter`."""
+
+    def __init__(self, context):
+        super().__init__(context)
+        # Headers of the current thread's last response (set by install_header_capture)
+        self.response_headers = threading.local()
+
+    def handle_429(self, query_type: str) -> None:
+        error = TooManyRequestsException(f"429 Too Many Requests ({query_type})")
+        headers = getattr(self.response_headers, "value", None) or {}
+        retry_after = next((value for name, value in headers.items() if name.lower() == "retry-after"), None)
+        if retry_after is not None:
+            error.headers = {"Retry-After": retry_after}  # read by throttle_signal
+        raise error
+
+
+class InstagramSession:
+    """One authenticated Instaloader shared across the process, re-authenticated on expiry."""
+
+    def __init__(self, rate_limiter=None):
+        self.loader = None
+        # Paces metadata queries; the process-wide limiter unless a private one is given
+        self.rate_limiter = rate_limiter or metadata_rate_limiter
+        self.lock = threading.RLock()
+        # Instaloader's rate controller is not thread-safe: metadata queries are serialized,
+        # the (much longer) video downloads run outside the lock.
+        self.query_lock = threading.Lock()
+        self.generation = 0
+
+    def create_loader(self) -> instaloader.Instaloader:
+        L = instaloader.Instaloader(
+            quiet=False,
+            download_pictures=False,
+            download_video_thumbnails=False,
+            save_metadata=False,
+            compress_json=False,
+            download_geotags=False,
+            download_comments=False,
+            rate_controller=SharedLimiterRateController
+        )
+        install_log_filter(L.context)
+        install_header_capture(L.context)
+        return L
+
+    def get_loader(self) -> instaloader.Instaloader:
+        """The shared loader, created and logged in on first use."""
+        with self.lock:
+            if self.loader is None:
+                print("Initializing Instaloader and logging in...")
+                L = self.create_loader()
+                try:
+                    L.load_session_from_file(config.instagram_username)
+                    print("Loaded existing session")
+                except FileNotFoundError:
+                    self.login(L)
+                self.loader = L
+                self.generation += 1
+            return self.loader
+
+    def login(self, L: instaloader.Instaloader):
+        L.login(config.instagram_username, config.instagram_password)
+        L.save_session_to_file()
+        print("Login successful!")
+
+    def reauthenticate(self, seen_generation: int):
+        """
+        Log in again. Threads that saw the same expired session wait here, and only
+        the first one actually logs in.
+        """
+        with self.lock:
+            if self.generation != seen_generation:
+                return
+            print("PROGRESS:STATUS:--> Instagram session expired, logging in again...")
+            L = self.create_loader()
+            self.login(L)
+            self.loader = L
+            self.generation += 1
+
+    def get_post(self, shortcode: str) -> instaloader.Post:
+        """
+        Fetch post metadata, paced by the session's adaptive rate limiter (throttled calls
+        wait and retry), logging in again once if the session has expired.
+        """
+        def query(L):
+            with self.query_lock:
+                return instaloader.Post.from_shortcode(L.context, shortcode)
+
+        for attempt in range(2):
+            L = self.get_loader()
+            generation = self.generation
+            try:
+                return self.rate_limiter.call(query, L)
+            except Exception as e:
+                if attempt == 0 and is_session_expired(e):
+                    self.reauthenticate(generation)
+                    continue
+                raise
+
+    def reset(self):
+        """Forget the shared loader (next use loads the session file again)."""
+        with self.lock:
+            self.loader = None
+            self.generation += 1
+
+
+# Global session instance
+instagram_session = InstagramSession()
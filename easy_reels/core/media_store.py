@@ -0,0 +1,476 @@
+"""
+Content-addressed store of downloaded reels.
+
+A finished download is moved into `temp/media/<sha256>.mp4`; each Instagram shortcode
+is a link to the content hash it downloaded, with its caption and OCR text. Reposts
+of the same video under different shortcodes therefore share one file, and every
+analysis artefact (probe, crop, trim plan, OCR text) is stored per content hash, so
+it is computed once no matter how many shortcodes point at the video.
+
+Re-processing a URL, fan-out renders and retries of failed jobs reuse the stored
+file instead of downloading again. Files are evicted least-recently-used first once
+the store exceeds its disk budget (links to an evicted file are dropped); a file
+whose hash no longer matches is dropped and downloaded again.
+
+The index is kept in memory. Changes (new files, links, artefacts, removals) are
+written at once; the index file is only read again when another process has written
+it since (its mtime or size changed). Marking a file as recently used is written with
+the next change, or by `flush()`.
+
+A file handed to a job is pinned until the job is done with it (`get`/`put` with
+`pin=True`, released by `remove_if_unmanaged`), and pinned files are never evicted:
+on Linux removing a file that a queued or rendering job still needs would succeed.
+Pins are stored in the index with the owning pid and a lease, so eviction in any
+process sees them, and a pin that is never released (a crashed job) expires.
+"""
+
+import os
+import json
+import time
+import uuid
+import hashlib
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from .config_manager import config
+
+HASH_BLOCK = 1024 * 1024
+
+
+def sha256_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def to_json_value(value):
+    """JSON fallback for numpy scalars in artefacts (e.g. crop coordinates)."""
+    if hasattr(value, "item"):
+        return value.item()
+    raise TypeError(f"Not JSON serializable: {type(value).__name__}")
+
+
+class MediaStore:
+    """Reel files keyed by content hash, linked from Instagram shortcodes, with LRU eviction by size."""
+
+    def __init__(self, store_dir: str = "temp/media", budget_mb: int = None):
+        self.store_dir = Path(store_dir)
+        self.index_file = self.store_dir / "index.json"
+        self.budget_bytes = (budget_mb if budget_mb is not None else config.media_store_mb) * 1024 * 1024
+        self.lock = threading.RLock()
+        # objects: sha256 -> file + artefacts, links: shortcode -> sha256 + post metadata
+        # (read on first use, so importing the module touches no files)
+        self._objects, self._links = None, None
+        # Removed here, so not brought back when merging the index written by another process
+        self.removed_objects, self.removed_links = set(), set()
+        # (mtime, size) of the index file when this process last read or wrote it
+        self.index_stamp = None
+        # True when last_used times changed since the index was written
+        self.dirty = False
+        # Hashes already checked this session (file untouched since)
+        self.verified = set()
+        self.key_locks = {}
+        # sha256 -> tokens of the pins this process holds (one per job using the file)
+        self.my_pins = {}
+        self.stats = {"deduplicated": 0, "artefact_hits": 0, "artefact_misses": 0}
+
+    def ensure_loaded(self):
+        """Create the store directory and read its index, once."""
+        with self.lock:
+            if self._objects is None:
+                self.store_dir.mkdir(parents=True, exist_ok=True)
+                self.index_stamp = self.index_signature()
+                self._objects, self._links = self.load_index()
+
+    @property
+    def objects(self) -> Dict:
+        self.ensure_loaded()
+        return self._objects
+
+    @objects.setter
+    def objects(self, value: Dict):
+        self._objects = value
+
+    @property
+    def links(self) -> Dict:
+        self.ensure_loaded()
+        return self._links
+
+    @links.setter
+    def links(self, value: Dict):
+        self._links = value
+
+    def index_signature(self):
+        try:
+            stat = self.index_file.stat()
+            return stat.st_mtime_ns, stat.st_size
+        except OSError:
+            return None
+
+    def load_index(self, migrate: bool = True):
+        try:
+            if self.index_file.exists():
+                with open(self.index_file, "r", encoding="utf-8") as f:
+                    index = json.load(f)
+                if "objects" not in index:
+                    return self.migrate_index(index) if migrate else ({}, {})
+                objects = {k: v for k, v in index["objects"].items() if os.path.exists(v.get("video_path", ""))}
+                links = {k: v for k, v in index.get("links", {}).items() if v.get("sha256") in objects}
+                return objects, links
+        except Exception as e:
+            print(f"--> Failed to load media store index: {e}")
+        return {}, {}
+
+    def merge_from_disk(self, force: bool = False):
+        """
+        Merge the index another process (e.g. a render worker) has written since this
+        one last read or wrote it: new objects, links and artefacts are added, and files
+        that process evicted are dropped. Skipped when the file is unchanged.
+        """
+        with self.lock:
+            self.ensure_loaded()
+            signature = self.index_signature()
+            if signature == self.index_stamp and not force:
+                return
+            self.index_stamp = signature
+            objects, links = self.load_index(migrate=False)
+            for digest in [d for d, o in self.objects.items()
+                           if d not in objects and not os.path.exists(o["video_path"])]:
+                self.drop_object(digest)
+            for digest, obj in objects.items():
+                if digest in self.removed_objects:
+                    continue
+                mine = self.objects.get(digest)
+                if mine is None:
+                    obj["pins"] = self.merge_pins(digest, obj.get("pins", {}), {})
+                    self.objects[digest] = obj
+                else:
+                    mine["artefacts"] = dict(obj.get("artefacts", {}), **mine.get("artefacts", {}))
+                    mine["last_used"] = max(mine.get("last_used", 0), obj.get("last_used", 0))
+                    mine["pins"] = self.merge_pins(digest, obj.get("pins", {}), mine.get("pins", {}))
+            for shortcode, link in links.items():
+                if shortcode not in self.links and shortcode not in self.removed_links \
+                        and link["sha256"] in self.objects:
+                    self.links[shortcode] = link
+
+    def merge_pins(self, digest: str, disk_pins: Dict, my_pins: Dict) -> Dict:
+        """Other processes' unexpired pins as on disk, plus the ones this process still holds."""
+        now, held = time.time(), self.my_pins.get(digest, [])
+        pins = {token: pin for token, pin in disk_pins.items()
+                if pin.get("pid") != os.getpid() and pin.get("expires", 0) > now}
+        pins.update({token: pin for token, pin in my_pins.items() if token in held})
+        return pins
+
+    def migrate_index(self, entries: Dict):
+        """Convert the old shortcode-keyed index (temp/media/<shortcode>.mp4) to objects + links."""
+        objects, links = {}, {}
+        for shortcode, entry in entries.items():
+            old_path, digest = entry.get("video_path", ""), entry.get("sha256")
+            if not digest or not os.path.exists(old_path):
+                continue
+            target = self.path_for(digest)
+            try:
+                if target.exists():
+                    os.remove(old_path)
+                else:
+                    os.replace(old_path, target)
+            except Exception as e:
+                print(f"--> Could not migrate stored media {shortcode}: {e}")
+                continue
+            objects[digest] = {
+                "sha256": digest,
+                "video_path": str(target),
+                "size": target.stat().st_size,
+                "stored": entry.get("stored", time.time()),
+                "last_used": max(entry.get("last_used", 0), objects.get(digest, {}).get("last_used", 0)),
+                "artefacts": {"ocr_text": entry.get("original_title", "")}
+            }
+            links[shortcode] = {
+                "sha256": digest,
+                "original_caption": entry.get("original_caption", ""),
+                "original_title": entry.get("original_title", ""),
+                "url": entry.get("url"),
+                "linked": entry.get("stored", time.time())
+            }
+        print(f"--> Migrated {len(links)} stored reels to content-addressed storage")
+        return objects, links
+
+    def save_index(self):
+        try:
+            with self.lock:
+                self.merge_from_disk()
+                temp_path = self.index_file.with_suffix(f".{os.getpid()}.tmp")
+                with open(temp_path, "w", encoding="utf-8") as f:
+                    json.dump({"objects": self.objects, "links": self.links}, f,
+                              indent=2, ensure_ascii=False, default=to_json_value)
+                os.replace(temp_path, self.index_file)
+                self.index_stamp = self.index_signature()
+                self.dirty = False
+        except Exception as e:
+            print(f"--> Failed to save media store index: {e}")
+
+    def flush(self):
+        """Write pending last-used times and pick up changes made by other processes."""
+        with self.lock:
+            if self.dirty:
+                self.save_index()
+            else:
+                self.merge_from_disk()
+
+    def lock_for(self, shortcode: str) -> threading.Lock:
+        """Per-shortcode lock so two jobs for the same reel download it only once."""
+        with self.lock:
+            return self.key_locks.setdefault(shortcode, threading.Lock())
+
+    def path_for(self, digest: str) -> Path:
+        return self.store_dir / f"{digest}.mp4"
+
+    def hash_for_path(self, path: str) -> Optional[str]:
+        """Content hash of a stored file, or None if `path` is not managed by the store."""
+        if not path or not self.owns(path):
+            return None
+        digest = Path(path).stem
+        with self.lock:
+            if digest not in self.objects:
+                self.merge_from_disk()
+            return digest if digest in self.objects else None
+
+    def _verify(self, digest: str, verify: bool) -> bool:
+        """Size check, plus one hash check per session. A corrupt object is removed."""
+        obj = self.objects.get(digest)
+        if not obj:
+            return False
+        video_path = obj["video_path"]
+        valid = os.path.exists(video_path) and os.path.getsize(video_path) == obj.get("size")
+        if valid and verify and digest not in self.verified:
+            valid = sha256_file(video_path) == digest
+            if valid:
+                self.verified.add(digest)
+        if not valid:
+            print(f"--> Stored media {digest[:12]} is missing or corrupt, it will be downloaded again")
+            self.remove_object(digest)
+        return valid
+
+    def get(self, shortcode: str, verify: bool = True, pin: bool = False) -> Optional[Dict]:
+        """
+        Stored entry for `shortcode` (link metadata + file, marked as recently used), or
+        None. With `pin` the file is kept from eviction until `remove_if_unmanaged`.
+        """
+        with self.lock:
+            link = self.links.get(shortcode)
+            if not link or not self._verify(link["sha256"], verify):
+                return None
+            obj = self.objects[link["sha256"]]
+            obj["last_used"] = time.time()
+            self.dirty = True
+            if pin:
+                self.pin(link["sha256"])
+                self.save_index()
+            return dict(link, shortcode=shortcode, video_path=obj["video_path"], size=obj["size"])
+
+    def has_content(self, digest: str) -> bool:
+        with self.lock:
+            return bool(digest) and self._verify(digest, verify=False)
+
+    def put(self, shortcode: str, file_path: str, metadata: Dict = None, sha256: str = None,
+            pin: bool = False) -> Dict:
+        """
+        Store a finished download and link `shortcode` to it. `sha256` is the hash the
+        fetcher computed while downloading (the file is hashed here otherwise). If the
+        content is already stored (a repost), the new file is deleted and the link reuses it.
+        `pin` as for `get`.
+        """
+        digest = sha256 or sha256_file(file_path)
+        target = self.path_for(digest)
+        with self.lock:
+            if digest in self.objects and self._verify(digest, verify=False):
+                if os.path.abspath(file_path) != os.path.abspath(target):
+                    try: os.remove(file_path)
+                    except Exception: pass
+                self.stats["deduplicated"] += 1
+                print(f"♻️ {shortcode} has the same video as an earlier download, reusing it")
+            else:
+                if os.path.abspath(file_path) != os.path.abspath(target):
+                    os.replace(file_path, target)
+                self.objects[digest] = {
+                    "sha256": digest,
+                    "video_path": str(target),
+                    "size": target.stat().st_size,
+                    "stored": time.time(),
+                    "artefacts": {}
+                }
+            obj = self.objects[digest]
+            obj["last_used"] = time.time()
+            self.verified.add(digest)
+            if pin:
+                self.pin(digest)
+
+            link = dict(metadata or {})
+            link.update({"sha256": digest, "linked": time.time()})
+            self.links[shortcode] = link
+            self.removed_objects.discard(digest)
+            self.removed_links.discard(shortcode)
+            self.evict(keep=digest)
+            self.save_index()
+            return dict(link, shortcode=shortcode, video_path=obj["video_path"], size=obj["size"])
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # ARTEFACTS (per content hash)
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    def get_artefact(self, digest: str, name: str, default: Any = None) -> Any:
+        with self.lock:
+            artefacts = self.objects.get(digest, {}).get("artefacts", {})
+            return artefacts.get(name, default)
+
+    def put_artefact(self, digest: str, name: str, value: Any):
+        with self.lock:
+            obj = self.objects.get(digest)
+            if obj is None:
+                return
+            # Stored through a JSON round trip so numpy scalars become plain numbers
+            obj.setdefault("artefacts", {})[name] = json.loads(json.dumps(value, default=to_json_value))
+            self.save_index()
+
+    def cached_artefact(self, video_path: str, name: str, compute: Callable[[], Any]) -> Any:
+        """
+        Artefact `name` of the video at `video_path`, computed by `compute()` only the
+        first time its content is seen. Files outside the store are always computed.
+        """
+        digest = self.hash_for_path(video_path)
+        if digest:
+            with self.lock:
+                # Another process may have computed it since (a stat when nothing changed)
+                self.merge_from_disk()
+                artefacts = self.objects.get(digest, {}).get("artefacts", {})
+                if name in artefacts:
+                    self.stats["artefact_hits"] += 1
+                    return artefacts[name]
+                self.stats["artefact_misses"] += 1
+        value = compute()
+        if digest:
+            self.put_artefact(digest, name, value)
+        return value
+
+    # ═══════════════════════════════════════════════════════════════════════════
+    # CLEANUP
+    # ═══════════════════════════════════════════════════════════════════════════
+
+    def owns(self, path: str) -> bool:
+        """True if `path` is a file managed by the store (callers must not delete it)."""
+        try:
+            return Path(path).resolve().parent == self.store_dir.resolve()
+        except Exception:
+            return False
+
+    def pin(self, digest: str):
+        """Keep a stored file from eviction for one more job (saved with the index)."""
+        token = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.objects[digest].setdefault("pins", {})[token] = {
+            "pid": os.getpid(),
+            "expires": time.time() + config.media_pin_lease_hours * 3600
+        }
+        self.my_pins.setdefault(digest, []).append(token)
+
+    def is_pinned(self, obj: Dict) -> bool:
+        now = time.time()
+        return any(pin.get("expires", 0) > now for pin in obj.get("pins", {}).values())
+
+    def unpin(self, path: str):
+        """Release one job's pin on a stored file (it may be evicted again once unpinned)."""
+        digest = Path(path).stem
+        with self.lock:
+            tokens = self.my_pins.get(digest)
+            if not tokens:
+                return
+            token = tokens.pop()
+            if not tokens:
+                self.my_pins.pop(digest)
+            self.objects.get(digest, {}).get("pins", {}).pop(token, None)
+            self.save_index()
+
+    def remove_if_unmanaged(self, path: str) -> bool:
+        """
+        Done with a source video after a job: a stored file is unpinned and kept for
+        reuse, any other file is deleted.
+        """
+        if not path:
+            return False
+        if self.owns(path):
+            self.unpin(path)
+            return False
+        if not os.path.exists(path):
+            return False
+        try:
+            os.remove(path)
+            return True
+        except Exception:
+            return False
+
+    def remove(self, shortcode: str):
+        """Forget a shortcode, and its file once no other shortcode links to it."""
+        with self.lock:
+            link = self.links.pop(shortcode, None)
+            self.removed_links.add(shortcode)
+            if link and not any(l["sha256"] == link["sha256"] for l in self.links.values()):
+                self.remove_object(link["sha256"])
+            self.save_index()
+
+    def drop_object(self, digest: str):
+        """Forget an object and every link to it (the file is left alone)."""
+        self.objects.pop(digest, None)
+        self.verified.discard(digest)
+        self.removed_objects.add(digest)
+        for shortcode in [k for k, v in self.links.items() if v["sha256"] == digest]:
+            self.links.pop(shortcode)
+            self.removed_links.add(shortcode)
+
+    def remove_object(self, digest: str):
+        with self.lock:
+            obj = self.objects.get(digest)
+            self.drop_object(digest)
+            if obj and os.path.exists(obj["video_path"]):
+                try: os.remove(obj["video_path"])
+                except Exception: pass
+            self.save_index()
+
+    def evict(self, keep: str = None):
+        """
+        Remove least-recently-used files (and their links) until the store fits its disk
+        budget. Pinned files, still used by a job in this or another process, are skipped.
+        """
+        with self.lock:
+            self.merge_from_disk()
+            total = sum(o.get("size", 0) for o in self.objects.values())
+            for digest, obj in sorted(self.objects.items(), key=lambda item: item[1].get("last_used", 0)):
+                if total <= self.budget_bytes:
+                    break
+                if digest == keep or self.is_pinned(obj):
+                    continue
+                try:
+                    if os.path.exists(obj["video_path"]):
+                        os.remove(obj["video_path"])
+                except Exception as e:
+                    # Still open by a render (Windows); try again on the next eviction
+                    print(f"--> Could not evict {obj['video_path']}: {e}")
+                    continue
+                total -= obj.get("size", 0)
+                self.drop_object(digest)
+                print(f"--> Evicted stored media: {digest[:12]}")
+
+    def get_stats(self) -> Dict:
+        with self.lock:
+            return dict(self.stats, **{
+                "entries": len(self.links),
+                "objects": len(self.objects),
+                "pinned": sum(1 for o in self.objects.values() if self.is_pinned(o)),
+                "size_mb": sum(o.get("size", 0) for o in self.objects.values()) / (1024 * 1024),
+                "budget_mb": self.budget_bytes / (1024 * 1024)
+            })
+
+
+# Global media store instance
+media_store = MediaStore()
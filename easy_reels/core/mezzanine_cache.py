@@ -0,0 +1,206 @@
+"""
+Mezzanine cache for fast re-renders.
+
+Keeps the cropped, trimmed and scaled (1080 wide) video track of recent jobs as a
+near-lossless intermediate, together with the crop/trim/layout metadata it was built
+with. Re-rendering the same job with a different title then only composites the
+overlay onto this track - no crop detection, dead-air analysis or crop encode.
+
+The track is built on the first re-render of a job (`build_mezzanine`), not on its
+first render, so a reel that is never re-rendered pays no extra encode. Entries are
+keyed by the content hash of the source recorded when the job was first rendered, so
+a cached track is still found after the download itself was evicted.
+
+Entries are evicted least-recently-used first once the cache exceeds its disk budget.
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+# Import MoviePy - handle both versions
+try:
+    from moviepy import VideoFileClip
+except ImportError:
+    from moviepy.editor import VideoFileClip
+
+from .config_manager import config
+from .video_processor import SCREEN_SIZE
+from .media_store import media_store, sha256_file
+
+MEZZANINE_CRF = 10  # 0 is lossless; 10 is visually lossless at a fraction of the size
+MEZZANINE_PRESET = "veryfast"
+
+
+def content_hash_for(input_path: str) -> str:
+    """Content hash of a source video (the media store's, else hashed here); fails if the file is gone."""
+    if not input_path or not os.path.exists(input_path):
+        raise FileNotFoundError(f"Source video is no longer available ({input_path}) - process the reel again")
+    return media_store.hash_for_path(input_path) or sha256_file(input_path)
+
+
+class MezzanineCache:
+    """Disk cache of cropped/scaled video tracks keyed by job, with LRU eviction."""
+
+    def __init__(self, cache_dir: str = "temp/mezzanine", budget_mb: int = None):
+        self.cache_dir = Path(cache_dir)
+        self.index_file = self.cache_dir / "index.json"
+        self.budget_bytes = (budget_mb if budget_mb is not None else config.mezzanine_cache_mb) * 1024 * 1024
+        self.lock = threading.RLock()
+        self._entries = None  # read on first use, so importing the module touches no files
+
+    @property
+    def entries(self) -> Dict:
+        """Entries by key; the cache directory is created and the index read on first use."""
+        with self.lock:
+            if self._entries is None:
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                self._entries = self.load_index()
+            return self._entries
+
+    def load_index(self) -> Dict:
+        """Load the index, dropping entries whose track file has disappeared."""
+        try:
+            if self.index_file.exists():
+                with open(self.index_file, 'r', encoding='utf-8') as f:
+                    entries = json.load(f)
+                return {k: v for k, v in entries.items() if os.path.exists(v.get('track_path', ''))}
+        except Exception as e:
+            print(f"--> Failed to load mezzanine index: {e}")
+        return {}
+
+    def save_index(self):
+        try:
+            with open(self.index_file, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f, indent=2)
+        except Exception as e:
+            print(f"--> Failed to save mezzanine index: {e}")
+
+    @staticmethod
+    def make_key(content_hash: str, options: dict = None) -> str:
+        """
+        Cache key for a job: the content hash of its source (reposts under other URLs
+        share the track). Trim settings are part of the key since they change the track.
+        """
+        options = options or {}
+        trim_id = f"{options.get('max_duration')}|{bool(options.get('trim_dead_air'))}"
+        return hashlib.sha1(f"{content_hash}|{trim_id}".encode('utf-8')).hexdigest()[:20]
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Cached entry for `key` (marked as recently used), or None."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if not entry:
+                return None
+            if not os.path.exists(entry['track_path']):
+                self.entries.pop(key, None)
+                self.save_index()
+                return None
+            entry['last_used'] = time.time()
+            self.save_index()
+            return dict(entry)
+
+    def build(self, key: str, input_path: str, crop_info: dict = None, trim: dict = None) -> Dict:
+        """Encode the cropped/trimmed/scaled track for `input_path` and add it to the cache."""
+        track_path = self.cache_dir / f"{key}.mp4"
+        temp_path = self.cache_dir / f"{key}.{os.getpid()}.{threading.get_ident()}.tmp.mp4"
+        clip = None
+        try:
+            print(f"--> Building mezzanine track: {track_path.name}")
+            clip = VideoFileClip(input_path)
+            track = clip
+            if trim:
+                track = track.subclip(trim['start_time'], min(trim['end_time'], clip.duration))
+            if crop_info:
+                track = track.crop(
+                    x1=crop_info['x'],
+                    y1=crop_info['y'],
+                    x2=crop_info['x'] + crop_info['w'],
+                    y2=crop_info['y'] + crop_info['h']
+                )
+            track = track.resize(width=SCREEN_SIZE[0])
+
+            track.write_videofile(
+                str(temp_path),
+                codec='libx264',
+                audio_codec='aac',
+                audio_bitrate='320k',
+                preset=MEZZANINE_PRESET,
+                ffmpeg_params=['-crf', str(MEZZANINE_CRF)],
+                logger=None
+            )
+            content_size = track.size
+            fps = clip.fps
+        finally:
+            if clip is not None:
+                clip.close()
+
+        os.replace(temp_path, track_path)
+        entry = {
+            'track_path': str(track_path),
+            'source_path': str(input_path),
+            'crop_info': crop_info,
+            'trim': trim,
+            'content_size': list(content_size),
+            'fps': fps,
+            'size_bytes': track_path.stat().st_size,
+            'created': time.time(),
+            'last_used': time.time()
+        }
+
+        with self.lock:
+            self.entries[key] = entry
+            self.evict(keep=key)
+            self.save_index()
+        print(f"--> Mezzanine track cached ({entry['size_bytes'] / (1024 * 1024):.1f} MB)")
+        return dict(entry)
+
+    def evict(self, keep: str = None):
+        """Remove least-recently-used tracks until the cache fits its disk budget."""
+        with self.lock:
+            total = sum(e.get('size_bytes', 0) for e in self.entries.values())
+            for key, entry in sorted(self.entries.items(), key=lambda item: item[1].get('last_used', 0)):
+                if total <= self.budget_bytes:
+                    break
+                if key == keep:
+                    continue
+                try:
+                    if os.path.exists(entry['track_path']):
+                        os.remove(entry['track_path'])
+                except Exception as e:
+                    print(f"--> Could not evict {entry['track_path']}: {e}")
+                    continue
+                total -= entry.get('size_bytes', 0)
+                self.entries.pop(key, None)
+                print(f"--> Evicted mezzanine track: {Path(entry['track_path']).name}")
+
+    def invalidate(self, key: str):
+        """Drop one entry and its track."""
+        with self.lock:
+            entry = self.entries.pop(key, None)
+            if entry and os.path.exists(entry['track_path']):
+                try: os.remove(entry['track_path'])
+                except Exception: pass
+            self.save_index()
+
+    def clear(self):
+        """Remove every cached track."""
+        with self.lock:
+            for key in list(self.entries):
+                self.invalidate(key)
+
+    def get_stats(self) -> Dict:
+        with self.lock:
+            return {
+                'entries': len(self.entries),
+                'size_mb': sum(e.get('size_bytes', 0) for e in self.entries.values()) / (1024 * 1024),
+                'budget_mb': self.budget_bytes / (1024 * 1024)
+            }
+
+
+# Global mezzanine cache instance
+mezzanine_cache = MezzanineCache()
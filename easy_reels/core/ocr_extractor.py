@@ -1,28 +1,361 @@
 """
 OCR Text Extractor Module
 Extracts text from video frames using Tesseract OCR
+
+Multi-frame mode samples several frames across the video, drops near-identical
+ones (close perceptual hash and the same text regions) so Tesseract never reads the
+same image twice, and merges the lines read from the remaining frames into one
+consensus text. Text is cached under a hash of the exact region images Tesseract
+reads, so frames repeated across reels (a channel's intro card) are read once, and a
+frame whose caption differs never gets another frame's text.
+
+Tesseract is not given whole frames: candidate text regions are found with a
+morphological gradient and a horizontal closing (text lines are dense clusters of
+strong edges), and only those regions are cropped, rescaled to a line height
+Tesseract reads well, and binarized. The regions are read by the shared worker pool
+(see ocr_pool), all regions of all new frames of a video in one parallel batch.
+
+Before any of that, a text-presence check on a small copy of each frame decides
+whether OCR is worth running: burned-in text shows up as chains of letter-sized
+stroke blobs (top-hat / black-hat, connected components; letters run together at the
+check size are split into letter-wide pieces) of similar height on one baseline, which
+smooth scenery does not produce. Frames judged text-free skip region detection and
+Tesseract; the decision and its confidence are returned with the result. The check is
+tested for recall on synthetic captioned frames (tests/test_text_check.py).
 """
 
 import cv2
+import time
+import hashlib
 import pytesseract
-from PIL import Image
+import numpy as np
 import os
-from pathlib import Path
-from typing import Optional, Dict
-import tempfile
+from collections import Counter
+from difflib import SequenceMatcher
+from typing import Optional, Dict, List
+
+from .config_manager import config
+from .ocr_pool import ocr_pool
+from .sqlite_store import SQLiteStore, trim
+from .video_fingerprint import phash, hamming
+
+FRAME_DEDUPE_DISTANCE = 4  # pHash bits; a changed caption may move none, so text regions are compared too
+TEXT_CHANGE_PIXELS = 40  # differing pixels (beyond edge jitter) at which two region images read differently
+REGION_SIZE_TOLERANCE = 0.05  # region images differing more in size are different text
+LINE_SIMILARITY = 0.8  # OCR variants of one line (a misread letter or two) are merged
+MIN_LINE_CHARS = 3
+MIN_ALNUM_RATIO = 0.5  # lines read from textures are mostly punctuation
+OCR_PIPELINE_VERSION = 4  # part of the frame cache key: bump when preprocessing changes
+
+# Text-region detection
+REGION_WORK_WIDTH = 640  # regions are searched on a downscaled copy of the frame
+MIN_EDGE_STRENGTH = 40  # gradient threshold floor, so soft backgrounds are not "text"
+MIN_REGION_FILL = 0.45  # share of a line's box covered once its letters are closed together
+MAX_REGION_HEIGHT = 0.2  # of the frame: taller boxes are scenery, not a line of text
+TEXT_LINE_HEIGHT = 40  # px per text line handed to Tesseract
+MAX_UPSCALE = 2.0
+MAX_REGIONS = 12
+
+# Text-presence check
+TEXT_CHECK_WIDTH = 540
+STROKE_KERNEL = 15  # px at TEXT_CHECK_WIDTH: strokes thinner than this survive top/black-hat
+MIN_STROKE_CONTRAST = 40
+CHAR_FILL = (0.15, 0.85)  # letters cover part of their box; solid blocks and specks do not
+CHAR_ASPECT = (0.1, 1.5)  # width / height of a letter blob
+RUN_ASPECT = 12.0  # wider blobs up to this are letters run together, split at RUN_LETTER_WIDTH
+RUN_LETTER_WIDTH = 0.7  # of the blob height
+RUN_MIN_FILL = 0.45  # runs of letters are dense; stroke lines crossing the frame are not
+# (min chain length, max gap and max baseline offset in letter heights, max height ratio)
+LOOSE_CHAIN = (3, 1.5, 0.4, 2.0)  # anything word-like: no such chain -> OCR is skipped
+STRICT_CHAIN = (4, 1.2, 0.15, 1.6)  # clean words on one baseline: raises the confidence
+CERTAIN_CHAINS = 3  # strict words at which "has text" is certain
+
+
+class FrameTextCache:
+    """
+    OCR text by hash of a frame's prepared region images (exactly what Tesseract reads),
+    in SQLite so it is shared across runs and processes. Entries expire after
+    OCR_CACHE_TTL_HOURS; beyond OCR_CACHE_MAX_ENTRIES the least recently used go.
+    """
+
+    def __init__(self, db_path: str = "temp/ocr_frames.sqlite3"):
+        self.db = SQLiteStore(db_path, self.setup)
+        self.stats = {"hits": 0, "misses": 0}
+
+    @staticmethod
+    def setup(conn):
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS frame_text (
+                frame_hash TEXT PRIMARY KEY,
+                text TEXT,
+                created REAL,
+                last_used REAL
+            )
+        """)
+        if "last_used" not in [row[1] for row in conn.execute("PRAGMA table_info(frame_text)")]:
+            conn.execute("ALTER TABLE frame_text ADD COLUMN last_used REAL")
+            conn.execute("UPDATE frame_text SET last_used = created")
+        conn.execute("CREATE INDEX IF NOT EXISTS frame_text_last_used ON frame_text (last_used)")
+        # Entries of earlier pipeline versions can no longer be hit
+        conn.execute("DELETE FROM frame_text WHERE frame_hash NOT LIKE ?", (f"%:{OCR_PIPELINE_VERSION}",))
+
+    @staticmethod
+    def key(region_images: List[np.ndarray]) -> str:
+        """sha256 of the region images: equal only when Tesseract would read identical input."""
+        digest = hashlib.sha256()
+        for image in region_images:
+            digest.update(np.array(image.shape, np.int64).tobytes())
+            digest.update(np.ascontiguousarray(image).tobytes())
+        return f"{digest.hexdigest()}:{OCR_PIPELINE_VERSION}"
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self.db.transaction() as conn:
+            row = conn.execute("SELECT text, created FROM frame_text WHERE frame_hash = ?", (key,)).fetchone()
+            if row and now - row[1] > config.ocr_cache_ttl_hours * 3600:
+                conn.execute("DELETE FROM frame_text WHERE frame_hash = ?", (key,))
+                row = None
+            if row:
+                conn.execute("UPDATE frame_text SET last_used = ? WHERE frame_hash = ?", (now, key))
+            self.stats["hits" if row else "misses"] += 1
+        return row[0] if row else None
+
+    def put(self, key: str, text: str):
+        """Store a frame's text, then drop expired entries and trim to the size limit."""
+        now = time.time()
+        with self.db.transaction() as conn:
+            conn.execute("INSERT OR REPLACE INTO frame_text (frame_hash, text, created, last_used) "
+                         "VALUES (?, ?, ?, ?)", (key, text, now, now))
+            trim(conn, "frame_text", "frame_hash", config.ocr_cache_ttl_hours * 3600, config.ocr_cache_max_entries)
+
+    def get_stats(self) -> Dict:
+        with self.db.transaction() as conn:
+            entries = conn.execute("SELECT COUNT(*) FROM frame_text").fetchone()[0]
+        return dict(self.stats, entries=entries)
+
+
+def line_boxes(lines: np.ndarray, frame_height: int, offset: tuple = (0, 0), split: bool = True) -> List[list]:
+    """
+    [x, y, w, h, line_height] of the text-line blobs in a closed edge mask. A sparse
+    blob - usually a line joined to the thin border of its caption box - is opened to
+    drop the thin edges and searched once more.
+    """
+    boxes = []
+    contours, _ = cv2.findContours(lines, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    for contour in contours:
+        x, y, w, h = cv2.boundingRect(contour)
+        if h < 6 or w < 2 * h or h > frame_height * MAX_REGION_HEIGHT:
+            continue
+        blob = lines[y:y + h, x:x + w]
+        if cv2.countNonZero(blob) / float(w * h) >= MIN_REGION_FILL:
+            boxes.append([x + offset[0], y + offset[1], w, h, h])
+        elif split:
+            opened = cv2.morphologyEx(blob, cv2.MORPH_OPEN, cv2.getStructuringElement(cv2.MORPH_RECT, (5, 5)))
+            boxes.extend(line_boxes(opened, frame_height, (x + offset[0], y + offset[1]), split=False))
+    return boxes
+
+
+def find_text_regions(gray: np.ndarray) -> List[tuple]:
+    """
+    Candidate text blocks in a grayscale frame as (x, y, w, h, line_height), top to
+    bottom, in frame coordinates. Neighbouring lines of one caption are merged.
+    """
+    scale = min(1.0, REGION_WORK_WIDTH / float(gray.shape[1]))
+    small = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA) if scale < 1 else gray
+
+    gradient = cv2.morphologyEx(small, cv2.MORPH_GRADIENT, cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3)))
+    otsu, _ = cv2.threshold(gradient, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+    _, edges = cv2.threshold(gradient, max(otsu, MIN_EDGE_STRENGTH), 255, cv2.THRESH_BINARY)
+    # Close the gaps between letters and words so each line becomes one blob
+    lines = cv2.morphologyEx(edges, cv2.MORPH_CLOSE, cv2.getStructuringElement(cv2.MORPH_RECT, (17, 3)))
+    boxes = line_boxes(lines, small.shape[0])
+
+    # Merge lines that are stacked closely and overlap horizontally into one block
+    boxes.sort(key=lambda box: box[1])
+    blocks = []
+    for box in boxes:
+        for block in blocks:
+            gap = box[1] - (block[1] + block[3])
+            overlap = min(box[0] + box[2], block[0] + block[2]) - max(box[0], block[0])
+            if gap < block[4] and overlap > 0:
+                right, bottom = max(block[0] + block[2], box[0] + box[2]), max(block[1] + block[3], box[1] + box[3])
+                block[0], block[1] = min(block[0], box[0]), min(block[1], box[1])
+                block[2], block[3] = right - block[0], bottom - block[1]
+                block[4] = max(block[4], box[4])
+                break
+        else:
+            blocks.append(list(box))
+
+    blocks = sorted(blocks, key=lambda block: block[2] * block[3], reverse=True)[:MAX_REGIONS]
+    regions = []
+    height, width = gray.shape[:2]
+    for x, y, w, h, line_height in sorted(blocks, key=lambda block: (block[1], block[0])):
+        pad = max(2, line_height // 4)
+        x0, y0 = max(0, int((x - pad) / scale)), max(0, int((y - pad) / scale))
+        x1, y1 = min(width, int((x + w + pad) / scale)), min(height, int((y + h + pad) / scale))
+        regions.append((x0, y0, x1 - x0, y1 - y0, max(1, int(line_height / scale))))
+    return regions
+
+
+def prepare_region(gray: np.ndarray, region: tuple) -> np.ndarray:
+    """Crop of one text region, scaled to TEXT_LINE_HEIGHT per line and binarized dark-on-light."""
+    x, y, w, h, line_height = region
+    crop = gray[y:y + h, x:x + w]
+    scale = min(MAX_UPSCALE, TEXT_LINE_HEIGHT / float(line_height))
+    if abs(scale - 1.0) > 0.05:
+        crop = cv2.resize(crop, None, fx=scale, fy=scale,
+                          interpolation=cv2.INTER_AREA if scale < 1 else cv2.INTER_CUBIC)
+    _, binary = cv2.threshold(crop, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+    # The border is mostly background; Tesseract expects dark text on a light one
+    border = np.concatenate([binary[0], binary[-1], binary[:, 0], binary[:, -1]])
+    if border.mean() < 128:
+        binary = 255 - binary
+    return cv2.copyMakeBorder(binary, 10, 10, 10, 10, cv2.BORDER_CONSTANT, value=255)
+
+
+def same_text(images_a: List[np.ndarray], images_b: List[np.ndarray]) -> bool:
+    """
+    Whether two frames' prepared region images show the same text: same layout, and
+    no more than TEXT_CHANGE_PIXELS differing pixels once 1-2 px edge jitter (video
+    noise, a region box one pixel off) is removed. A changed word differs in whole strokes.
+    """
+    if len(images_a) != len(images_b):
+        return False
+    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (3, 3))
+    for a, b in zip(images_a, images_b):
+        if a.shape != b.shape:
+            if any(abs(size_a - size_b) > REGION_SIZE_TOLERANCE * size_a for size_a, size_b in zip(a.shape, b.shape)):
+                return False
+            b = cv2.resize(b, (a.shape[1], a.shape[0]), interpolation=cv2.INTER_NEAREST)
+        changed = cv2.morphologyEx(cv2.absdiff(a, b), cv2.MORPH_OPEN, kernel)
+        if cv2.countNonZero(changed) > TEXT_CHANGE_PIXELS:
+            return False
+    return True
+
+
+def count_text_chains(boxes: List[tuple], rule: tuple = LOOSE_CHAIN) -> int:
+    """Chains of character boxes of similar height side by side on one baseline (see LOOSE_CHAIN)."""
+    min_length, max_gap, max_offset, max_ratio = rule
+    boxes = sorted(set(boxes))
+    parent = list(range(len(boxes)))
+
+    def root(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, (x, y, w, h) in enumerate(boxes):
+        for j in range(i + 1, len(boxes)):
+            x2, y2, w2, h2 = boxes[j]
+            if x2 > x + w + max_gap * h:
+                break  # sorted by x: everything further is too far right
+            if x2 < x + 0.5 * w or max(h, h2) > max_ratio * min(h, h2):
+                continue  # same letter (other polarity) or a different text size
+            if abs((y + h) - (y2 + h2)) < max_offset * max(h, h2):
+                parent[root(j)] = root(i)
+
+    sizes = {}
+    for i in range(len(boxes)):
+        sizes[root(i)] = sizes.get(root(i), 0) + 1
+    return sum(1 for size in sizes.values() if size >= min_length)
+
+
+def character_boxes(small: np.ndarray) -> List[tuple]:
+    """Letter-sized stroke blobs, light-on-dark (top-hat) and dark-on-light (black-hat)."""
+    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (STROKE_KERNEL, STROKE_KERNEL))
+    max_height = small.shape[0] * MAX_REGION_HEIGHT
+    boxes = []
+    for operation in (cv2.MORPH_TOPHAT, cv2.MORPH_BLACKHAT):
+        strokes = cv2.morphologyEx(small, operation, kernel)
+        otsu, _ = cv2.threshold(strokes, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+        _, mask = cv2.threshold(strokes, max(otsu, MIN_STROKE_CONTRAST), 255, cv2.THRESH_BINARY)
+        _, _, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+        for x, y, w, h, area in stats[1:]:
+            if not (5 <= h <= max_height and CHAR_FILL[0] <= area / (w * h) <= CHAR_FILL[1]):
+                continue
+            if CHAR_ASPECT[0] <= w / h <= CHAR_ASPECT[1]:
+                boxes.append((int(x), int(y), int(w), int(h)))
+            elif CHAR_ASPECT[1] < w / h <= RUN_ASPECT and area / (w * h) >= RUN_MIN_FILL:
+                # Letters run together (small or bold text at this size): one box per letter width
+                pieces = int(round(w / (h * RUN_LETTER_WIDTH)))
+                boxes.extend((int(x + i * w / pieces), int(y), max(1, int(w / pieces)), int(h)) for i in range(pieces))
+    return boxes
+
+
+def text_likelihood(gray: np.ndarray) -> Dict:
+    """
+    Whether a grayscale frame probably shows text: {'likely', 'confidence' (0.5-1, in
+    the decision), 'characters', 'chains'}. Only frames without even a loose chain of
+    letter-like blobs are called text-free, so busy textures still get OCR.
+    """
+    scale = min(1.0, TEXT_CHECK_WIDTH / float(gray.shape[1]))
+    small = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA) if scale < 1 else gray
+    characters = character_boxes(small)
+    chains = count_text_chains(characters, LOOSE_CHAIN)
+
+    if chains:
+        strict = count_text_chains(characters, STRICT_CHAIN)
+        confidence = 0.55 + 0.45 * min(1.0, strict / CERTAIN_CHAINS)
+    else:
+        # Many loose letter-like blobs (foliage, crowds) make "no text" less certain
+        confidence = 1.0 - 0.5 * min(1.0, len(characters) / 200.0)
+    return {'likely': chains > 0, 'confidence': round(confidence, 3), 'characters': len(characters), 'chains': chains}
+
+
+def combine_text_checks(checks: List[Dict]) -> Dict:
+    """Video-level decision: text if any frame has it (confidence of the surest such frame)."""
+    positives = [check['confidence'] for check in checks if check['likely']]
+    if positives:
+        return {'likely': True, 'confidence': max(positives), 'frames': len(checks), 'frames_with_text': len(positives)}
+    return {'likely': False, 'confidence': min((check['confidence'] for check in checks), default=1.0),
+            'frames': len(checks), 'frames_with_text': 0}
+
+
+def normalize_line(line: str) -> str:
+    """Lowercased alphanumerics and single spaces, for comparing OCR readings."""
+    return " ".join("".join(c if c.isalnum() else " " for c in line.lower()).split())
+
+
+def consensus_text(frame_texts: List[str], weights: List[int] = None) -> str:
+    """
+    Merge the text read from several frames: lines that are OCR variants of each
+    other become one line (its most frequent reading, weighted by how many sampled
+    frames showed it), in order of first appearance. Garbage lines are dropped.
+    """
+    weights = weights or [1] * len(frame_texts)
+    groups = []  # [normalized, Counter of readings]
+    for text, weight in zip(frame_texts, weights):
+        for line in (text or "").splitlines():
+            line = " ".join(line.split())
+            key = normalize_line(line)
+            alnum = sum(c.isalnum() for c in line)
+            if alnum < MIN_LINE_CHARS or alnum / len(line.replace(" ", "")) < MIN_ALNUM_RATIO:
+                continue
+            for group in groups:
+                if SequenceMatcher(None, key, group[0]).ratio() >= LINE_SIMILARITY:
+                    break
+            else:
+                group = [key, Counter()]
+                groups.append(group)
+            group[1][line] += weight
+    return "\n".join(readings.most_common(1)[0][0] for _, readings in groups)
 
 
 class OCRExtractor:
     """Extract text from video frames using OCR."""
     
-    def __init__(self, tesseract_path: str = None):
+    def __init__(self, tesseract_path: str = None, debug: bool = False):
         """
         Initialize OCR Extractor.
         
         Args:
             tesseract_path: Path to tesseract.exe (Windows only)
                            If None, will try to auto-detect
+            debug: Return the detected regions and the images Tesseract read
+                   in the result's 'debug' entry (kept in memory, nothing is written)
         """
+        self.debug = debug
         # Set Tesseract path (Windows)
         if tesseract_path:
             pytesseract.pytesseract.tesseract_cmd = tesseract_path
@@ -37,6 +370,143 @@ class OCRExtractor:
                     pytesseract.pytesseract.tesseract_cmd = path
                     break
     
+    def extract_text(self, video_path: str) -> Dict:
+        """Multi-frame OCR, or the single middle frame when OCR_FRAMES is 1."""
+        if config.ocr_frames <= 1:
+            return self.extract_text_from_middle_frame(video_path)
+        return self.extract_text_from_frames(video_path, config.ocr_frames)
+
+    def read_frames(self, video_path: str, num_frames: int) -> List[np.ndarray]:
+        """`num_frames` frames spread evenly from just after the start to just before the end."""
+        frames = []
+        cap = cv2.VideoCapture(video_path)
+        try:
+            if not cap.isOpened():
+                return frames
+            total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            if total_frames <= 0:
+                return frames
+            positions = sorted({int(total_frames * f) for f in np.linspace(0.03, 0.97, num_frames)})
+            for position in positions:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, position)
+                ret, frame = cap.read()
+                if ret:
+                    frames.append(frame)
+        finally:
+            cap.release()
+        return frames
+
+    def prepare_frame(self, gray: np.ndarray) -> tuple:
+        """(text regions, region images for Tesseract) of a grayscale frame."""
+        regions = find_text_regions(gray)
+        return regions, [prepare_region(gray, region) for region in regions]
+
+    def read_prepared(self, prepared: List[tuple], debug_out: list = None) -> tuple:
+        """
+        Text of each prepared (frame, regions, region images), top to bottom ("" when
+        there are no regions), and how many frames the cache answered. Uncached frames go
+        to the OCR pool as one parallel batch, each frame's regions read together.
+        """
+        keys = [FrameTextCache.key(images) if images else None for _, _, images in prepared]
+        texts = [frame_text_cache.get(key) if key else "" for key in keys]
+        missing = [i for i, text in enumerate(texts) if text is None]
+        cache_hits = sum(1 for key in keys if key) - len(missing)
+
+        region_texts = ocr_pool.recognize_groups([prepared[i][2] for i in missing])
+        read = {}
+        for i, frame_texts in zip(missing, region_texts):
+            read[i] = [text for text in frame_texts if text]
+            texts[i] = "\n".join(read[i])
+            frame_text_cache.put(keys[i], texts[i])
+
+        if debug_out is not None:
+            for i, (frame, regions, inputs) in enumerate(prepared):
+                annotated = frame.copy()
+                for x, y, w, h, _ in regions:
+                    cv2.rectangle(annotated, (x, y), (x + w, y + h), (0, 255, 0), 2)
+                debug_out.append({'frame': annotated, 'regions': regions, 'inputs': inputs,
+                                  'texts': read.get(i, texts[i].splitlines()), 'cached': i not in read and bool(keys[i])})
+        return texts, cache_hits
+
+    def ocr_frames(self, frames: List[np.ndarray], debug_out: list = None) -> List[str]:
+        """Text of each frame's detected text regions, top to bottom ("" when there are none)."""
+        prepared = [(frame, *self.prepare_frame(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY))) for frame in frames]
+        return self.read_prepared(prepared, debug_out)[0]
+
+    def ocr_frame(self, frame: np.ndarray, debug_out: list = None) -> str:
+        return self.ocr_frames([frame], debug_out)[0]
+
+    def extract_text_from_frames(self, video_path: str, num_frames: int = 6) -> Dict:
+        """
+        Extract text from several frames of a video.
+
+        Returns:
+            Dictionary with 'text' (consensus of all frames), 'status', 'message',
+            'frames_sampled' / 'frames_read' / 'cache_hits' counts and 'text_check'
+            (the text-presence decision for the distinct frames, if checked).
+        """
+        result = {
+            'text': '',
+            'status': 'error',
+            'message': '',
+            'frames_sampled': 0,
+            'frames_read': 0,
+            'cache_hits': 0,
+            'text_check': None,
+            'debug': [] if self.debug else None
+        }
+
+        if not os.path.exists(video_path):
+            result['message'] = f"Video file not found: {video_path}"
+            return result
+
+        try:
+            frames = self.read_frames(video_path, num_frames)
+            result['frames_sampled'] = len(frames)
+            if not frames:
+                result['message'] = "Could not read frames from video"
+                return result
+
+            # Frames that show the same picture and the same text collapse into the first
+            # one; weight = frames it stands for. Only frames that probably show text get
+            # their text regions prepared.
+            unique = []  # [hash, frame, regions, region images, weight]
+            checks = []
+            for frame in frames:
+                gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+                frame_hash = phash(gray)
+                if frame_hash is None:
+                    continue  # flat frame (fade, black): nothing to read
+                regions, images = [], []
+                check = text_likelihood(gray) if config.ocr_text_check else None
+                if check is None or check['likely']:
+                    regions, images = self.prepare_frame(gray)
+                for entry in unique:
+                    if hamming(frame_hash, entry[0]) <= FRAME_DEDUPE_DISTANCE and same_text(images, entry[3]):
+                        entry[4] += 1
+                        break
+                else:
+                    unique.append([frame_hash, frame, regions, images, 1])
+                    if check is not None:
+                        checks.append(check)
+            if checks:
+                result['text_check'] = combine_text_checks(checks)
+
+            texts, result['cache_hits'] = self.read_prepared(
+                [(frame, regions, images) for _, frame, regions, images, _ in unique], result['debug'])
+            weights = [weight for _, _, _, _, weight in unique]
+            result['frames_read'] = sum(1 for entry in unique if entry[3]) - result['cache_hits']
+
+            result['text'] = consensus_text(texts, weights)
+            result['status'] = 'success'
+            result['message'] = (f"Extracted {len(result['text'])} characters from {len(unique)} distinct "
+                                 f"of {len(frames)} frames ({result['cache_hits']} cached)")
+            return result
+
+        except Exception as e:
+            result['message'] = f"OCR error: {str(e)}"
+            return result
+
     def extract_text_from_middle_frame(self, video_path: str) -> Dict[str, str]:
         """
         Extract text from the middle frame of a video.
@@ -49,13 +519,15 @@ class OCRExtractor:
                 - 'text': Extracted text (or empty string)
                 - 'status': 'success' or 'error'
                 - 'message': Status message
-                - 'frame_path': Path to saved frame (for debugging)
+                - 'text_check': Text-presence decision for the frame (if checked)
+                - 'debug': Detected regions and OCR inputs (only with debug=True)
         """
         result = {
             'text': '',
             'status': 'error',
             'message': '',
-            'frame_path': None
+            'text_check': None,
+            'debug': [] if self.debug else None
         }
         
         # 1. Check if video file exists
@@ -91,24 +563,17 @@ class OCRExtractor:
             cap.release()
             cap = None
             
-            # 6. Save frame for debugging (optional)
-            try:
-                temp_frame_path = os.path.join(tempfile.gettempdir(), "ocr_frame.jpg")
-                cv2.imwrite(temp_frame_path, frame)
-                result['frame_path'] = temp_frame_path
-            except Exception as e:
-                print(f"--> Warning: Could not save debug frame: {e}")
-            
-            # 7. Perform OCR
-            # Convert BGR (OpenCV) to RGB (PIL)
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            pil_image = Image.fromarray(rgb_frame)
-            
-            # Extract text
-            extracted_text = pytesseract.image_to_string(pil_image)
-            
-            # Clean up text
-            cleaned_text = extracted_text.strip()
+            # 6. Skip OCR when the frame shows no text
+            if config.ocr_text_check:
+                check = text_likelihood(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY))
+                result['text_check'] = combine_text_checks([check])
+                if not check['likely']:
+                    result['status'] = 'success'
+                    result['message'] = f"No text expected (confidence {check['confidence']:.2f})"
+                    return result
+
+            # 7. Perform OCR on the frame's text regions
+            cleaned_text = self.ocr_frame(frame, result['debug'])
             
             result['text'] = cleaned_text
             result['status'] = 'success'
@@ -125,6 +590,13 @@ class OCRExtractor:
                 cap.release()
 
 
+# OCR text per frame hash, shared by all extractors
+frame_text_cache = FrameTextCache()
+
+# Shared extractor (OCR itself runs on the shared worker pool)
+ocr_extractor = OCRExtractor()
+
+
 # Convenience function for backward compatibility
 def extract_text_from_video(video_path: str) -> str:
     """
@@ -136,6 +608,5 @@ def extract_text_from_video(video_path: str) -> str:
     Returns:
         Extracted text (or empty string on error)
     """
-    extractor = OCRExtractor()
-    result = extractor.extract_text_from_middle_frame(video_path)
+    result = ocr_extractor.extract_text(video_path)
     return result.get('text', '')
@@ -0,0 +1,312 @@
+"""
+Shared pool of Tesseract workers.
+
+pytesseract writes every image to a temp file and starts a new `tesseract` process
+that loads its language model again. The pool keeps long-lived engines instead:
+
+- with `tesserocr` installed (a requirement; its wheels bundle Tesseract) and the
+  language data found (`tessdata.fast-eng`, or TESSDATA_PREFIX), one PyTessBaseAPI
+  per worker, created once with the model loaded; recognition releases the GIL, so
+  workers run on all cores.
+- otherwise the `tesseract` CLI, fed PNG bytes over stdin and read from stdout (no
+  temp files), with the worker count bounding how many run at once. Every CLI call
+  pays for a process start and a model load, so `recognize_groups` stacks the
+  regions of one frame into a single image: one call per frame, and the words are
+  split back to their regions by position (TSV output).
+
+All extractors and all concurrent jobs share one pool, so OCR for many reels at once
+is spread over the cores without oversubscribing them.
+"""
+
+import os
+import sys
+import time
+import queue
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+import cv2
+import numpy as np
+
+try:
+    import tesserocr
+    TESSEROCR_AVAILABLE = True
+except ImportError:
+    tesserocr = None
+    TESSEROCR_AVAILABLE = False
+
+
+def tessdata_path() -> Optional[str]:
+    """
+    Directory of the Tesseract language data: TESSDATA_PREFIX, else where the
+    `tessdata.fast-eng` package installs it (<prefix>/share/tessdata). None means
+    tesserocr's built-in default.
+    """
+    for path in (os.getenv("TESSDATA_PREFIX"), os.path.join(sys.prefix, "share", "tessdata")):
+        if path and os.path.isdir(path):
+            return os.path.join(path, "")
+    return None
+
+
+def tesserocr_options(lang: str, psm: int) -> dict:
+    options = {"lang": lang, "psm": psm}
+    path = tessdata_path()
+    if path:
+        options["path"] = path
+    return options
+
+
+def tesserocr_ready(lang: str) -> bool:
+    """True if tesserocr is installed and has the data for `lang`."""
+    if not TESSEROCR_AVAILABLE:
+        return False
+    try:
+        path = tessdata_path()
+        _, languages = tesserocr.get_languages(path) if path else tesserocr.get_languages()
+        return lang in languages
+    except Exception:
+        return False
+
+
+def tesseract_cmd() -> str:
+    """Tesseract executable (the path OCRExtractor configured for pytesseract, if any)."""
+    try:
+        import pytesseract
+        return pytesseract.pytesseract.tesseract_cmd
+    except ImportError:
+        return "tesseract"
+
+
+STACK_GAP = 40  # white rows between stacked region images, so Tesseract keeps them apart
+
+
+def stack_images(images: List[np.ndarray]) -> tuple:
+    """
+    One white grayscale canvas with the images one below the other, and the
+    (top, bottom) rows of each image's band on it.
+    """
+    images = [cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image for image in images]
+    width = max(image.shape[1] for image in images) + 2 * STACK_GAP
+    height = sum(image.shape[0] for image in images) + (len(images) + 1) * STACK_GAP
+    canvas = np.full((height, width), 255, np.uint8)
+    bands, y = [], STACK_GAP
+    for image in images:
+        canvas[y:y + image.shape[0], STACK_GAP:STACK_GAP + image.shape[1]] = image
+        bands.append((y - STACK_GAP // 2, y + image.shape[0] + STACK_GAP // 2))
+        y += image.shape[0] + STACK_GAP
+    return canvas, bands
+
+
+def split_tsv(tsv: str, bands: List[tuple]) -> List[str]:
+    """Text of each band from Tesseract TSV output: words by their centre row, lines kept."""
+    lines = [[] for _ in bands]  # per band: [(line id, word), ...] in reading order
+    for row in tsv.splitlines()[1:]:
+        fields = row.split("\t")
+        if len(fields) < 12 or fields[0] != "5" or not fields[11].strip():
+            continue
+        centre = int(fields[7]) + int(fields[9]) / 2
+        band = next((i for i, (top, bottom) in enumerate(bands) if top <= centre < bottom), None)
+        if band is not None:
+            lines[band].append((tuple(fields[1:5]), fields[11].strip()))
+    texts = []
+    for words in lines:
+        text_lines, current = [], None
+        for line_id, word in words:
+            if line_id != current:
+                text_lines.append([])
+                current = line_id
+            text_lines[-1].append(word)
+        texts.append("\n".join(" ".join(line) for line in text_lines))
+    return texts
+
+
+class OCRWorkerPool:
+    """`workers` Tesseract engines shared by every OCR call in the process."""
+
+    def __init__(self, workers: int = None, lang: str = "eng", psm: int = 6):
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.lang = lang
+        self.psm = psm
+        self.backend = "tesserocr" if tesserocr_ready(lang) else "cli"
+        self.lock = threading.Lock()
+        self.executor = None
+        self.engines = queue.Queue()
+        self.engines_created = 0
+        self.slots = threading.BoundedSemaphore(self.workers)
+        self.stats = {"images": 0, "calls": 0, "seconds": 0.0}
+
+    def start(self):
+        """Create the executor on first use (engines are created as workers need them)."""
+        with self.lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="ocr")
+
+    def acquire_engine(self):
+        """An idle tesserocr engine, created while fewer than `workers` exist."""
+        try:
+            return self.engines.get_nowait()
+        except queue.Empty:
+            pass
+        with self.lock:
+            if self.engines_created < self.workers:
+                self.engines_created += 1
+                try:
+                    return tesserocr.PyTessBaseAPI(**tesserocr_options(self.lang, self.psm))
+                except Exception:
+                    self.engines_created -= 1
+                    raise
+        return self.engines.get()
+
+    def recognize(self, image: np.ndarray) -> str:
+        """Text of one grayscale or BGR image. Blocks while every worker is busy."""
+        started = time.perf_counter()
+        with self.slots:
+            if self.backend == "tesserocr":
+                text = self._recognize_tesserocr(image)
+            else:
+                text = self._recognize_cli(image)
+        with self.lock:
+            self.stats["images"] += 1
+            self.stats["calls"] += 1
+            self.stats["seconds"] += time.perf_counter() - started
+        return text.strip()
+
+    def recognize_group(self, images: List[np.ndarray]) -> List[str]:
+        """
+        Text of each image of one group (the regions of a frame). The CLI backend reads
+        the whole group in one stacked call; tesserocr reads each image on one engine.
+        """
+        if len(images) == 1:
+            return [self.recognize(images[0])]
+        started = time.perf_counter()
+        with self.slots:
+            if self.backend == "tesserocr":
+                texts = [self._recognize_tesserocr(image) for image in images]
+            else:
+                canvas, bands = stack_images(images)
+                texts = split_tsv(self._recognize_cli(canvas, "tsv"), bands)
+        with self.lock:
+            self.stats["images"] += len(images)
+            self.stats["calls"] += 1 if self.backend == "cli" else len(images)
+            self.stats["seconds"] += time.perf_counter() - started
+        return [text.strip() for text in texts]
+
+    def _recognize_tesserocr(self, image: np.ndarray) -> str:
+        from PIL import Image
+        if image.ndim == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        engine = self.acquire_engine()
+        try:
+            engine.SetImage(Image.fromarray(image))
+            return engine.GetUTF8Text()
+        finally:
+            self.engines.put(engine)
+
+    def _recognize_cli(self, image: np.ndarray, *configs: str) -> str:
+        ok, png = cv2.imencode(".png", image)
+        if not ok:
+            raise RuntimeError("Could not encode image for Tesseract")
+        completed = subprocess.run(
+            [tesseract_cmd(), "stdin", "stdout", "-l", self.lang, "--psm", str(self.psm), *configs],
+            input=png.tobytes(), capture_output=True, timeout=60
+        )
+        if completed.returncode != 0:
+            raise RuntimeError(f"Tesseract failed: {completed.stderr.decode(errors='replace').strip()}")
+        return completed.stdout.decode("utf-8", errors="replace")
+
+    def recognize_many(self, images: List[np.ndarray]) -> List[str]:
+        """Text of each image, recognized in parallel, in input order."""
+        if not images:
+            return []
+        if len(images) == 1:
+            return [self.recognize(images[0])]
+        self.start()
+        return list(self.executor.map(self.recognize, images))
+
+    def recognize_groups(self, groups: List[List[np.ndarray]]) -> List[List[str]]:
+        """Text of each image of each group, groups recognized in parallel, in input order."""
+        if sum(1 for group in groups if group) <= 1:
+            return [self.recognize_group(group) if group else [] for group in groups]
+        self.start()
+        return list(self.executor.map(lambda group: self.recognize_group(group) if group else [], groups))
+
+    def get_stats(self) -> dict:
+        with self.lock:
+            return dict(self.stats, backend=self.backend, workers=self.workers, engines=self.engines_created)
+
+    def shutdown(self):
+        with self.lock:
+            executor, self.executor = self.executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+        while True:
+            try:
+                engine = self.engines.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                engine.End()
+            except Exception:
+                pass
+        with self.lock:
+            self.engines_created = 0
+
+
+# Global OCR worker pool instance
+ocr_pool = OCRWorkerPool()
+
+
+def benchmark_ocr_pool(count: int = 48, workers: Optional[int] = None) -> dict:
+    """
+    OCR `count` synthetic caption images one by one with the language model loaded for
+    every image, and through the pool, whose engines keep it loaded. The per-image
+    baseline matches the backend that runs: a new PyTessBaseAPI per image for
+    tesserocr, pytesseract (temp file + new tesseract process) for the CLI.
+    """
+    from PIL import Image
+
+    images = []
+    for i in range(count):
+        image = np.full((60, 520), 255, np.uint8)
+        cv2.putText(image, f"caption number {i} here", (10, 42), cv2.FONT_HERSHEY_SIMPLEX, 1.0, 0, 2)
+        images.append(image)
+
+    pool = OCRWorkerPool(workers=workers)
+    if pool.backend == "tesserocr":
+        baseline = "new PyTessBaseAPI per image"
+
+        def read_once(image):
+            with tesserocr.PyTessBaseAPI(**tesserocr_options(pool.lang, pool.psm)) as engine:
+                engine.SetImage(Image.fromarray(image))
+                return engine.GetUTF8Text()
+    else:
+        import pytesseract
+        baseline = "pytesseract per image"
+
+        def read_once(image):
+            return pytesseract.image_to_string(Image.fromarray(image), config=f"--psm {pool.psm}")
+
+    started = time.perf_counter()
+    expected = [read_once(image).strip() for image in images]
+    sequential = time.perf_counter() - started
+
+    pool.recognize(images[0])  # warm-up: engine creation is a one-off cost
+    started = time.perf_counter()
+    texts = pool.recognize_many(images)
+    pooled = time.perf_counter() - started
+    results = {"images": count, "baseline": baseline, "baseline_s": sequential, "pool_s": pooled,
+               "speedup": sequential / pooled if pooled > 0 else 0,
+               "same_text": sum(a == b for a, b in zip(texts, expected)), **pool.get_stats()}
+    pool.shutdown()
+
+    print(f"{count} images, backend {results['backend']}: {baseline} {sequential:.2f}s, "
+          f"pool ({results['workers']} workers) {pooled:.2f}s -> {results['speedup']:.1f}x "
+          f"({results['same_text']}/{count} identical texts)")
+    return results
+
+
+if __name__ == "__main__":
+    # python -m easy_reels.core.ocr_pool
+    benchmark_ocr_pool()
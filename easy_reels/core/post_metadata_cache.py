@@ -0,0 +1,127 @@
+"""
+SQLite cache of Instagram post metadata.
+
+`Post.from_shortcode` is a slow, rate-limited GraphQL round trip. The fields a
+download needs - caption, is_video, the signed video URL (with its expiry),
+dimensions and duration - are cached per shortcode for a configurable TTL.
+A cached video URL is used even if its signature may have expired: it is only
+refreshed when the media fetch actually fails.
+"""
+
+import re
+import time
+import sqlite3
+from typing import Dict, Optional
+from urllib.parse import urlparse, parse_qs
+
+from .config_manager import config
+from .sqlite_store import SQLiteStore
+
+
+def video_url_expiry(video_url: str) -> Optional[float]:
+    """Expiry timestamp of a signed Instagram CDN URL (hex 'oe' parameter), if present."""
+    try:
+        oe = parse_qs(urlparse(video_url).query).get("oe", [None])[0]
+        return float(int(oe, 16)) if oe and re.fullmatch(r"[0-9A-Fa-f]+", oe) else None
+    except Exception:
+        return None
+
+
+class CachedPost:
+    """The subset of `instaloader.Post` the downloader uses, rebuilt from the cache."""
+
+    def __init__(self, record: Dict):
+        self.shortcode = record["shortcode"]
+        self.caption = record.get("caption") or ""
+        self.is_video = bool(record.get("is_video"))
+        self.video_url = record.get("video_url")
+        self.video_duration = record.get("duration")
+        self.width = record.get("width")
+        self.height = record.get("height")
+        self.from_cache = True
+
+
+class PostMetadataCache:
+    """Shortcode -> post metadata, expiring after `ttl_seconds`."""
+
+    def __init__(self, db_path: str = "temp/post_metadata.sqlite3", ttl_seconds: float = None):
+        self.db = SQLiteStore(db_path, self.setup, row_factory=sqlite3.Row)
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else config.post_metadata_ttl_hours * 3600
+
+    @staticmethod
+    def setup(conn):
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS posts (
+                shortcode TEXT PRIMARY KEY,
+                caption TEXT,
+                is_video INTEGER,
+                video_url TEXT,
+                url_expires REAL,
+                width INTEGER,
+                height INTEGER,
+                duration REAL,
+                fetched_at REAL
+            )
+        """)
+
+    @staticmethod
+    def record_from_post(post) -> Dict:
+        """Metadata fields of an instaloader Post."""
+        dimensions = {}
+        try:
+            dimensions = post._node.get("dimensions") or {}
+        except Exception:
+            pass
+        video_url = post.video_url if post.is_video else None
+        return {
+            "shortcode": post.shortcode,
+            "caption": post.caption or "",
+            "is_video": bool(post.is_video),
+            "video_url": video_url,
+            "url_expires": video_url_expiry(video_url) if video_url else None,
+            "width": dimensions.get("width"),
+            "height": dimensions.get("height"),
+            "duration": getattr(post, "video_duration", None) if post.is_video else None,
+            "fetched_at": time.time()
+        }
+
+    def get(self, shortcode: str) -> Optional[Dict]:
+        """Cached record for `shortcode` if younger than the TTL."""
+        with self.db.transaction() as conn:
+            row = conn.execute("SELECT * FROM posts WHERE shortcode = ?", (shortcode,)).fetchone()
+        if not row:
+            return None
+        record = dict(row)
+        if time.time() - (record["fetched_at"] or 0) > self.ttl_seconds:
+            return None
+        return record
+
+    def get_post(self, shortcode: str) -> Optional[CachedPost]:
+        record = self.get(shortcode)
+        return CachedPost(record) if record else None
+
+    def put_post(self, post) -> Dict:
+        """Cache the metadata of a freshly fetched Post."""
+        record = self.record_from_post(post)
+        with self.db.transaction() as conn:
+            conn.execute("""
+                INSERT OR REPLACE INTO posts
+                (shortcode, caption, is_video, video_url, url_expires, width, height, duration, fetched_at)
+                VALUES (:shortcode, :caption, :is_video, :video_url, :url_expires, :width, :height, :duration, :fetched_at)
+            """, record)
+        return record
+
+    def invalidate(self, shortcode: str):
+        with self.db.transaction() as conn:
+            conn.execute("DELETE FROM posts WHERE shortcode = ?", (shortcode,))
+
+    def purge_expired(self) -> int:
+        """Delete records older than the TTL. Returns how many were removed."""
+        with self.db.transaction() as conn:
+            cursor = conn.execute("DELETE FROM posts WHERE fetched_at < ?", (time.time() - self.ttl_seconds,))
+            removed = cursor.rowcount
+        return removed
+
+
+# Global post metadata cache instance
+post_metadata_cache = PostMetadataCache()
@@ -0,0 +1,154 @@
+"""
+Bounded-concurrency prefetch of batch downloads.
+
+While job N renders, the metadata and video of the next K URLs are fetched in the
+background into scratch storage. Items are handed to the consumer strictly in
+submission order (so daily-limit numbering stays deterministic), at most K items are
+fetched ahead of the consumer, and no new download starts while the downloaded but
+not yet released files exceed the disk budget. An `on_ready` hook sees each item as
+soon as its download finishes (e.g. to start its AI request early).
+
+An item is released when the consumer asks for the next one or closes the queue: its
+media store pin is dropped (so the file may be evicted again) and a file outside the
+store is deleted. The consumer does not release items itself.
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+from .config_manager import config
+from .media_store import media_store
+
+
+class PrefetchQueue:
+    """Iterate over download results in order while the next `depth` URLs download."""
+
+    def __init__(self,
+                 urls: List[str],
+                 download_fn: Callable[[str], Dict] = None,
+                 depth: int = 2,
+                 disk_budget_mb: int = None,
+                 stop_event: threading.Event = None,
+                 log_callback: Callable[[str], None] = None,
+                 on_ready: Callable[[Dict], None] = None):
+        if download_fn is None:
+            from .instagram_downloader import InstagramDownloader
+            download_fn = InstagramDownloader().download_reel
+
+        self.urls = list(urls)
+        self.download_fn = download_fn
+        self.depth = max(1, depth)
+        budget_mb = disk_budget_mb if disk_budget_mb is not None else config.prefetch_budget_mb
+        self.disk_budget = budget_mb * 1024 * 1024
+        self.stop_event = stop_event or threading.Event()
+        self.log = log_callback or print
+        self.on_ready = on_ready
+
+        self.condition = threading.Condition()
+        self.futures = {}
+        self.ahead = 0            # submitted but not yet handed to the consumer
+        self.disk_used = 0        # bytes of downloaded files not yet released
+        self.sizes = {}
+        self.paths = {}
+        self.consumed = -1
+        self.consumer_waiting = False
+        self.closed = False
+
+        self.executor = ThreadPoolExecutor(max_workers=self.depth)
+        self.feeder = threading.Thread(target=self._feed, daemon=True)
+        self.feeder.start()
+
+    def _can_submit(self) -> bool:
+        if self.ahead >= self.depth:
+            return False
+        # Over budget, but the consumer is idle waiting for this very item: fetch it anyway
+        return self.disk_used < self.disk_budget or (self.ahead == 0 and self.consumer_waiting)
+
+    def _feed(self):
+        for index, url in enumerate(self.urls):
+            with self.condition:
+                while not self._can_submit() and not self.closed and not self.stop_event.is_set():
+                    self.condition.wait(timeout=0.5)
+                if self.closed or self.stop_event.is_set():
+                    break
+                self.ahead += 1
+                self.futures[index] = self.executor.submit(self._download, index, url)
+                self.condition.notify_all()
+
+    def _download(self, index: int, url: str) -> Dict:
+        item = {'index': index, 'url': url, 'metadata': None, 'error': None}
+        try:
+            item['metadata'] = self.download_fn(url)
+            video_path = item['metadata'].get('video_path')
+            size = os.path.getsize(video_path) if video_path and os.path.exists(video_path) else 0
+            with self.condition:
+                self.sizes[index] = size
+                self.paths[index] = video_path
+                self.disk_used += size
+        except Exception as e:
+            item['error'] = str(e)
+            return item
+        if self.on_ready:
+            try:
+                self.on_ready(item)
+            except Exception as e:
+                self.log(f"⚠️ Prefetch hook failed for URL {index + 1}: {e}")
+        return item
+
+    def __iter__(self):
+        for index in range(len(self.urls)):
+            with self.condition:
+                # Asking for the next item means the previous one has been processed
+                self.release(self.consumed)
+                self.consumer_waiting = True
+                self.condition.notify_all()
+                while index not in self.futures and not self.closed and not self.stop_event.is_set():
+                    self.condition.wait(timeout=0.5)
+                future = self.futures.get(index)
+            if future is None:
+                return
+
+            item = future.result()
+            with self.condition:
+                self.consumer_waiting = False
+                self.consumed = index
+                self.ahead -= 1
+                self.condition.notify_all()
+            yield item
+
+    def release(self, index: int):
+        """The consumer is done with an item: unpin or delete its file and stop counting it against the budget."""
+        with self.condition:
+            size = self.sizes.pop(index, 0)
+            video_path = self.paths.pop(index, None)
+            self.disk_used -= size
+            self.condition.notify_all()
+        media_store.remove_if_unmanaged(video_path)
+
+    def close(self):
+        """Stop prefetching. Unconsumed downloads stay in the media store (unpinned); anything else is deleted."""
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+            pending = {i: f for i, f in self.futures.items() if i > self.consumed}
+        self.release(self.consumed)
+
+        for future in pending.values():
+            future.cancel()
+        self.executor.shutdown(wait=True)
+
+        for future in pending.values():
+            if future.cancelled():
+                continue
+            item = future.result()
+            video_path = (item.get('metadata') or {}).get('video_path')
+            if media_store.remove_if_unmanaged(video_path):
+                self.log(f"🧹 Removed unused prefetched file: {os.path.basename(video_path)}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
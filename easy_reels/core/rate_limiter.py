@@ -0,0 +1,196 @@
+"""
+Adaptive request pacing.
+
+A token bucket shared by every caller of one API. The refill rate follows AIMD:
+each successful call raises it a little (up to the configured ceiling), each throttle
+signal (HTTP 429, "please wait") halves it and blocks all callers for the server's
+Retry-After - or an exponential backoff with jitter when none is given. Long batches
+settle at the highest rate the server tolerates instead of failing URL after URL.
+"""
+
+import re
+import time
+import random
+import threading
+from typing import Callable, Optional, Tuple
+
+from .config_manager import config
+
+THROTTLE_PATTERNS = ("429", "too many requests", "please wait", "rate limit")
+
+
+def parse_retry_after(value) -> Optional[float]:
+    """Seconds from a Retry-After header (delta-seconds or HTTP date)."""
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        from email.utils import parsedate_to_datetime
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except Exception:
+        return None
+
+
+def throttle_signal(error: Exception) -> Tuple[bool, Optional[float]]:
+    """(is_throttle, retry_after_seconds) for an exception raised by an API call."""
+    response = getattr(error, "response", None)
+    status = getattr(response, "status_code", None) or getattr(error, "code", None) or getattr(error, "status", None)
+    headers = getattr(response, "headers", None) or getattr(error, "headers", None) or {}
+    retry_after = parse_retry_after(headers.get("Retry-After")) if headers else None
+    if status == 429:
+        return True, retry_after
+
+    text = str(error).lower()
+    if any(pattern in text for pattern in THROTTLE_PATTERNS):
+        match = re.search(r"retry[- ]after[^0-9]*([0-9.]+)", text)
+        return True, retry_after if retry_after is not None else (float(match.group(1)) if match else None)
+    return False, None
+
+
+class AdaptiveRateLimiter:
+    """Token bucket with additive increase / multiplicative decrease of its rate."""
+
+    def __init__(self,
+                 name: str = "api",
+                 max_rate: float = 1.0,
+                 min_rate: float = 0.05,
+                 burst: float = 2.0,
+                 increase_step: float = 0.05,
+                 decrease_factor: float = 0.5,
+                 base_backoff: float = 2.0,
+                 max_backoff: float = 300.0):
+        self.name = name
+        self.max_rate = max_rate
+        self.min_rate = min_rate
+        self.rate = max_rate
+        self.burst = max(1.0, burst)
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+
+        self.tokens = self.burst
+        self.last_refill = time.monotonic()
+        self.blocked_until = 0.0
+        self.consecutive_throttles = 0
+        self.condition = threading.Condition()
+        self.stats = {"calls": 0, "throttled": 0, "waited_seconds": 0.0}
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+    def acquire(self, stop_event: threading.Event = None):
+        """Block until a request may be sent."""
+        started = time.monotonic()
+        with self.condition:
+            while True:
+                if stop_event is not None and stop_event.is_set():
+                    raise InterruptedError("Stopped while waiting for rate limiter")
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self.blocked_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    break
+                wait = max(self.blocked_until - now, (1 - self.tokens) / self.rate)
+                self.condition.wait(timeout=min(wait, 1.0))
+            self.stats["calls"] += 1
+            self.stats["waited_seconds"] += time.monotonic() - started
+
+    def on_success(self):
+        with self.condition:
+            self.consecutive_throttles = 0
+            self.rate = min(self.max_rate, self.rate + self.increase_step)
+
+    def on_throttle(self, retry_after: float = None) -> float:
+        """Slow down and pause every caller. Returns the pause in seconds."""
+        with self.condition:
+            self.consecutive_throttles += 1
+            self.stats["throttled"] += 1
+            self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+            if retry_after is None:
+                backoff = min(self.max_backoff, self.base_backoff * 2 ** (self.consecutive_throttles - 1))
+                retry_after = backoff * random.uniform(0.75, 1.25)
+            now = time.monotonic()
+            self.blocked_until = max(self.blocked_until, now + retry_after)
+            self.tokens = 0
+            self.last_refill = now
+            self.condition.notify_all()
+        print(f"--> {self.name}: throttled, pausing {retry_after:.1f}s (rate now {self.rate:.2f}/s)")
+        return retry_after
+
+    def call(self, fn: Callable, *args, max_attempts: int = 5, stop_event: threading.Event = None, **kwargs):
+        """Run `fn` paced by the limiter, retrying throttled attempts after the pause."""
+        for attempt in range(1, max_attempts + 1):
+            self.acquire(stop_event)
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                throttled, retry_after = throttle_signal(e)
+                if not throttled or attempt == max_attempts:
+                    raise
+                self.on_throttle(retry_after)
+                continue
+            self.on_success()
+            return result
+
+    def get_stats(self) -> dict:
+        with self.condition:
+            return dict(self.stats, rate=self.rate, max_rate=self.max_rate)
+
+
+# Shared by all Instagram metadata calls
+metadata_rate_limiter = AdaptiveRateLimiter(
+    name="Instagram metadata",
+    max_rate=config.instagram_max_requests_per_second
+)
+
+
+def simulate_throttled_batch(requests_count: int = 40, server_rate: float = 4.0, max_rate: float = 20.0) -> dict:
+    """
+    Send `requests_count` metadata requests to a local stand-in that allows `server_rate`
+    requests/s and answers 429 + Retry-After above it. Compares unpaced calls (failures
+    are counted, like the batch marking URLs failed) with calls through the limiter.
+    """
+    import json
+    import urllib.request
+    import urllib.error
+    from ..utils.standin_server import StandInServer
+
+    def fetch(url):
+        with urllib.request.urlopen(url) as response:
+            return json.loads(response.read())
+
+    results = {}
+    with StandInServer(throttle_rate=server_rate, retry_after=1) as server:
+        failures = 0
+        started = time.perf_counter()
+        for i in range(requests_count):
+            try:
+                fetch(server.post_url(f"SC{i}"))
+            except urllib.error.HTTPError:
+                failures += 1
+        results["unpaced"] = {"failures": failures, "seconds": time.perf_counter() - started}
+
+    with StandInServer(throttle_rate=server_rate, retry_after=1) as server:
+        limiter = AdaptiveRateLimiter(name="stand-in", max_rate=max_rate, burst=1, increase_step=0.5)
+        failures = 0
+        started = time.perf_counter()
+        for i in range(requests_count):
+            try:
+                limiter.call(fetch, server.post_url(f"SC{i}"), max_attempts=8)
+            except urllib.error.HTTPError:
+                failures += 1
+        results["paced"] = dict(limiter.get_stats(), failures=failures, seconds=time.perf_counter() - started)
+
+    for mode, result in results.items():
+        print(f"{mode:8}: {requests_count - result['failures']}/{requests_count} ok in {result['seconds']:.1f}s")
+    return results
+
+
+if __name__ == "__main__":
+    # python -m easy_reels.core.rate_limiter
+    simulate_throttled_batch()
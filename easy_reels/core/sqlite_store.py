@@ -0,0 +1,51 @@
+"""
+SQLite file shared by the disk caches (post metadata, AI responses, OCR text).
+
+Each cache keeps one file under temp/, used from several threads and processes. The
+file, its directory and its tables are created on the first query, so importing a
+module that has a global cache touches no files. Caches whose rows have 'created' and
+'last_used' times are bounded with `trim`.
+"""
+
+import time
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable
+
+
+class SQLiteStore:
+    """One SQLite file; `setup(conn)` creates its tables before the first query."""
+
+    def __init__(self, db_path: str, setup: Callable[[sqlite3.Connection], None], row_factory=None):
+        self.db_path = Path(db_path)
+        self.setup = setup
+        self.row_factory = row_factory
+        self.lock = threading.RLock()
+        self.ready = False
+
+    @contextmanager
+    def transaction(self):
+        """A short-lived connection (safe across threads), committed and closed on exit."""
+        with self.lock:
+            if not self.ready:
+                self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), timeout=10)
+            if self.row_factory is not None:
+                conn.row_factory = self.row_factory
+            try:
+                with conn:
+                    if not self.ready:
+                        self.setup(conn)
+                        self.ready = True
+                    yield conn
+            finally:
+                conn.close()
+
+
+def trim(conn: sqlite3.Connection, table: str, key_column: str, ttl_seconds: float, max_entries: int):
+    """Delete rows created more than `ttl_seconds` ago, then the least recently used beyond `max_entries`."""
+    conn.execute(f"DELETE FROM {table} WHERE created < ?", (time.time() - ttl_seconds,))
+    conn.execute(f"DELETE FROM {table} WHERE {key_column} IN (SELECT {key_column} FROM {table} "
+                 f"ORDER BY last_used DESC LIMIT -1 OFFSET ?)", (max_entries,))
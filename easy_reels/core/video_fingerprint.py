@@ -0,0 +1,250 @@
+"""
+Perceptual video fingerprints.
+
+The same clip reposted by different accounts is re-encoded, so its bytes (and content
+hash) differ. A fingerprint is the 64-bit pHash of each luma frame sampled by crop
+detection, taken inside the detected crop so added borders do not change it.
+Two videos are near-duplicates when most of their frames have a hash within a small
+Hamming distance of each other.
+
+Fingerprints of rendered reels are kept in `temp/fingerprints.json` and looked up
+through a BK-tree, so checking a new reel does not compare it with every entry.
+"""
+
+import os
+import json
+import time
+import threading
+from typing import Dict, List, Optional
+
+import cv2
+import numpy as np
+
+from .media_store import media_store
+from .video_processor import detect_crop_dimensions
+
+HASH_SIZE = 8  # 8x8 DCT coefficients = 64 bits
+DCT_SIZE = 32
+MIN_FRAME_STD = 3.0  # flat frames (black, single colour) hash alike for every video
+MAX_DISTANCE = 10  # bits that may differ between two frames of the same clip
+MIN_MATCH = 0.5  # share of frames that must match for a near-duplicate
+MIN_MATCHED_FRAMES = 3
+
+_MISSING = object()
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def phash(gray: np.ndarray) -> Optional[int]:
+    """64-bit perceptual hash of a grayscale image (None for a flat image)."""
+    small = cv2.resize(gray, (DCT_SIZE, DCT_SIZE), interpolation=cv2.INTER_AREA).astype(np.float32)
+    if small.std() < MIN_FRAME_STD:
+        return None
+    low = cv2.dct(small)[:HASH_SIZE, :HASH_SIZE].flatten()
+    median = np.median(low[1:])  # the DC term only carries overall brightness
+    value = 0
+    for bit in low > median:
+        value = (value << 1) | int(bit)
+    return value
+
+
+def fingerprint_frames(frames: List[np.ndarray], crop_info: dict = None) -> List[int]:
+    """pHash of every usable frame, inside the crop region when one was detected."""
+    hashes = []
+    for frame in frames:
+        if crop_info:
+            frame = frame[crop_info['y']:crop_info['y'] + crop_info['h'],
+                          crop_info['x']:crop_info['x'] + crop_info['w']]
+        if frame.size == 0:
+            continue
+        value = phash(frame)
+        if value is not None:
+            hashes.append(value)
+    return hashes
+
+
+def get_fingerprint(video_path: str) -> List[int]:
+    """
+    Fingerprint of a video, computed from the crop-detection frames. For a file in the
+    media store both the fingerprint and the crop are kept per content hash, so the
+    render's crop detection is not repeated.
+    """
+    def compute():
+        frames = []
+        crop_info = detect_crop_dimensions(video_path, frames_out=frames)
+        digest = media_store.hash_for_path(video_path)
+        if digest and media_store.get_artefact(digest, 'crop_info', _MISSING) is _MISSING:
+            media_store.put_artefact(digest, 'crop_info', crop_info)
+        return fingerprint_frames(frames, crop_info)
+
+    return media_store.cached_artefact(video_path, 'fingerprint', compute)
+
+
+class BKTree:
+    """Burkhard-Keller tree over 64-bit hashes with the Hamming distance."""
+
+    def __init__(self):
+        self.root = None  # [hash, values, {distance: child}]
+        self.size = 0
+
+    def add(self, value_hash: int, value):
+        self.size += 1
+        if self.root is None:
+            self.root = [value_hash, [value], {}]
+            return
+        node = self.root
+        while True:
+            distance = hamming(value_hash, node[0])
+            if distance == 0:
+                node[1].append(value)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [value_hash, [value], {}]
+                return
+            node = child
+
+    def search(self, value_hash: int, max_distance: int) -> List[tuple]:
+        """(distance, value) for every stored hash within `max_distance`."""
+        results = []
+        stack = [self.root] if self.root else []
+        while stack:
+            node = stack.pop()
+            distance = hamming(value_hash, node[0])
+            if distance <= max_distance:
+                results.extend((distance, value) for value in node[1])
+            for child_distance, child in node[2].items():
+                if distance - max_distance <= child_distance <= distance + max_distance:
+                    stack.append(child)
+        return results
+
+
+class FingerprintIndex:
+    """Fingerprints by key (reel URL) with near-duplicate lookup. `path=None` keeps it in memory."""
+
+    def __init__(self, path: Optional[str] = "temp/fingerprints.json",
+                 max_distance: int = MAX_DISTANCE, min_match: float = MIN_MATCH):
+        self.path = path
+        self.max_distance = max_distance
+        self.min_match = min_match
+        self.lock = threading.Lock()
+        self.claim_lock = threading.Lock()
+        self.entries, self.tree = None, None
+
+    def ensure_loaded(self):
+        """Read the index and build the tree on first use (callers hold `lock`)."""
+        if self.entries is None:
+            self.entries = self.load()
+            self.rebuild()
+
+    def load(self) -> Dict:
+        try:
+            if self.path and os.path.exists(self.path):
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+        except Exception as e:
+            print(f"--> Failed to load fingerprint index: {e}")
+        return {}
+
+    def save(self):
+        if not self.path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f)
+            os.replace(temp_path, self.path)
+        except Exception as e:
+            print(f"--> Failed to save fingerprint index: {e}")
+
+    def rebuild(self):
+        self.tree = BKTree()
+        for key, entry in self.entries.items():
+            for value_hash in entry['hashes']:
+                self.tree.add(value_hash, key)
+
+    def add(self, key: str, hashes: List[int], info: Dict = None):
+        if not hashes:
+            return
+        with self.lock:
+            self.ensure_loaded()
+            replaced = key in self.entries
+            self.entries[key] = {'hashes': list(hashes), 'info': info or {}, 'added': time.time()}
+            if replaced:
+                self.rebuild()
+            else:
+                for value_hash in hashes:
+                    self.tree.add(value_hash, key)
+            self.save()
+
+    def find_duplicate(self, hashes: List[int], exclude: str = None) -> Optional[Dict]:
+        """Best near-duplicate of a fingerprint: {'key', 'score', 'matched', 'info'}, or None."""
+        if not hashes:
+            return None
+        with self.lock:
+            self.ensure_loaded()
+            matched = {}
+            for value_hash in hashes:
+                for key in {key for _, key in self.tree.search(value_hash, self.max_distance)}:
+                    if key != exclude:
+                        matched[key] = matched.get(key, 0) + 1
+            if not matched:
+                return None
+            key, count = max(matched.items(), key=lambda item: item[1])
+            score = count / len(hashes)
+            if count < min(MIN_MATCHED_FRAMES, len(hashes)) or score < self.min_match:
+                return None
+            return {'key': key, 'score': score, 'matched': count, 'info': dict(self.entries[key].get('info', {}))}
+
+    def claim(self, key: str, hashes: List[int]) -> Optional[Dict]:
+        """Atomically: the near-duplicate of `hashes` if there is one, else add them under `key`."""
+        with self.claim_lock:
+            duplicate = self.find_duplicate(hashes, exclude=key)
+            if duplicate is None:
+                self.add(key, hashes)
+            return duplicate
+
+    def release(self, key: str):
+        """Drop `key` (a claim whose job failed), so a later repost of it is no longer flagged."""
+        with self.claim_lock, self.lock:
+            self.ensure_loaded()
+            if self.entries.pop(key, None) is not None:
+                self.rebuild()
+                self.save()
+
+    def get_stats(self) -> Dict:
+        with self.lock:
+            self.ensure_loaded()
+            return {'videos': len(self.entries), 'frame_hashes': self.tree.size}
+
+
+# Fingerprints of rendered reels
+fingerprint_index = FingerprintIndex()
+
+
+def check_duplicate(video_path: str, key: str, run_index: FingerprintIndex = None):
+    """
+    (fingerprint, duplicate) for a downloaded reel. `duplicate` describes the rendered
+    reel it matches or, when `run_index` is given, an earlier reel of the same run
+    (otherwise the reel claims its place in `run_index`).
+    """
+    hashes = get_fingerprint(video_path)
+    duplicate = fingerprint_index.find_duplicate(hashes)
+    if duplicate is None and run_index is not None:
+        duplicate = run_index.claim(key, hashes)
+    return hashes, duplicate
+
+
+def describe_duplicate(duplicate: Dict) -> str:
+    return f"near-duplicate of {duplicate['key']} ({duplicate['score']:.0%} of frames match)"
+
+
+def record_rendered(key: str, hashes: List[int], output_path: str = None):
+    """Remember a rendered reel so later reposts of it are detected."""
+    try:
+        fingerprint_index.add(key, hashes, {'output_path': output_path})
+    except Exception as e:
+        print(f"--> Could not record fingerprint: {e}")
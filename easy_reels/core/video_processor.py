@@ -14,6 +14,9 @@ from PIL import Image, ImageDraw, ImageFont
 import tempfile
 import re
 import datetime
+import uuid
+import threading
+import subprocess
 
 # Import MoviePy - handle both versions
 try:
@@ -22,10 +25,20 @@ except ImportError:
     from moviepy.editor import VideoFileClip, ImageClip, CompositeVideoClip, ColorClip
 
 from .config_manager import config
+from .media_store import media_store
 
+# Final output canvas, and the low-resolution proxy used for quick layout checks
+SCREEN_SIZE = (1080, 1920)
+PROXY_SCALE = 0.25  # 270x480
+PROXY_PRESET = "ultrafast"
 
-def detect_crop_dimensions(video_path: str, num_frames_to_sample=15) -> dict | None:
-    """Detect crop dimensions using background subtraction."""
+
+def detect_crop_dimensions(video_path: str, num_frames_to_sample=15, frames_out: list = None) -> dict | None:
+    """
+    Detect crop dimensions using background subtraction.
+    The sampled (blurred, grayscale) frames are appended to `frames_out` if given, so
+    other analyses (e.g. video fingerprints) can reuse them without decoding again.
+    """
     cap = None
     try:
         cap = cv2.VideoCapture(video_path)
@@ -45,6 +58,8 @@ def detect_crop_dimensions(video_path: str, num_frames_to_sample=15) -> dict | N
                 gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
                 blurred = cv2.GaussianBlur(gray, (21, 21), 0)
                 frames.append(blurred)
+        if frames_out is not None:
+            frames_out.extend(frames)
         
         if len(frames) < 3:
             return None
@@ -94,6 +109,161 @@ def detect_crop_dimensions(video_path: str, num_frames_to_sample=15) -> dict | N
             cap.release()
 
 
+def probe_video(video_path: str) -> dict | None:
+    """Cheap container probe: dimensions, fps, frame count and duration."""
+    cap = None
+    try:
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            return None
+
+        fps = cap.get(cv2.CAP_PROP_FPS) or 0
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        return {
+            'width': int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            'height': int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            'fps': fps,
+            'frame_count': frame_count,
+            'duration': frame_count / fps if fps else 0
+        }
+    except Exception as e:
+        print(f"--> Video probe failed: {e}")
+        return None
+    finally:
+        if cap is not None:
+            cap.release()
+
+
+def get_ffmpeg_exe() -> str:
+    """ffmpeg binary shipped with MoviePy (imageio-ffmpeg), or the one on PATH."""
+    try:
+        import imageio_ffmpeg
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    except Exception:
+        return "ffmpeg"
+
+
+def detect_dead_air(video_path: str, sample_fps: float = 4, black_level: float = 16,
+                    frozen_level: float = 1.5, analysis_width: int = 64) -> dict | None:
+    """
+    Find leading/trailing black or frozen frames with cheap low-resolution differencing.
+
+    ffmpeg samples the video at `sample_fps` and shrinks each sample to `analysis_width`
+    pixels wide (fps + scale filters), so only these small frames reach Python; no frame
+    is converted or copied at full resolution. Frames no other frame refers to are not
+    decoded at all (any frame near a sample time will do). Each sample is compared to the
+    previous one: it is "live" when it is not black and differs from it. Returns
+    {'start', 'end', 'duration'} of the live span in seconds.
+    """
+    try:
+        probe = probe_video(video_path)
+        if not probe or not probe['width'] or not probe['height']:
+            return None
+        width = analysis_width
+        height = max(2, int(round(probe['height'] * width / probe['width'] / 2)) * 2)
+
+        cmd = [
+            get_ffmpeg_exe(), "-hide_banner", "-loglevel", "error",
+            "-skip_frame", "noref", "-skip_loop_filter", "all", "-i", video_path, "-an",
+            "-vf", f"fps={sample_fps},scale={width}:{height}:flags=area",
+            "-f", "rawvideo", "-pix_fmt", "bgr24", "-"
+        ]
+        result = subprocess.run(cmd, capture_output=True)
+        if result.returncode != 0:
+            print(f"--> Dead-air analysis failed: {result.stderr.decode(errors='ignore')[-300:]}")
+            return None
+
+        sample_bytes = width * height * 3
+        count = len(result.stdout) // sample_bytes
+        if not count:
+            return None
+        samples = np.frombuffer(result.stdout, np.uint8, count * sample_bytes).reshape(count, height, width, 3)
+        gray = np.stack([cv2.cvtColor(sample, cv2.COLOR_BGR2GRAY) for sample in samples]).astype(np.int16)
+
+        duration = probe['duration'] or count / sample_fps
+        times = np.arange(count) / sample_fps
+        black = gray.mean(axis=(1, 2)) < black_level
+        moved = np.ones(count, bool)
+        moved[1:] = np.abs(np.diff(gray, axis=0)).mean(axis=(1, 2)) >= frozen_level
+
+        # The first sample has nothing to compare with: it is frozen if the second one is
+        if count > 1:
+            moved[0] = moved[1]
+        live_indices = np.flatnonzero(moved & ~black)
+        if not len(live_indices):
+            return {'start': 0.0, 'end': duration, 'duration': duration}
+
+        # The change happened between the previous sample and the first live one
+        first, last = int(live_indices[0]), int(live_indices[-1])
+        start = float(times[first - 1]) if first > 0 else 0.0
+        end = min(duration, float(times[last]) + 1 / sample_fps) if last < count - 1 else duration
+        return {'start': start, 'end': end, 'duration': end - start}
+
+    except Exception as e:
+        print(f"--> Dead-air analysis failed: {e}")
+        return None
+
+
+def find_keyframe_times(video_path: str) -> list:
+    """Presentation times (seconds) of the keyframes, read without decoding other frames."""
+    try:
+        cmd = [
+            get_ffmpeg_exe(), "-hide_banner", "-nostats",
+            "-skip_frame", "nokey", "-i", video_path,
+            "-an", "-vf", "showinfo", "-f", "null", "-"
+        ]
+        result = subprocess.run(cmd, capture_output=True, text=True, errors="ignore")
+        return [float(t) for t in re.findall(r"pts_time:([0-9.]+)", result.stderr)]
+    except Exception as e:
+        print(f"--> Keyframe scan failed: {e}")
+        return []
+
+
+def plan_trim(video_path: str, max_duration: float = None, trim_dead_air: bool = True,
+              min_dead_air: float = 0.5, keyframe_tolerance: float = 0.5, min_keep: float = 3.0) -> dict | None:
+    """
+    Decide the time window to render: dead air cut from both ends, then capped at
+    `max_duration`. The start snaps to a nearby keyframe so the decoder seeks straight
+    to it. Returns {'start_time', 'end_time', 'duration', 'source_duration'}, or None
+    when nothing needs trimming.
+    """
+    probe = probe_video(video_path)
+    if not probe or not probe['duration']:
+        return None
+
+    source_duration = probe['duration']
+    start, end = 0.0, source_duration
+
+    if trim_dead_air:
+        live = detect_dead_air(video_path)
+        # Mostly-static videos (talking over a still) keep their full length
+        if live and live['duration'] >= min(min_keep, source_duration):
+            if live['start'] >= min_dead_air:
+                start = live['start']
+            if source_duration - live['end'] >= min_dead_air:
+                end = live['end']
+
+    if start > 0:
+        keyframes = find_keyframe_times(video_path)
+        nearest = min(keyframes, key=lambda t: abs(t - start), default=None)
+        if nearest is not None and abs(nearest - start) <= keyframe_tolerance and nearest < end:
+            start = nearest
+
+    if max_duration and end - start > max_duration:
+        end = start + max_duration
+
+    if start <= 0 and end >= source_duration:
+        return None
+
+    print(f"--> Trim: {start:.2f}s - {end:.2f}s of {source_duration:.2f}s")
+    return {
+        'start_time': start,
+        'end_time': end,
+        'duration': end - start,
+        'source_duration': source_duration
+    }
+
+
 def create_text_image_with_pil(text: str, width: int, font_size: int = 60, font_path: str = None, style: str = 'transparent') -> str:
     """
     Create text image using PIL.
@@ -212,10 +382,44 @@ def create_text_image_with_pil(text: str, width: int, font_size: int = 60, font_
         print(f"--> Error creating text image: {e}")
         return None
 
+def compute_stacked_layout(screen_h: int, content_h: int, top_h: int = 0, has_logo: bool = False, scale: float = 1.0) -> dict:
+    """
+    Vertical positions for the STACKED layout: optional top element (header + title)
+    above the video, logo at 80% of the screen height. All pixel constants are
+    multiplied by `scale` so proxy renders keep the exact same proportions.
+    """
+    spacing_top = 50 * scale
+    total_content_h = content_h
+    if top_h:
+        total_content_h += top_h + spacing_top
+
+    start_y = max(80 * scale, (screen_h - total_content_h) / 2)
+    current_y = start_y
+
+    pos_top_element = None
+    if top_h:
+        pos_top_element = current_y
+        current_y += top_h + spacing_top
+
+    return {
+        'top_y': pos_top_element,
+        'video_y': current_y,
+        'logo_y': int(screen_h * 0.8) if has_logo else None
+    }
+
+
 def create_final_video(cropped_video_path, title_text, output_path, options: dict = None):
     """
     Assembles the final video. For taller videos that exceed a height threshold,
     the AI-generated title is omitted to maximize content visibility.
+
+    Extra options (all optional):
+    - 'render_scale': multiplies the 1080x1920 canvas and every layout constant (proxy renders).
+    - 'preset': libx264 preset, defaults to MoviePy's 'medium'.
+    - 'start_time' / 'end_time': render only this window of the source (see plan_trim).
+    - 'preview_seconds': only render the first N seconds (of the window).
+    - 'crop_info': crop applied on the fly instead of using a pre-cropped file.
+    - 'title_image_path': pre-rendered title PNG to reuse (not deleted afterwards).
     """
     print("--> Assembling final video...")
     if options is None:
@@ -225,16 +429,35 @@ def create_final_video(cropped_video_path, title_text, output_path, options: dic
     temp_text_image = None
 
     try:
-        screen_w, screen_h = 1080, 1920
+        scale = options.get('render_scale', 1.0)
+        screen_w, screen_h = int(SCREEN_SIZE[0] * scale), int(SCREEN_SIZE[1] * scale)
         video_clip = VideoFileClip(cropped_video_path)
-        clip_duration = video_clip.duration
+
+        crop_info = options.get('crop_info')
+        source_clip = video_clip
+        if crop_info:
+            source_clip = source_clip.crop(
+                x1=crop_info['x'],
+                y1=crop_info['y'],
+                x2=crop_info['x'] + crop_info['w'],
+                y2=crop_info['y'] + crop_info['h']
+            )
+
+        start_time = options.get('start_time') or 0
+        end_time = options.get('end_time') or video_clip.duration
+        preview_seconds = options.get('preview_seconds')
+        if preview_seconds:
+            end_time = min(end_time, start_time + preview_seconds)
+        if start_time > 0 or end_time < video_clip.duration:
+            source_clip = source_clip.subclip(start_time, min(end_time, video_clip.duration))
+        clip_duration = source_clip.duration
 
         add_branding = options.get('add_branding', True)
         add_logo = options.get('add_logo', True)
         font_path = "assets/fonts/font.ttf"
         
         # --- 🎬 1. Prepare Media Clips ---
-        video_content = video_clip.resize(width=screen_w)
+        video_content = source_clip.resize(width=screen_w)
         
         # <--- MODIFICATION START --->
         # For tall videos, don't use a title at all.
@@ -245,30 +468,31 @@ def create_final_video(cropped_video_path, title_text, output_path, options: dic
         # <--- MODIFICATION END --->
 
         if title_text and title_text.strip():
-            text_width = int(screen_w * 0.9)
-            
-            # The style will always be 'transparent' now, as the other case is handled by removing the title.
-            temp_text_image = create_text_image_with_pil(
-                title_text, text_width, 60, 
-                font_path if os.path.exists(font_path) else None,
-                style='transparent'
-            )
-
-            if not temp_text_image:
+            title_image = options.get('title_image_path')
+            if not title_image or not os.path.exists(title_image):
+                # The title is always rendered at full resolution and scaled down for proxies,
+                # so line wrapping is identical in both renders.
+                temp_text_image = create_title_image(title_text, font_path)
+                title_image = temp_text_image
+
+            if not title_image:
                 raise Exception("Failed to create text image")
             
-            title_image_clip = ImageClip(temp_text_image, transparent=True).set_duration(clip_duration)
+            title_image_clip = ImageClip(title_image, transparent=True).set_duration(clip_duration)
+            if scale != 1.0:
+                title_image_clip = title_image_clip.resize(scale)
             if add_branding:
                 profpic_path = "assets/profpic.jpg"
                 if not os.path.exists(profpic_path):
                     raise Exception(f"Profile pic not found: {profpic_path}.")
                 header = ImageClip(profpic_path).set_duration(clip_duration).resize(width=screen_w)
+                title_gap = int(10 * scale)
                 top_element = CompositeVideoClip(
                     [
                         header.set_position(('center', 0)),
-                        title_image_clip.set_position(('center', header.h + 10))
+                        title_image_clip.set_position(('center', header.h + title_gap))
                     ], 
-                    size=(screen_w, header.h + 10 + title_image_clip.h)
+                    size=(screen_w, header.h + title_gap + title_image_clip.h)
                 ).set_duration(clip_duration)
             else:
                 top_element = title_image_clip
@@ -276,7 +500,7 @@ def create_final_video(cropped_video_path, title_text, output_path, options: dic
         if add_logo:
             logo_path = "assets/logo.png"
             if os.path.exists(logo_path):
-                logo = ImageClip(logo_path, transparent=True).set_duration(clip_duration).resize(width=225)
+                logo = ImageClip(logo_path, transparent=True).set_duration(clip_duration).resize(width=int(225 * scale))
             else:
                 print("--> WARNING: 'Add Logo' is ON, but logo.png was not found in assets folder.")
 
@@ -284,39 +508,29 @@ def create_final_video(cropped_video_path, title_text, output_path, options: dic
         # The layout logic simplifies, as the 'OVERLAP' case is no longer needed
         # because tall videos will have no 'top_element'.
         print(f"--> Using STACKED layout.")
-        spacing_top = 50
-        total_content_h = video_content.h
-        pos_top_element = None
-        
-        if top_element:
-            total_content_h += top_element.h + spacing_top
-        
-        start_y = max(80, (screen_h - total_content_h) / 2)
-        current_y = start_y
-        
-        if top_element:
-            pos_top_element = current_y
-            current_y += top_element.h + spacing_top
-        
-        pos_video_y = current_y
-        pos_logo_y = int(screen_h * 0.8) if logo else None
+        layout = compute_stacked_layout(
+            screen_h, video_content.h,
+            top_h=top_element.h if top_element else 0,
+            has_logo=bool(logo), scale=scale
+        )
         
         # --- 🎬 3. Build and Render ---
         clips_for_final = [
             ColorClip(size=(screen_w, screen_h), color=(0, 0, 0), duration=clip_duration),
-            video_content.set_position(('center', pos_video_y))
+            video_content.set_position(('center', layout['video_y']))
         ]
         if top_element:
-            clips_for_final.append(top_element.set_position(('center', pos_top_element)))
+            clips_for_final.append(top_element.set_position(('center', layout['top_y'])))
         if logo:
-            clips_for_final.append(logo.set_position(('center', pos_logo_y)))
+            clips_for_final.append(logo.set_position(('center', layout['logo_y'])))
 
         final_video = CompositeVideoClip(clips_for_final, size=(screen_w, screen_h)).set_audio(video_content.audio)
 
         print(f"--> Writing final video to: {output_path}")
         final_video.write_videofile(
             output_path, fps=video_clip.fps, codec="libx264", 
-            audio_codec="aac", logger=None, threads=4
+            audio_codec="aac", logger=None, threads=4,
+            preset=options.get('preset', 'medium')
         )
         print("--> Final video created successfully!")
 
@@ -336,6 +550,17 @@ def create_final_video(cropped_video_path, title_text, output_path, options: dic
         gc.collect()
 
 
+def create_title_image(title_text: str, font_path: str = "assets/fonts/font.ttf") -> str:
+    """Render the title PNG exactly as create_final_video lays it out at full resolution."""
+    text_width = int(SCREEN_SIZE[0] * 0.9)
+    # The style will always be 'transparent' now, as the tall-video case is handled by removing the title.
+    return create_text_image_with_pil(
+        title_text, text_width, 60,
+        font_path if os.path.exists(font_path) else None,
+        style='transparent'
+    )
+
+
 
 def generate_day_number_filename(output_dir: str, daily_limit: int, extension="mp4") -> str:
     """
@@ -399,6 +624,120 @@ class VideoProcessor:
         self.output_dir.mkdir(exist_ok=True)
         self.assets_dir.mkdir(exist_ok=True)
 
+        # Crop/title assets computed per input video, shared by proxy and final renders.
+        # The proxy preview and the final render may run in different threads, so each
+        # entry counts the renders using it and is only dropped by the last one.
+        self.render_assets = {}
+        self.render_assets_lock = threading.Lock()
+
+    def _assets(self, input_path: str) -> dict:
+        with self.render_assets_lock:
+            return self.render_assets.setdefault(input_path, {
+                'lock': threading.Lock(), 'users': 0, 'release': False, 'title_images': {}, 'trims': {}
+            })
+
+    def acquire_render_assets(self, input_path: str):
+        """Start of a render of `input_path`: its assets stay until `release_render_assets`."""
+        assets = self._assets(input_path)
+        with self.render_assets_lock:
+            assets['users'] += 1
+            assets['release'] = False
+
+    def prepare_render_assets(self, input_path: str, title_text: str = "", detect_crop: bool = True) -> dict:
+        """
+        Crop dimensions and title image for one render ({'crop_info', 'title_image'}),
+        computed once per video and title. A proxy render followed by the final render
+        of the same input reuses them, and the crop of a stored video is kept per content
+        hash (see media_store).
+        """
+        assets = self._assets(input_path)
+        with assets['lock']:
+            if detect_crop and 'crop_info' not in assets:
+                print("--> Detecting crop dimensions...")
+                assets['crop_info'] = media_store.cached_artefact(
+                    input_path, 'crop_info', lambda: detect_crop_dimensions(input_path)
+                )
+            elif detect_crop:
+                print("--> Reusing detected crop dimensions")
+
+            title_image = None
+            if title_text and title_text.strip():
+                # One image per title, so a render with another title never replaces this one
+                title_image = assets['title_images'].get(title_text)
+                if not title_image or not os.path.exists(title_image):
+                    title_image = assets['title_images'][title_text] = create_title_image(title_text)
+            return {'crop_info': assets.get('crop_info'), 'title_image': title_image}
+
+    def prepare_trim(self, input_path: str, options: dict = None) -> dict | None:
+        """
+        Compute (once per max duration) the window to render: dead air cut from the ends
+        when options['trim_dead_air'] is set, then capped at options['max_duration'].
+        """
+        options = options or {}
+        assets = self._assets(input_path)
+        key = (options.get('max_duration'), bool(options.get('trim_dead_air')))
+        with assets['lock']:
+            if key not in assets['trims']:
+                if key[0] or key[1]:
+                    print("--> Planning trim...")
+                    assets['trims'][key] = media_store.cached_artefact(
+                        input_path, f"trim:{key[0]}:{key[1]}",
+                        lambda: plan_trim(input_path, max_duration=key[0], trim_dead_air=key[1])
+                    )
+                else:
+                    assets['trims'][key] = None
+            return assets['trims'][key]
+
+    def release_render_assets(self, input_path: str, forget: bool = True):
+        """
+        End of a render. With `forget` the video's assets (and title images) are dropped
+        once no other render is still using them; without, they are kept for the next render.
+        """
+        with self.render_assets_lock:
+            assets = self.render_assets.get(input_path)
+            if not assets:
+                return
+            assets['users'] = max(0, assets['users'] - 1)
+            assets['release'] = assets['release'] or forget
+            if assets['users'] or not assets['release']:
+                return
+            self.render_assets.pop(input_path)
+        for title_image in assets['title_images'].values():
+            if os.path.exists(title_image):
+                try: os.remove(title_image)
+                except Exception: pass
+
+    def render_proxy(self, input_path: str, ai_content: dict, options: dict = None, preview_seconds: float = None) -> str:
+        """
+        Render a 270x480 proxy with the exact same layout as the final video, using the
+        fastest x264 preset and cropping on the fly (no intermediate crop encode).
+        Optionally only the first `preview_seconds` seconds are rendered.
+        """
+        title_text = ai_content.get('title', '') if ai_content else ''
+        self.acquire_render_assets(input_path)
+        try:
+            assets = self.prepare_render_assets(input_path, title_text)
+            trim = self.prepare_trim(input_path, options)
+
+            proxy_path = self.temp_dir / f"proxy_{Path(input_path).stem}.mp4"
+            proxy_options = dict(options or {})
+            proxy_options.update({
+                'render_scale': PROXY_SCALE,
+                'preset': PROXY_PRESET,
+                'preview_seconds': preview_seconds,
+                'crop_info': assets.get('crop_info'),
+                'title_image_path': assets.get('title_image')
+            })
+            if trim:
+                proxy_options.update({'start_time': trim['start_time'], 'end_time': trim['end_time']})
+
+            print(f"--> Rendering proxy preview: {proxy_path}")
+            create_final_video(input_path, title_text, str(proxy_path), proxy_options)
+            return str(proxy_path)
+        finally:
+            # Kept for the final render of the same video, which releases them
+            self.release_render_assets(input_path, forget=False)
+
     def safe_file_remove(self, file_path: str, max_retries: int = 5) -> bool:
         """Safely remove file with retries."""
         for attempt in range(max_retries):
@@ -446,6 +785,7 @@ class VideoProcessor:
         cropped_video_path = None
         original_clip = None
         cropped_clip = None
+        self.acquire_render_assets(input_path)
 
         try:
             print(f"--> Starting video processing: {input_path}")
@@ -465,21 +805,56 @@ class VideoProcessor:
             effective_output_dir = Path(custom_output_dir) if custom_output_dir else self.output_dir
             print(f"--> Using output directory: {effective_output_dir}")
 
-            # Step 1: Detect crop dimensions
-            print("--> Detecting crop dimensions...")
-            crop_info = detect_crop_dimensions(input_path)
-
             cropped_video_path = input_path
-
-            if crop_info:
+            use_frame_pipeline = bool(options and options.get('frame_pipeline'))
+            mezzanine = None
+
+            mezzanine_key = None
+
+            if options and options.get('mezzanine_cache'):
+                # Cached cropped/scaled track: a title change only re-composites the overlay.
+                # options['content_hash'] is the source's hash recorded at the first render.
+                from .mezzanine_cache import mezzanine_cache, content_hash_for
+                mezzanine_key = mezzanine_cache.make_key(options.get('content_hash') or content_hash_for(input_path), options)
+                mezzanine = mezzanine_cache.get(mezzanine_key)
+                if mezzanine:
+                    print("--> Mezzanine cache hit, skipping crop detection and crop encode")
+                elif not os.path.exists(input_path):
+                    raise FileNotFoundError(f"Source video is no longer available ({input_path}) and no "
+                                            f"mezzanine track is cached for it - process the reel again")
+
+            if mezzanine:
+                assets = self.prepare_render_assets(input_path, title_text, detect_crop=False)
+                crop_info, trim = None, None
+            else:
+                # Step 1: Detect crop dimensions (reused if a proxy was rendered first)
+                assets = self.prepare_render_assets(input_path, title_text)
+                crop_info = assets.get('crop_info')
+                trim = self.prepare_trim(input_path, options)
+                if mezzanine_key and options.get('build_mezzanine'):
+                    # Only re-renders build the track, so a reel rendered once pays no extra encode
+                    mezzanine = mezzanine_cache.build(mezzanine_key, input_path, crop_info, trim)
+                    crop_info, trim = None, None
+
+            if mezzanine:
+                print(f"--> Rendering from mezzanine track: {mezzanine['track_path']}")
+            elif crop_info and use_frame_pipeline:
+                # The pipeline's decoder crops on the fly, no intermediate encode needed
+                print(f"--> Cropping detected: {crop_info} (applied by frame pipeline)")
+            elif crop_info:
                 print(f"--> Cropping detected: {crop_info}")
 
                 timestamp = int(time.time())
-                temp_filename = f"cropped_{timestamp}_{os.getpid()}.mp4"
+                # Unique per call: several renders may run in parallel in one process
+                temp_filename = f"cropped_{timestamp}_{os.getpid()}_{uuid.uuid4().hex[:8]}.mp4"
                 cropped_video_path = str(self.temp_dir / temp_filename)
 
                 original_clip = VideoFileClip(input_path)
-                cropped_clip = original_clip.crop(
+                source_clip = original_clip
+                if trim:
+                    # Only the trimmed window is cropped, the rest is never decoded again
+                    source_clip = original_clip.subclip(trim['start_time'], min(trim['end_time'], original_clip.duration))
+                cropped_clip = source_clip.crop(
                     x1=crop_info['x'],
                     y1=crop_info['y'],
                     x2=crop_info['x'] + crop_info['w'],
@@ -504,18 +879,37 @@ class VideoProcessor:
             else:
                 print("--> No cropping needed, using original video")
 
-            # Step 2: Generate output filename with day-number and daily limit
-            daily_limit = options.get('daily_limit', 10) if options else 10
+            # Step 2: Generate output filename with day-number and daily limit,
+            # unless the caller already reserved one (parallel batch renders).
+            requested_output = options.get('output_path') if options else None
+            if requested_output:
+                output_path = Path(requested_output)
+                effective_output_dir = output_path.parent
+                effective_output_dir.mkdir(parents=True, exist_ok=True)
+            else:
+                daily_limit = options.get('daily_limit', 10) if options else 10
 
-            # --- 👇 MODIFICATION 5 ---
-            # Pass the correct output directory to the filename generator.
-            output_filename = generate_day_number_filename(str(effective_output_dir), daily_limit, extension="mp4")
-            output_path = effective_output_dir / output_filename
+                # --- 👇 MODIFICATION 5 ---
+                # Pass the correct output directory to the filename generator.
+                output_filename = generate_day_number_filename(str(effective_output_dir), daily_limit, extension="mp4")
+                output_path = effective_output_dir / output_filename
 
             print(f"--> Creating final video: {output_path}")
 
             # Use modified create_final_video function (no ImageMagick)
-            create_final_video(cropped_video_path, title_text, str(output_path), options)
+            final_options = dict(options or {})
+            final_options['title_image_path'] = assets.get('title_image')
+            if trim and (use_frame_pipeline or cropped_video_path == input_path):
+                # The pre-cropped file already starts at the trim point
+                final_options['start_time'] = trim['start_time']
+                final_options['end_time'] = trim['end_time']
+            mezzanine_track = mezzanine['track_path'] if mezzanine else None
+            if use_frame_pipeline:
+                from .frame_pipeline import render_with_frame_pipeline
+                final_options['crop_info'] = crop_info
+                render_with_frame_pipeline(mezzanine_track or input_path, str(output_path), title_text, final_options)
+            else:
+                create_final_video(mezzanine_track or cropped_video_path, title_text, str(output_path), final_options)
 
             # Step 3: Save caption
             # --- 👇 MODIFICATION 6 ---
@@ -523,6 +917,7 @@ class VideoProcessor:
             caption_path = self.save_caption_to_file(caption_text, str(output_path), effective_output_dir)
 
             # Step 4: Cleanup
+            self.release_render_assets(input_path)
             if cropped_video_path != input_path:
                 time.sleep(1)
                 self.safe_file_remove(cropped_video_path)
@@ -542,6 +937,7 @@ class VideoProcessor:
                 cropped_clip.close()
             if cropped_video_path and cropped_video_path != input_path:
                 self.safe_file_remove(cropped_video_path)
+            self.release_render_assets(input_path)
 
             raise
 
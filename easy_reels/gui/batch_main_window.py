@@ -14,9 +14,16 @@ import json
 import shutil
 import time
 # ADD THESE IMPORTS (SAME AS MAIN_WINDOW)
-from easy_reels.core.instagram_downloader import InstagramDownloader
+from easy_reels.core.prefetch_queue import PrefetchQueue
+from easy_reels.core.async_generation import AsyncGenerationQueue
+from easy_reels.core.ai_response_cache import ai_response_cache, describe_cache_stats
+from easy_reels.core.groq_key_pool import describe_key_usage
 from easy_reels.core.ai_content_generator import AIContentGenerator, ApiKeyManager
 from easy_reels.core.video_processor import VideoProcessor
+from easy_reels.core.file_naming_manager import next_day_limit_filename
+from easy_reels.core.batch_pipeline import BatchPipeline
+from easy_reels.core.video_fingerprint import (FingerprintIndex, get_fingerprint, check_duplicate,
+                                               describe_duplicate, record_rendered)
 from easy_reels.gui.reels_scraper import ReelScraperApp 
 
 api_key_manager = ApiKeyManager()
@@ -446,6 +453,12 @@ class EmbeddedTemplateEditor(ctk.CTkToplevel):
         self.description_entry = ctk.CTkEntry(self.info_frame, height=32, placeholder_text="Brief description")
         self.description_entry.grid(row=2, column=1, padx=10, pady=8, sticky="ew")
         
+        # Max duration (optional trim before render)
+        ctk.CTkLabel(self.info_frame, text="Max Duration (s):", 
+                     font=ctk.CTkFont(size=12, weight="bold")).grid(row=3, column=0, padx=10, pady=8, sticky="w")
+        self.max_duration_entry = ctk.CTkEntry(self.info_frame, height=32, placeholder_text="Leave empty for full length")
+        self.max_duration_entry.grid(row=3, column=1, padx=10, pady=8, sticky="ew")
+        
         # Tabview for prompts
         self.tabview = ctk.CTkTabview(self.editor_frame)
         self.tabview.grid(row=2, column=0, padx=20, pady=(0, 15), sticky="nsew")
@@ -570,6 +583,10 @@ class EmbeddedTemplateEditor(ctk.CTkToplevel):
         self.description_entry.delete(0, tk.END)
         self.description_entry.insert(0, template_data.get("description", ""))
         
+        self.max_duration_entry.delete(0, tk.END)
+        if template_data.get("max_duration"):
+            self.max_duration_entry.insert(0, str(template_data["max_duration"]))
+        
         self.title_prompt_text.delete("1.0", tk.END)
         self.title_prompt_text.insert("1.0", template_data.get("title_prompt", ""))
         
@@ -589,6 +606,7 @@ class EmbeddedTemplateEditor(ctk.CTkToplevel):
         self.name_entry.configure(state=state)
         self.handle_entry.configure(state=state)
         self.description_entry.configure(state=state)
+        self.max_duration_entry.configure(state=state)
         self.title_prompt_text.configure(state=state)
         self.caption_prompt_text.configure(state=state)
         self.save_btn.configure(state=state)
@@ -723,6 +741,16 @@ class EmbeddedTemplateEditor(ctk.CTkToplevel):
             messagebox.showwarning("Validation Error", "Caption prompt is required")
             return
             
+        max_duration = self.max_duration_entry.get().strip()
+        if max_duration:
+            try:
+                template_data["max_duration"] = float(max_duration)
+                if template_data["max_duration"] <= 0:
+                    raise ValueError
+            except ValueError:
+                messagebox.showwarning("Validation Error", "Max duration must be a positive number of seconds")
+                return
+            
         # Save
         if self.template_manager.update_template(self.current_template_id, template_data):
             self.load_templates()
@@ -747,6 +775,154 @@ class EmbeddedTemplateEditor(ctk.CTkToplevel):
         else:
             messagebox.showerror("Error", "Failed to set template as current")
 
+# ═══════════════════════════════════════════════════════════════════════════════
+# TWO-PHASE BATCH REVIEW TABLE
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class ReviewTableDialog(ctk.CTkToplevel):
+    """Review table for phase one results: approve, edit or reject each job before rendering."""
+    
+    def __init__(self, parent, jobs, on_render=None, on_cancel=None):
+        super().__init__(parent)
+        
+        self.jobs = jobs
+        self.on_render = on_render
+        self.on_cancel = on_cancel
+        self.rows = []
+        
+        # Configure window
+        self.title("Review AI Content Before Rendering")
+        self.geometry("1000x650")
+        self.minsize(800, 500)
+        
+        self.transient(parent)
+        self.grab_set()
+        self.protocol("WM_DELETE_WINDOW", self.cancel)
+        
+        self.create_ui()
+        
+    def create_ui(self):
+        """Create one row per job with approve checkbox, editable title and caption."""
+        ready_count = sum(1 for job in self.jobs if job['status'] == 'ready')
+        ctk.CTkLabel(
+            self, 
+            text=f"📝 {ready_count} of {len(self.jobs)} reels ready - untick anything that should not be rendered",
+            font=ctk.CTkFont(size=13, weight="bold")
+        ).pack(pady=(15, 5))
+        
+        table = ctk.CTkScrollableFrame(self)
+        table.pack(fill="both", expand=True, padx=15, pady=10)
+        table.grid_columnconfigure(2, weight=1)
+        table.grid_columnconfigure(3, weight=2)
+        
+        for col, header in enumerate(["✔", "#", "Title", "Caption"]):
+            ctk.CTkLabel(table, text=header, font=ctk.CTkFont(size=11, weight="bold")).grid(row=0, column=col, padx=5, pady=5, sticky="w")
+        
+        for row_index, job in enumerate(self.jobs, start=1):
+            approve_var = ctk.BooleanVar(value=job.get('approved', False))
+            check = ctk.CTkCheckBox(table, text="", variable=approve_var, width=24)
+            check.grid(row=row_index, column=0, padx=5, pady=5, sticky="n")
+            
+            ctk.CTkLabel(table, text=str(job['index'] + 1), font=ctk.CTkFont(size=10)).grid(row=row_index, column=1, padx=5, pady=5, sticky="n")
+            
+            if job['status'] == 'duplicate':
+                # Flagged repost: left unticked, but can still be approved
+                ctk.CTkLabel(
+                    table, text=f"🔁 {job.get('error')}\n{job['url'][:60]}",
+                    font=ctk.CTkFont(size=10), text_color="orange", justify="left"
+                ).grid(row=row_index, column=2, columnspan=2, padx=5, pady=5, sticky="w")
+                self.rows.append((job, approve_var, None, None))
+                continue
+            
+            if job['status'] != 'ready':
+                check.configure(state="disabled")
+                ctk.CTkLabel(
+                    table, text=f"❌ {job.get('error') or job['status']}\n{job['url'][:60]}",
+                    font=ctk.CTkFont(size=10), text_color="orange", justify="left"
+                ).grid(row=row_index, column=2, columnspan=2, padx=5, pady=5, sticky="w")
+                self.rows.append((job, approve_var, None, None))
+                continue
+            
+            title_entry = ctk.CTkEntry(table, font=ctk.CTkFont(size=11))
+            title_entry.insert(0, job['ai_content'].get('title', ''))
+            title_entry.grid(row=row_index, column=2, padx=5, pady=5, sticky="new")
+            
+            caption_box = ctk.CTkTextbox(table, height=80, font=ctk.CTkFont(size=10))
+            caption_box.insert("1.0", job['ai_content'].get('caption', ''))
+            caption_box.grid(row=row_index, column=3, padx=5, pady=5, sticky="ew")
+            
+            self.rows.append((job, approve_var, title_entry, caption_box))
+        
+        button_frame = ctk.CTkFrame(self, fg_color="transparent")
+        button_frame.pack(fill="x", padx=15, pady=(0, 15))
+        
+        ctk.CTkButton(button_frame, text="Cancel", command=self.cancel, fg_color="gray", width=120).pack(side="right", padx=5)
+        ctk.CTkButton(
+            button_frame, text="🎬 Render Approved", command=self.render,
+            width=180, font=ctk.CTkFont(size=12, weight="bold")
+        ).pack(side="right", padx=5)
+        
+    def render(self):
+        """Write edits back into the jobs and hand them to phase two."""
+        for job, approve_var, title_entry, caption_box in self.rows:
+            job['approved'] = bool(approve_var.get()) and job['status'] in ('ready', 'duplicate')
+            if title_entry is not None:
+                job['ai_content']['title'] = title_entry.get().strip()
+                job['ai_content']['caption'] = caption_box.get("1.0", "end").strip()
+        
+        self.grab_release()
+        self.destroy()
+        if self.on_render:
+            self.on_render(self.jobs)
+            
+    def cancel(self):
+        """Close without rendering anything."""
+        self.grab_release()
+        self.destroy()
+        if self.on_cancel:
+            self.on_cancel(self.jobs)
+
+class FanOutDialog(ctk.CTkToplevel):
+    """Pick the templates (accounts) every URL should be rendered for."""
+    
+    def __init__(self, parent, template_manager, on_confirm=None):
+        super().__init__(parent)
+        
+        self.template_manager = template_manager
+        self.on_confirm = on_confirm
+        self.template_vars = {}
+        
+        self.title("Fan-out: One Download, Several Templates")
+        self.geometry("420x480")
+        self.transient(parent)
+        self.grab_set()
+        
+        ctk.CTkLabel(self, text="🔀 Render each URL for these templates:",
+                     font=ctk.CTkFont(size=13, weight="bold")).pack(pady=(15, 10))
+        
+        list_frame = ctk.CTkScrollableFrame(self)
+        list_frame.pack(fill="both", expand=True, padx=15, pady=5)
+        for template_id, template in template_manager.templates.items():
+            var = ctk.BooleanVar(value=False)
+            label = f"{template.get('name', template_id)} ({template.get('account_handle', '')})"
+            ctk.CTkCheckBox(list_frame, text=label, variable=var).pack(anchor="w", padx=10, pady=4)
+            self.template_vars[template_id] = var
+        
+        button_frame = ctk.CTkFrame(self, fg_color="transparent")
+        button_frame.pack(fill="x", padx=15, pady=15)
+        ctk.CTkButton(button_frame, text="Cancel", command=self.destroy, fg_color="gray", width=100).pack(side="right", padx=5)
+        ctk.CTkButton(button_frame, text="🚀 Start Fan-out", command=self.confirm, width=140).pack(side="right", padx=5)
+        
+    def confirm(self):
+        template_ids = [template_id for template_id, var in self.template_vars.items() if var.get()]
+        if not template_ids:
+            messagebox.showwarning("No Templates", "Select at least one template", parent=self)
+            return
+        self.grab_release()
+        self.destroy()
+        if self.on_confirm:
+            self.on_confirm(template_ids)
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # INITIALIZE EMBEDDED TEMPLATE MANAGER
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -899,7 +1075,10 @@ class BatchEasyReelsApp(ctk.CTk):
             if hasattr(self, 'ai_generator') and self.ai_generator:
                 status = self.ai_generator.get_api_key_status()
                 
-                if status["status"] == "configured":
+                if status["status"] == "configured" and status.get("pool_mode"):
+                    text = f"🔑 Key pool: {status['pool_keys']} of {status['total_keys']} keys in use"
+                    color = "lightgreen"
+                elif status["status"] == "configured":
                     text = f"🔑 {status['key_name']} ({status['total_keys']} keys available)"
                     color = "lightgreen"
                 elif status["status"] == "no_key":
@@ -1017,15 +1196,15 @@ class BatchEasyReelsApp(ctk.CTk):
             # Create manager window
             manager_window = ctk.CTkToplevel(self)
             manager_window.title("API Key Manager")
-            manager_window.geometry("550x450")
+            manager_window.geometry("600x560")
             manager_window.transient(self)
             manager_window.grab_set()
             
             # Center window
             manager_window.update_idletasks()
-            x = (manager_window.winfo_screenwidth() // 2) - (275)
-            y = (manager_window.winfo_screenheight() // 2) - (225)
-            manager_window.geometry(f"550x450+{x}+{y}")
+            x = (manager_window.winfo_screenwidth() // 2) - (300)
+            y = (manager_window.winfo_screenheight() // 2) - (280)
+            manager_window.geometry(f"600x560+{x}+{y}")
             
             # Title
             ctk.CTkLabel(manager_window, text="🔑 API Key Manager", 
@@ -1117,6 +1296,19 @@ class BatchEasyReelsApp(ctk.CTk):
             ctk.CTkLabel(keys_section, text="Current API Keys", 
                          font=ctk.CTkFont(size=14, weight="bold")).pack(pady=(10, 5))
             
+            # Key pool: spread requests over every enabled key instead of the current one
+            pool_var = ctk.BooleanVar(value=self.ai_generator.api_key_manager.is_pool_mode())
+            
+            def toggle_pool_mode():
+                self.ai_generator.set_pool_mode(pool_var.get())
+                mode = "pool of enabled keys" if pool_var.get() else "current key only"
+                self.log_message(f"🔑 API key mode: {mode}")
+                self.update_api_key_display()
+            
+            ctk.CTkSwitch(keys_section, text="Key pool: spread requests over all enabled keys",
+                          variable=pool_var, command=toggle_pool_mode,
+                          font=ctk.CTkFont(size=11)).pack(anchor="w", padx=15, pady=(0, 5))
+            
             # Keys list
             keys_list = ctk.CTkScrollableFrame(keys_section, height=150)
             keys_list.pack(fill="both", expand=True, padx=15, pady=(5, 15))
@@ -1125,6 +1317,7 @@ class BatchEasyReelsApp(ctk.CTk):
             existing_keys = self.ai_generator.get_api_keys()
             current_info = self.ai_generator.get_current_api_key_info()
             current_id = current_info["id"] if current_info else None
+            usage_labels = {}
             
             if existing_keys:
                 for key_id in existing_keys:
@@ -1139,9 +1332,21 @@ class BatchEasyReelsApp(ctk.CTk):
                     status_text = "🟢 CURRENT" if is_current else "⚫"
                     info_text = f"{status_text} {key_name}"
                     
-                    ctk.CTkLabel(key_frame, text=info_text, 
+                    info_frame = ctk.CTkFrame(key_frame, fg_color="transparent")
+                    info_frame.pack(side="left", fill="x", expand=True)
+                    ctk.CTkLabel(info_frame, text=info_text, 
                                  font=ctk.CTkFont(size=11, weight="bold" if is_current else "normal"),
-                                 text_color="lightgreen" if is_current else "white").pack(side="left", padx=10, pady=8)
+                                 text_color="lightgreen" if is_current else "white").pack(anchor="w", padx=10, pady=(6, 0))
+                    usage_labels[key_id] = ctk.CTkLabel(info_frame, text="", font=ctk.CTkFont(size=9),
+                                                        text_color="gray")
+                    usage_labels[key_id].pack(anchor="w", padx=10, pady=(0, 6))
+                    
+                    # Enabled keys take part in the pool
+                    enabled_var = ctk.BooleanVar(value=key_data.get("enabled", True) if key_data else True)
+                    ctk.CTkCheckBox(key_frame, text="In pool", variable=enabled_var, width=80,
+                                    font=ctk.CTkFont(size=10),
+                                    command=lambda kid=key_id, var=enabled_var: self.ai_generator.set_api_key_enabled(kid, var.get())
+                                    ).pack(side="right", padx=10)
             else:
                 ctk.CTkLabel(keys_list, text="No API keys found. Add one above.", 
                              font=ctk.CTkFont(size=11), text_color="gray").pack(pady=20)
@@ -1157,6 +1362,21 @@ class BatchEasyReelsApp(ctk.CTk):
             ctk.CTkButton(bottom_frame, text="Close", command=manager_window.destroy, 
                           height=35, fg_color="gray").pack(side="right", padx=5, pady=10)
             
+            # Live usage of the keys in use (requests, tokens, quota left, throttled/invalid)
+            def refresh_usage():
+                try:
+                    if not manager_window.winfo_exists():
+                        return
+                    usage = {entry['id']: entry for entry in self.ai_generator.get_key_usage()}
+                    for key_id, label in usage_labels.items():
+                        entry = usage.get(key_id)
+                        label.configure(text=describe_key_usage(entry) if entry else "not in use",
+                                        text_color="orange" if entry and entry['status'] != 'ok' else "gray")
+                    manager_window.after(1000, refresh_usage)
+                except Exception:
+                    pass
+            
+            refresh_usage()
             print("🔑 API key manager opened")
             
         except Exception as e:
@@ -1583,6 +1803,14 @@ class BatchEasyReelsApp(ctk.CTk):
         )
         self.stop_btn.grid(row=1, column=1, padx=(5, 10), pady=5, sticky="ew")
 
+        self.fan_out_button = ctk.CTkButton(
+            action_frame, 
+            text="🔀 Fan-out to Templates", 
+            command=self.start_fan_out, 
+            height=30
+        )
+        self.fan_out_button.grid(row=2, column=0, columnspan=2, padx=10, pady=5, sticky="ew")
+
     def add_dummy_link(self):
         """Adds a predefined dummy Instagram Reel URL to the textbox for testing."""
         dummy_url = "https://www.instagram.com/reels/DPhJIzjiWgm/"
@@ -1698,9 +1926,10 @@ class BatchEasyReelsApp(ctk.CTk):
         self.daily_video_limit_entry.configure(state=state)
         self.log_message(f"📊 Daily limit {'enabled' if enabled else 'disabled'}")
 
-    def get_next_filename(self, output_dir):
+    def get_next_filename(self, output_dir, reserved=None):
         '''
         Generate the next filename based on daily limit system.
+        `reserved` collects names handed out to renders that have not finished yet.
         Returns tuple: (video_filename, caption_filename, day_number, video_number)
         '''
         try:
@@ -1708,6 +1937,9 @@ class BatchEasyReelsApp(ctk.CTk):
             if not self.use_daily_limit_var.get():
                 # Fallback to timestamp-based naming
                 timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+                if reserved is not None:
+                    timestamp = f"{timestamp}_{len(reserved) + 1}"
+                    reserved.add(timestamp)
                 video_name = f"video_{timestamp}.mp4"
                 caption_name = f"video_{timestamp}_caption.txt"
                 return video_name, caption_name, None, None
@@ -1716,43 +1948,9 @@ class BatchEasyReelsApp(ctk.CTk):
             start_day = int(self.start_day_entry.get().strip() or "1")
             daily_limit = int(self.daily_video_limit_entry.get().strip() or "12")
             
-            # Scan existing files to find the current count
-            existing_files = []
-            if os.path.exists(output_dir):
-                for file in os.listdir(output_dir):
-                    if file.endswith('.mp4') and '-' in file:
-                        try:
-                            # Extract day and number from filename (e.g., "6-5.mp4" -> day=6, num=5)
-                            base = file.replace('.mp4', '')
-                            parts = base.split('-')
-                            if len(parts) == 2:
-                                day = int(parts[0])
-                                num = int(parts[1])
-                                existing_files.append((day, num))
-                        except:
-                            continue
-            
-            # Determine next day and number
-            if not existing_files:
-                # No files exist, start fresh
-                current_day = start_day
-                current_num = 1
-            else:
-                # Find the highest day and number
-                existing_files.sort()
-                last_day, last_num = existing_files[-1]
-                
-                # Check if we need to move to next day
-                if last_num >= daily_limit:
-                    current_day = last_day + 1
-                    current_num = 1
-                else:
-                    current_day = last_day
-                    current_num = last_num + 1
-            
-            # Generate filenames
-            video_name = f"{current_day}-{current_num}.mp4"
-            caption_name = f"{current_day}-{current_num}_caption.txt"
+            video_name, caption_name, current_day, current_num = next_day_limit_filename(
+                output_dir, start_day, daily_limit, reserved=reserved
+            )
             
             self.log_message(f"📝 Generated filename: {video_name} (Day {current_day}, Video {current_num}/{daily_limit})")
             
@@ -1971,6 +2169,53 @@ class BatchEasyReelsApp(ctk.CTk):
         )
         self.continue_on_error_check.pack(padx=10, pady=3, anchor="w")
         
+        self.two_phase_var = ctk.BooleanVar(value=False)
+        self.two_phase_check = ctk.CTkCheckBox(
+            settings_frame,
+            text="📝 Review AI titles & captions before rendering (two-phase)",
+            variable=self.two_phase_var,
+            font=ctk.CTkFont(size=10)
+        )
+        self.two_phase_check.pack(padx=10, pady=3, anchor="w")
+        
+        self.frame_pipeline_var = ctk.BooleanVar(value=False)
+        self.frame_pipeline_check = ctk.CTkCheckBox(
+            settings_frame,
+            text="⚡ Multi-process frame pipeline (decode/composite/encode in parallel)",
+            variable=self.frame_pipeline_var,
+            font=ctk.CTkFont(size=10)
+        )
+        self.frame_pipeline_check.pack(padx=10, pady=3, anchor="w")
+        
+        self.trim_dead_air_var = ctk.BooleanVar(value=True)
+        self.trim_dead_air_check = ctk.CTkCheckBox(
+            settings_frame,
+            text="✂️ Trim black/frozen intro & outro before rendering",
+            variable=self.trim_dead_air_var,
+            font=ctk.CTkFont(size=10)
+        )
+        self.trim_dead_air_check.pack(padx=10, pady=3, anchor="w")
+        
+        self.skip_duplicates_var = ctk.BooleanVar(value=False)
+        self.skip_duplicates_check = ctk.CTkCheckBox(
+            settings_frame,
+            text="🔁 Skip reposts of already rendered reels (flagged in review mode)",
+            variable=self.skip_duplicates_var,
+            font=ctk.CTkFont(size=10)
+        )
+        self.skip_duplicates_check.pack(padx=10, pady=3, anchor="w")
+        
+        render_workers_frame = ctk.CTkFrame(settings_frame, fg_color="transparent")
+        render_workers_frame.pack(fill="x", padx=10, pady=3)
+        ctk.CTkLabel(render_workers_frame, text="Parallel renders:", font=ctk.CTkFont(size=10)).pack(side="left", padx=(0, 5))
+        self.render_workers_entry = ctk.CTkEntry(render_workers_frame, width=60, font=ctk.CTkFont(size=10))
+        self.render_workers_entry.pack(side="left")
+        self.render_workers_entry.insert(0, "2")
+        ctk.CTkLabel(render_workers_frame, text="Prefetch downloads:", font=ctk.CTkFont(size=10)).pack(side="left", padx=(15, 5))
+        self.prefetch_depth_entry = ctk.CTkEntry(render_workers_frame, width=60, font=ctk.CTkFont(size=10))
+        self.prefetch_depth_entry.pack(side="left")
+        self.prefetch_depth_entry.insert(0, "2")
+        
         self.save_settings_btn = ctk.CTkButton(
             settings_frame,
             text="💾 Save Settings",
@@ -2279,6 +2524,14 @@ class BatchEasyReelsApp(ctk.CTk):
             self.add_logo_var.set(settings.get("add_logo", True))
             self.auto_crop_var.set(settings.get("auto_crop", True))
             self.continue_on_error_var.set(settings.get("continue_on_error", True))
+            self.two_phase_var.set(settings.get("two_phase_review", False))
+            self.frame_pipeline_var.set(settings.get("frame_pipeline", False))
+            self.trim_dead_air_var.set(settings.get("trim_dead_air", True))
+            self.skip_duplicates_var.set(settings.get("skip_duplicates", False))
+            self.render_workers_entry.delete(0, "end")
+            self.render_workers_entry.insert(0, settings.get("render_workers", "2"))
+            self.prefetch_depth_entry.delete(0, "end")
+            self.prefetch_depth_entry.insert(0, settings.get("prefetch_depth", "2"))
             self.toggle_daily_limit()
             self.log_message("✅ All settings loaded successfully from config/batch_settings.json")
 
@@ -2297,6 +2550,12 @@ class BatchEasyReelsApp(ctk.CTk):
                 "add_branding": self.add_branding_var.get(),
                 "add_logo": self.add_logo_var.get(),
                 "continue_on_error": self.continue_on_error_var.get(),
+                "two_phase_review": self.two_phase_var.get(),
+                "frame_pipeline": self.frame_pipeline_var.get(),
+                "trim_dead_air": self.trim_dead_air_var.get(),
+                "skip_duplicates": self.skip_duplicates_var.get(),
+                "render_workers": self.render_workers_entry.get().strip(),
+                "prefetch_depth": self.prefetch_depth_entry.get().strip(),
                 "saved_date": datetime.datetime.now().isoformat()
             }
             
@@ -2343,6 +2602,14 @@ class BatchEasyReelsApp(ctk.CTk):
             self.add_logo_var.set(settings.get("add_logo", True))
             self.auto_crop_var.set(settings.get("auto_crop", True))
             self.continue_on_error_var.set(settings.get("continue_on_error", True))
+            self.two_phase_var.set(settings.get("two_phase_review", False))
+            self.frame_pipeline_var.set(settings.get("frame_pipeline", False))
+            self.trim_dead_air_var.set(settings.get("trim_dead_air", True))
+            self.skip_duplicates_var.set(settings.get("skip_duplicates", False))
+            self.render_workers_entry.delete(0, "end")
+            self.render_workers_entry.insert(0, settings.get("render_workers", "2"))
+            self.prefetch_depth_entry.delete(0, "end")
+            self.prefetch_depth_entry.insert(0, settings.get("prefetch_depth", "2"))
 
             self.toggle_daily_limit()  # Update UI state
             self.log_message("✅ All settings loaded successfully from config/batch_settings.json")
@@ -2459,8 +2726,9 @@ class BatchEasyReelsApp(ctk.CTk):
         self.disable_ui_for_processing()
         
         # Start processing in separate thread
+        worker = self.process_batch_two_phase if self.two_phase_var.get() else self.process_batch_worker
         self.processing_thread = threading.Thread(
-            target=self.process_batch_worker,
+            target=worker,
             args=(valid_urls,),
             daemon=True
         )
@@ -2468,6 +2736,78 @@ class BatchEasyReelsApp(ctk.CTk):
         
         self.log_message("✅ Batch processing started in background")
     
+    def start_fan_out(self):
+        """Render every URL once per selected template from a single download."""
+        urls_text = self.urls_textbox.get("1.0", "end").strip()
+        urls = [line.strip() for line in urls_text.split('\n') if line.strip()]
+        valid_urls = [url for url in urls if 'instagram.com' in url or 'instagr.am' in url]
+        
+        if not valid_urls:
+            messagebox.showwarning("No Valid URLs", "No valid Instagram URLs found")
+            return
+        if self.processing_thread and self.processing_thread.is_alive():
+            messagebox.showwarning("Busy", "Batch processing is already running")
+            return
+        
+        def on_confirm(template_ids):
+            self.stop_event = threading.Event()
+            for widget in self.results_frame.winfo_children():
+                widget.destroy()
+            self.start_loading_animation()
+            self.disable_ui_for_processing()
+            self.log_message(f"🔀 Fan-out: {len(valid_urls)} URLs x {len(template_ids)} templates")
+            self.processing_thread = threading.Thread(
+                target=self.process_fan_out_worker,
+                args=(valid_urls, template_ids),
+                daemon=True
+            )
+            self.processing_thread.start()
+        
+        FanOutDialog(self, self.template_manager, on_confirm=on_confirm)
+    
+    def process_fan_out_worker(self, urls, template_ids):
+        """Fan each URL out to several templates, each in its account's output folder."""
+        try:
+            pipeline = self.create_batch_pipeline()
+            options = self.get_processing_options()
+            reserved_by_dir = {}
+            
+            def assign_output(template_id, output_dir):
+                reserved = reserved_by_dir.setdefault(output_dir, set())
+                video_filename, _, _, _ = self.get_next_filename(output_dir, reserved=reserved)
+                return os.path.join(output_dir, video_filename)
+            
+            for i, url in enumerate(urls):
+                if self.stop_event.is_set():
+                    self.log_message("🛑 Process stopped by user.")
+                    break
+                self.safe_after(0, lambda p=i / len(urls): self.overall_progress_bar.set(p))
+                self.safe_after(0, lambda idx=i: self.overall_status_label.configure(text=f"Fan-out {idx + 1}/{len(urls)}"))
+                
+                variants = pipeline.fan_out(
+                    url, template_ids, options, assign_output,
+                    generate_title=self.generate_title_var.get()
+                )
+                for variant in variants:
+                    if variant['status'] == 'rendered':
+                        result_data = {
+                            'video_path': variant['output_path'],
+                            'caption_path': variant.get('caption_path'),
+                            'original_url': url
+                        }
+                        self.safe_after(0, lambda data=result_data: self.add_result_card(data))
+                    elif variant['status'] == 'skipped':
+                        continue
+                    else:
+                        self.log_message(f"❌ {variant['template_id']} failed: {variant.get('error')}")
+                        if not self.continue_on_error_var.get():
+                            self.stop_event.set()
+            
+        except Exception as e:
+            self.log_message(f"❌ Fan-out error: {e}")
+        finally:
+            self.safe_after(0, self.processing_completed)
+    
     def add_result_card(self, result_data: dict):
         """Creates a card in the Results tab for a processed video."""
         if self.loading_animation_running:
@@ -2534,6 +2874,8 @@ class BatchEasyReelsApp(ctk.CTk):
 
     def disable_ui_for_processing(self):
         """Disable UI elements during processing."""
+        # AI cache counters at the start of the batch, for the summary
+        self.ai_cache_baseline = ai_response_cache.get_stats()
         try:
             self.urls_textbox.configure(state="disabled")
             if hasattr(self, 'stop_btn'):
@@ -2554,11 +2896,48 @@ class BatchEasyReelsApp(ctk.CTk):
             pass
 
     def process_batch_worker(self, urls):
+        prefetch = None
+        ai_queue = None
         try:
             total_urls = len(urls)
             self.log_message(f"🔄 Processing {total_urls} URLs...")
+
+            # AI requests start as soon as a download is ready and run while earlier URLs render
+            ai_queue = AsyncGenerationQueue(self.ai_generator)
+            skip_duplicates = self.skip_duplicates_var.get()
+            # Reposts within this run are caught too, before either one is rendered
+            run_index = FingerprintIndex(path=None)
+            fingerprints = {}
+
+            def fingerprint(item):
+                """(fingerprint, duplicate) of a download, computed once per URL."""
+                if item['index'] not in fingerprints:
+                    result = ([], None)
+                    try:
+                        video_path = item['metadata']['video_path']
+                        if skip_duplicates:
+                            result = check_duplicate(video_path, item['url'], run_index)
+                        else:
+                            result = get_fingerprint(video_path), None
+                    except Exception as e:
+                        self.log_message(f"⚠️ Fingerprint failed: {e}")
+                    fingerprints[item['index']] = result
+                return fingerprints[item['index']]
+
+            def start_ai(item):
+                if fingerprint(item)[1]:
+                    return
+                metadata = item['metadata']
+                ai_queue.submit(item['index'], metadata['original_caption'], metadata['original_title'])
+
+            # Next URLs download in the background while the current one renders
+            prefetch_depth = int(self.prefetch_depth_entry.get().strip() or 2)
+            prefetch = PrefetchQueue(urls, depth=prefetch_depth, stop_event=self.stop_event,
+                                     log_callback=self.log_message, on_ready=start_ai)
+            self.log_message(f"📥 Prefetching up to {prefetch_depth} downloads ahead")
             
-            for i, url in enumerate(urls):
+            for item in prefetch:
+                i, url = item['index'], item['url']
                 if self.stop_event.is_set():
                     self.log_message("🛑 Process stopped by user.")
                     break
@@ -2571,21 +2950,15 @@ class BatchEasyReelsApp(ctk.CTk):
                 self.log_message(f"🎬 Processing URL {i+1}: {url[:50]}...")
                 
                 try:
-                    options = {
-                        'output_directory': self.output_directory,
-                        'auto_crop': self.auto_crop_var.get(),
-                        'add_branding': self.add_branding_var.get(),
-                        'add_logo': self.add_logo_var.get(),
-                        'daily_limit': int(self.daily_video_limit_entry.get() or 50),
-                        'output_quality': 'high'
-                    }
+                    options = self.get_processing_options()
                     
                     # STEP 1: DOWNLOAD (SAME AS MAIN_WINDOW)
                     self.safe_after(0, lambda: self.current_status_label.configure(text="Downloading video from Instagram..."))
                     self.safe_after(0, lambda: self.overall_progress_bar.set(0.2))
                     
-                    downloader = InstagramDownloader()
-                    metadata = downloader.download_reel(url)  # ← NEW: Returns dict
+                    if item['error']:
+                        raise Exception(item['error'])
+                    metadata = item['metadata']  # ← Prefetched download: returns dict
 
                     video_path = metadata['video_path']
                     caption = metadata['original_caption']
@@ -2601,6 +2974,13 @@ class BatchEasyReelsApp(ctk.CTk):
                         self.log_message("No text detected in video (OCR)")
 # ===================
 
+                    # Reposts (of rendered reels or earlier URLs of this run) were found when the
+                    # download finished, before their AI request was sent
+                    video_fingerprint, duplicate = fingerprint(item)
+                    if duplicate:
+                        self.log_message(f"⏭️ Skipping URL {i+1}: {describe_duplicate(duplicate)}")
+                        continue
+
                     if self.stop_event.is_set(): break
                     
                     # STEP 2: GENERATE AI CONTENT (SAME AS MAIN_WINDOW)
@@ -2609,14 +2989,18 @@ class BatchEasyReelsApp(ctk.CTk):
                     
                 
 
+                    # Usually already requested when the download finished; submit() returns that request
+                    record = ai_queue.submit(i, caption, ocr_text).result()
+                    if record['error']:
+                        raise Exception(f"AI generation failed: {record['error']}")
+                    ai_content = record['ai_content']
+                    source = "from cache" if record['cached'] else f"{record['latency']:.1f}s"
+                    self.log_message(f"🤖 AI content ready ({source}, waited {record['queued']:.1f}s for a slot)")
                     if self.generate_title_var.get():
-                        self.log_message("Generating AI title as per settings...")
-                        ai_content = self.ai_generator.generate_complete_content(caption, ocr_text=ocr_text)
                         self.log_message(f"AI title generated: {ai_content.get('title', '')}")
                     else:
                         self.log_message("Skipping AI title generation (disabled in settings).")
                         # STILL generate complete content, but just don't use the title in the filename
-                        ai_content = self.ai_generator.generate_complete_content(caption, ocr_text=ocr_text)
                         ai_content['title'] = ""
                     if self.stop_event.is_set(): break
                     
@@ -2696,6 +3080,7 @@ class BatchEasyReelsApp(ctk.CTk):
                             self.log_message(f"⚠️ Could not rename video: {e}")
 
                     self.log_message(f"✅ Video processed: {final_video}")
+                    record_rendered(url, video_fingerprint, final_video)
 
                     # Save caption with matching filename
                     if ai_content and 'caption' in ai_content:
@@ -2715,13 +3100,7 @@ class BatchEasyReelsApp(ctk.CTk):
                     self.safe_after(0, lambda data=result_data: self.add_result_card(data))
                     if self.stop_event.is_set(): break
 
-                    # Cleanup temp file (SAME AS MAIN_WINDOW)
-                    if os.path.exists(video_path):
-                        try:
-                            os.remove(video_path)
-                            self.log_message("🧹 Temporary files cleaned up")
-                        except:
-                            pass
+                    # The prefetch queue releases the source when the next URL is taken
                     if self.stop_event.is_set(): break
                     
                     # COMPLETE
@@ -2735,6 +3114,10 @@ class BatchEasyReelsApp(ctk.CTk):
                 except Exception as e:
                     error_msg = str(e)
                     self.log_message(f"❌ Error processing URL {i+1}: {error_msg}")
+                    # A failed URL gives up its claim, so a repost of it later in the list is still rendered
+                    video_fingerprint, duplicate = fingerprints.get(i, ([], None))
+                    if skip_duplicates and video_fingerprint and not duplicate:
+                        run_index.release(url)
                     if not hasattr(self, 'continue_on_error_var') or not self.continue_on_error_var.get():
                         break
             
@@ -2744,6 +3127,151 @@ class BatchEasyReelsApp(ctk.CTk):
         except Exception as e:
             self.log_message(f"❌ Batch processing error: {e}")
             self.safe_after(0, self.processing_completed)
+        finally:
+            if prefetch:
+                prefetch.close()
+            if ai_queue:
+                ai_queue.close()
+
+    def get_processing_options(self) -> dict:
+        """Render options shared by the sequential and two-phase batch paths."""
+        options = {
+            'output_directory': self.output_directory,
+            'auto_crop': self.auto_crop_var.get(),
+            'add_branding': self.add_branding_var.get(),
+            'add_logo': self.add_logo_var.get(),
+            'daily_limit': int(self.daily_video_limit_entry.get() or 50),
+            'output_quality': 'high',
+            'frame_pipeline': self.frame_pipeline_var.get(),
+            'trim_dead_air': self.trim_dead_air_var.get()
+        }
+        if self.template_manager:
+            max_duration = self.template_manager.get_current_template().get('max_duration')
+            if max_duration:
+                options['max_duration'] = float(max_duration)
+        if not options['output_directory'] or options['output_directory'] == 'None':
+            options['output_directory'] = str(Path("output").resolve())
+            Path(options['output_directory']).mkdir(parents=True, exist_ok=True)
+            self.log_message(f"⚠️ Using default output: {options['output_directory']}")
+        return options
+
+    def get_branding_assets(self) -> dict:
+        """Uploaded branding assets that still exist on disk."""
+        branding_assets = {}
+        if self.logo_path and os.path.exists(self.logo_path):
+            branding_assets['logo_path'] = self.logo_path
+        if self.profile_pic_path and os.path.exists(self.profile_pic_path):
+            branding_assets['profile_pic_path'] = self.profile_pic_path
+        return branding_assets
+
+    def create_batch_pipeline(self) -> BatchPipeline:
+        """Pipeline bound to the current AI generator, logger and stop event."""
+        try:
+            render_workers = int(self.render_workers_entry.get().strip() or "2")
+        except ValueError:
+            render_workers = 2
+        return BatchPipeline(
+            self.ai_generator,
+            render_workers=render_workers,
+            log_callback=self.log_message,
+            stop_event=self.stop_event,
+            skip_duplicates=self.skip_duplicates_var.get()
+        )
+
+    def process_batch_two_phase(self, urls):
+        """Phase one: download, probe, OCR and AI for all URLs concurrently, then open the review table."""
+        try:
+            pipeline = self.create_batch_pipeline()
+            total_urls = len(urls)
+            prepared = []
+            
+            def on_job_ready(job):
+                prepared.append(job)
+                self.safe_after(0, lambda p=len(prepared) / total_urls: self.overall_progress_bar.set(p))
+                self.safe_after(0, lambda n=len(prepared): self.overall_status_label.configure(text=f"Prepared {n}/{total_urls}"))
+            
+            self.safe_after(0, lambda: self.current_status_label.configure(text="Downloading, OCR and AI content..."))
+            jobs = pipeline.prepare_all(urls, generate_title=self.generate_title_var.get(), on_job_ready=on_job_ready)
+            
+            if self.stop_event.is_set():
+                self.log_message("🛑 Process stopped by user.")
+                pipeline.cleanup(jobs)
+                self.safe_after(0, self.processing_completed)
+                return
+            
+            ready = [job for job in jobs if job['status'] == 'ready']
+            self.log_message(f"📝 Phase 1 complete: {len(ready)}/{total_urls} ready for review")
+            self.safe_after(0, lambda: self.current_status_label.configure(text="Waiting for review..."))
+            self.safe_after(0, lambda: self.show_review_table(pipeline, jobs))
+            
+        except Exception as e:
+            self.log_message(f"❌ Batch processing error: {e}")
+            self.safe_after(0, self.processing_completed)
+
+    def show_review_table(self, pipeline, jobs):
+        """Open the review table; rendering starts only after approval."""
+        def on_render(reviewed_jobs):
+            approved = sum(1 for job in reviewed_jobs if job['approved'])
+            self.log_message(f"✅ {approved} jobs approved for rendering")
+            self.processing_thread = threading.Thread(
+                target=self.process_batch_render_phase,
+                args=(pipeline, reviewed_jobs),
+                daemon=True
+            )
+            self.processing_thread.start()
+        
+        def on_cancel(reviewed_jobs):
+            self.log_message("❌ Review cancelled, nothing rendered")
+            pipeline.cleanup(reviewed_jobs)
+            self.processing_completed()
+        
+        ReviewTableDialog(self, jobs, on_render=on_render, on_cancel=on_cancel)
+
+    def process_batch_render_phase(self, pipeline, jobs):
+        """Phase two: render approved jobs on the render pool and add result cards."""
+        try:
+            options = self.get_processing_options()
+            reserved = set()
+            approved_total = sum(1 for job in jobs if job['approved'])
+            rendered = []
+            
+            def assign_output(job):
+                # Called in submission order, so numbering follows the URL list
+                video_filename, _, day_num, vid_num = self.get_next_filename(options['output_directory'], reserved=reserved)
+                job['output_filename'] = video_filename
+                self.log_message(f"📝 URL {job['index'] + 1} will save as: {video_filename}")
+                return os.path.join(options['output_directory'], video_filename)
+            
+            def on_job_rendered(job):
+                rendered.append(job)
+                self.safe_after(0, lambda p=len(rendered) / max(1, approved_total): self.overall_progress_bar.set(p))
+                self.safe_after(0, lambda n=len(rendered): self.overall_status_label.configure(text=f"Rendered {n}/{approved_total}"))
+                if job['status'] != 'rendered':
+                    self.log_message(f"❌ Rendering URL {job['index'] + 1} failed: {job.get('error')}")
+                    return
+                caption_path = f"{os.path.splitext(job['output_path'])[0]}_caption.txt"
+                self.log_message(f"✅ SUCCESS: URL {job['index'] + 1} rendered: {job['output_path']}")
+                result_data = {
+                    'video_path': job['output_path'],
+                    'caption_path': caption_path if os.path.exists(caption_path) else None,
+                    'original_url': job['url']
+                }
+                self.safe_after(0, lambda data=result_data: self.add_result_card(data))
+            
+            self.safe_after(0, lambda: self.current_status_label.configure(text="Rendering approved videos..."))
+            pipeline.render_approved(
+                jobs, options, assign_output,
+                branding_assets=self.get_branding_assets(),
+                on_job_rendered=on_job_rendered
+            )
+            
+        except Exception as e:
+            self.log_message(f"❌ Batch render error: {e}")
+        finally:
+            # Releases the sources' media store pins even when rendering failed
+            pipeline.cleanup(jobs)
+            self.log_message("🧹 Temporary files cleaned up")
+            self.safe_after(0, self.processing_completed)
 
     def reinitialize_ai_generator(self):
         """Safely initializes or re-initializes the AI content generator."""
@@ -2760,6 +3288,10 @@ class BatchEasyReelsApp(ctk.CTk):
     def processing_completed(self):
         """Called when batch processing is completed."""
         self.log_message("🎉 Batch processing completed!")
+        try:
+            self.log_message(f"♻️ {describe_cache_stats(ai_response_cache.get_stats(since=getattr(self, 'ai_cache_baseline', None)))}")
+        except Exception as e:
+            print(f"⚠️ AI cache stats unavailable: {e}")
         self.enable_ui_after_processing()
         messagebox.showinfo("Batch Complete", "Batch processing finished!\n\nCheck the logs for details.")
 
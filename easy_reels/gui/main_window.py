@@ -20,7 +20,10 @@ try:
     from easy_reels.core.config_manager import config
     from easy_reels.core.instagram_downloader import InstagramDownloader
     from easy_reels.core.ai_content_generator import AIContentGenerator
+    from easy_reels.core.template_manager import TemplateManager
     from easy_reels.core.video_processor import VideoProcessor
+    from easy_reels.core.media_store import media_store
+    from easy_reels.core.mezzanine_cache import content_hash_for
 except ImportError as e:
     print(f"Import error: {e}")
     print("Please ensure all core modules are in place")
@@ -83,6 +86,10 @@ class EasyReelsApp(ctk.CTk):
         self.processing_thread = None
         self.logo_path = None
         self.profile_pic_path = None
+        # Shared processor so proxy previews and the final render reuse crop/title assets
+        self.processor = VideoProcessor()
+        # Shared AI generator (one Groq client, reused by every generation and regeneration)
+        self.ai_generator = AIContentGenerator(TemplateManager())
         
         # Create UI
         self.create_ui()
@@ -319,6 +326,16 @@ class EasyReelsApp(ctk.CTk):
         )
         self.video_placeholder.pack(expand=True)
         
+        self.open_preview_btn = ctk.CTkButton(
+            self.video_preview_frame,
+            text="▶ Open Preview",
+            command=self.open_proxy_preview,
+            state="disabled",
+            height=32,
+            font=ctk.CTkFont(size=12)
+        )
+        self.open_preview_btn.pack(pady=(0, 20))
+        
         # AI Content tab
         self.content_tabs.add("AI Generated Content")
         ai_tab = self.content_tabs.tab("AI Generated Content")
@@ -354,6 +371,26 @@ class EasyReelsApp(ctk.CTk):
         )
         self.regenerate_btn.pack(side="left", padx=10, pady=10)
         
+        self.preview_btn = ctk.CTkButton(
+            self.action_frame,
+            text="👁 Quick Preview",
+            command=self.start_proxy_preview,
+            state="disabled",
+            height=35,
+            font=ctk.CTkFont(size=12)
+        )
+        self.preview_btn.pack(side="left", padx=10, pady=10)
+        
+        self.apply_title_btn = ctk.CTkButton(
+            self.action_frame,
+            text="🎞 Apply Title to Video",
+            command=self.start_title_rerender,
+            state="disabled",
+            height=35,
+            font=ctk.CTkFont(size=12)
+        )
+        self.apply_title_btn.pack(side="left", padx=10, pady=10)
+        
         self.export_btn = ctk.CTkButton(
             self.action_frame,
             text="💾 Export Video",
@@ -538,18 +575,23 @@ class EasyReelsApp(ctk.CTk):
         self.processing_thread.start()
         
     def process_video(self, url):
+        video_path = None
         try:
             self.update_progress(0.1, "Validating URL...")
             
             # Step 1: Download the video from Instagram
             self.update_progress(0.2, "Downloading video from Instagram...")
             downloader = InstagramDownloader()
-            video_path, caption = downloader.download_reel(url)
+            metadata = downloader.download_reel(url)
+            video_path = metadata['video_path']
+            caption = metadata['original_caption']
             
             self.current_project = {
                 'url': url,
                 'video_path': video_path,
-                'original_caption': caption
+                'original_caption': caption,
+                # Identifies the source for title re-renders, also once the download is evicted
+                'content_hash': content_hash_for(video_path)
             }
             
             self.log_message(f"Video downloaded: {video_path}")
@@ -557,8 +599,7 @@ class EasyReelsApp(ctk.CTk):
             
             # Step 2: Generate AI content from caption
             self.update_progress(0.5, "Generating AI content...")
-            ai_generator = AIContentGenerator()
-            ai_content = ai_generator.generate_complete_content(caption)
+            ai_content = self.ai_generator.generate_complete_content(caption)
             
             self.current_project['ai_content'] = ai_content
             
@@ -568,6 +609,10 @@ class EasyReelsApp(ctk.CTk):
             # Update UI with AI content asynchronously
             self.after(0, lambda: self.display_ai_content(ai_content))
             
+            # Quick low-resolution proxy so the layout can be checked before the full render
+            self.update_progress(0.6, "Rendering quick preview...")
+            self.render_proxy_preview(video_path, ai_content)
+            
             # Step 3: Set output directory and get prefix and daily limit from UI
             output_dir = os.path.dirname(video_path)
             prefix = self.prefixentry.get().strip()
@@ -580,44 +625,23 @@ class EasyReelsApp(ctk.CTk):
             
             # Step 4: Process video with processor, passing target output path
             self.update_progress(0.7, "Processing video with AI content...")
-            processor = VideoProcessor()
-            
-            branding_assets = {}
-            if self.logo_path and os.path.exists(self.logo_path):
-                branding_assets['logo_path'] = self.logo_path
-            if self.profile_pic_path and os.path.exists(self.profile_pic_path):
-                branding_assets['profile_pic_path'] = self.profile_pic_path
+            processor = self.processor
             
-            options = {
-                'auto_crop': self.auto_crop_var.get(),
-                'add_branding': self.add_branding_var.get(),
-                'add_title_overlay': self.add_title_var.get(),
-                'use_original_layout': True,
-                'output_quality': 'high'
-            }
+            options = self.get_render_options()
+            options['output_path'] = final_video_path
             
-            # Assuming process_video can accept an output_path to save output there
             final_video = processor.process_video(
                 video_path,
                 ai_content,
-                branding_assets,
-                options,
-                output_path=final_video_path
+                branding_assets=self.get_branding_assets(),
+                options=options
             )
             
-            # Store final video path in current project
-            self.current_project['final_video'] = final_video_path
-            
-            # Step 5: Clean up temp files
-            if os.path.exists(video_path):
-                try:
-                    os.remove(video_path)
-                    self.log_message("Temporary files cleaned up")
-                except Exception as cleanup_error:
-                    self.log_message(f"Cleanup error: {cleanup_error}")
+            # Store the rendered video's path (as returned by the processor) in current project
+            self.current_project['final_video'] = final_video or final_video_path
             
             self.update_progress(1.0, "Processing complete!")
-            self.after(0, lambda: self.processing_complete(final_video_path))
+            self.after(0, lambda: self.processing_complete(self.current_project['final_video']))
             
         except ValueError as ve:
             # Handle daily limit exceeded error
@@ -629,6 +653,32 @@ class EasyReelsApp(ctk.CTk):
             self.log_message(f"Processing error: {error_msg}")
             self.after(0, lambda msg=error_msg: self.processing_error(msg))
             
+        finally:
+            # Step 5: Clean up temp files and release the stored download's pin, also on failure
+            if media_store.remove_if_unmanaged(video_path):
+                self.log_message("Temporary files cleaned up")
+            
+    def get_render_options(self):
+        """Render options for the current project. A cached mezzanine track makes title edits cheap to re-render."""
+        return {
+            'auto_crop': self.auto_crop_var.get(),
+            'add_branding': self.add_branding_var.get(),
+            'add_title_overlay': self.add_title_var.get(),
+            'use_original_layout': True,
+            'output_quality': 'high',
+            'trim_dead_air': True,
+            'mezzanine_cache': True,
+            'content_hash': self.current_project.get('content_hash')
+        }
+        
+    def get_branding_assets(self):
+        branding_assets = {}
+        if self.logo_path and os.path.exists(self.logo_path):
+            branding_assets['logo_path'] = self.logo_path
+        if self.profile_pic_path and os.path.exists(self.profile_pic_path):
+            branding_assets['profile_pic_path'] = self.profile_pic_path
+        return branding_assets
+        
     def update_progress(self, value, status):
         """Update progress bar and status."""
         def update():
@@ -647,11 +697,13 @@ class EasyReelsApp(ctk.CTk):
         self.caption_text.insert("1.0", ai_content.get('caption', ''))
         
         self.regenerate_btn.configure(state="normal")
+        self.preview_btn.configure(state="normal")
         
     def processing_complete(self, final_video):
         """Handle processing completion."""
         self.download_btn.configure(state="normal", text="🎬 Download & Process")
         self.export_btn.configure(state="normal")
+        self.apply_title_btn.configure(state="normal")
         
         # Switch to AI content tab to show results
         self.content_tabs.set("AI Generated Content")
@@ -678,25 +730,121 @@ class EasyReelsApp(ctk.CTk):
         messagebox.showerror("Processing Failed", f"Video processing failed:\\n\\n{error}\\n\\nCheck the logs for more details.")
         
     def regenerate_ai_content(self):
-        """Regenerate AI content."""
-        if not self.current_project.get('original_caption'):
+        """Regenerate AI content in the background (the request can take seconds with retries)."""
+        original_caption = self.current_project.get('original_caption')
+        if not original_caption:
             messagebox.showwarning("No Content", "No original caption available for regeneration")
             return
-            
+        
+        self.log_message("Regenerating AI content...")
+        self.regenerate_btn.configure(state="disabled", text="Regenerating...")
+        
+        def worker():
+            try:
+                # A regeneration asks for new content, so cached replies are not reused
+                ai_content = self.ai_generator.generate_complete_content(original_caption, bypass_cache=True)
+                self.current_project['ai_content'] = ai_content
+                self.after(0, lambda: self.display_ai_content(ai_content))
+                self.after(0, lambda: self.log_message("AI content regenerated successfully"))
+            except Exception as e:
+                error_msg = f"Failed to regenerate content: {e}"
+                self.after(0, lambda msg=error_msg: self.log_message(msg))
+                self.after(0, lambda msg=error_msg: messagebox.showerror("Regeneration Failed", msg))
+            finally:
+                self.after(0, lambda: self.regenerate_btn.configure(state="normal", text="🔄 Regenerate Content"))
+        
+        threading.Thread(target=worker, daemon=True).start()
+        
+    def start_title_rerender(self):
+        """Re-render the finished video with the edited title and caption (mezzanine track reused)."""
+        final_video = self.current_project.get('final_video')
+        if not final_video:
+            messagebox.showwarning("No Video", "Process a video before applying a new title")
+            return
+        
+        ai_content = dict(self.current_project.get('ai_content', {}))
+        ai_content['title'] = self.title_text.get("1.0", "end").strip() if self.add_title_var.get() else ""
+        ai_content['caption'] = self.caption_text.get("1.0", "end").strip()
+        self.apply_title_btn.configure(state="disabled", text="Rendering...")
+        
+        def worker():
+            try:
+                options = self.get_render_options()
+                options['output_path'] = final_video
+                # The first re-render builds the mezzanine track, later ones reuse it
+                options['build_mezzanine'] = True
+                self.processor.process_video(
+                    self.current_project['video_path'],
+                    ai_content,
+                    branding_assets=self.get_branding_assets(),
+                    options=options
+                )
+                self.current_project['ai_content'] = ai_content
+                self.after(0, lambda: self.log_message(f"Title applied: {final_video}"))
+            except Exception as e:
+                self.after(0, lambda msg=str(e): self.log_message(f"Re-render failed: {msg}"))
+            finally:
+                self.after(0, lambda: self.apply_title_btn.configure(state="normal", text="🎞 Apply Title to Video"))
+        
+        threading.Thread(target=worker, daemon=True).start()
+        
+    def start_proxy_preview(self):
+        """Render a proxy of the current (possibly edited) title in the background."""
+        video_path = self.current_project.get('video_path')
+        if not video_path or not os.path.exists(video_path):
+            messagebox.showwarning("No Video", "Source video is no longer available for preview")
+            return
+        
+        ai_content = dict(self.current_project.get('ai_content', {}))
+        ai_content['title'] = self.title_text.get("1.0", "end").strip()
+        self.preview_btn.configure(state="disabled", text="Rendering...")
+        
+        def worker():
+            self.render_proxy_preview(video_path, ai_content)
+            self.after(0, lambda: self.preview_btn.configure(state="normal", text="👁 Quick Preview"))
+        
+        threading.Thread(target=worker, daemon=True).start()
+        
+    def render_proxy_preview(self, video_path, ai_content, preview_seconds=5):
+        """Render the 270x480 proxy and surface it in the Video Preview tab."""
         try:
-            self.log_message("Regenerating AI content...")
-            ai_generator = AIContentGenerator()
-            ai_content = ai_generator.generate_complete_content(
-                self.current_project['original_caption']
-            )
-            self.current_project['ai_content'] = ai_content
-            self.display_ai_content(ai_content)
-            self.log_message("AI content regenerated successfully")
+            options = {
+                'add_branding': self.add_branding_var.get(),
+                'add_logo': True,
+                'trim_dead_air': True
+            }
+            if not self.add_title_var.get():
+                ai_content = dict(ai_content, title="")
+            proxy_path = self.processor.render_proxy(video_path, ai_content, options, preview_seconds=preview_seconds)
+            self.current_project['proxy_video'] = proxy_path
+            self.after(0, lambda: self.show_proxy_preview(proxy_path))
+        except Exception as e:
+            self.after(0, lambda msg=str(e): self.log_message(f"Preview render failed: {msg}"))
             
+    def show_proxy_preview(self, proxy_path):
+        """Point the Video Preview tab at the freshly rendered proxy."""
+        self.video_placeholder.configure(
+            text=f"👁 Quick preview ready (270x480)\n\n{Path(proxy_path).name}\n\nThe full-quality render reuses the same crop and title."
+        )
+        self.open_preview_btn.configure(state="normal")
+        self.content_tabs.set("Video Preview")
+        self.log_message(f"Preview rendered: {proxy_path}")
+        
+    def open_proxy_preview(self):
+        """Open the proxy render in the system video player."""
+        proxy_path = self.current_project.get('proxy_video')
+        if not proxy_path or not os.path.exists(proxy_path):
+            messagebox.showwarning("No Preview", "No preview render available")
+            return
+        try:
+            if platform.system() == "Windows":
+                os.startfile(proxy_path)
+            elif platform.system() == "Darwin":
+                subprocess.run(['open', proxy_path])
+            else:
+                subprocess.run(['xdg-open', proxy_path])
         except Exception as e:
-            error_msg = f"Failed to regenerate content: {e}"
-            messagebox.showerror("Regeneration Failed", error_msg)
-            self.log_message(error_msg)
+            self.log_message(f"Failed to open preview: {e}")
             
     def export_video(self):
         """Export/open final video location."""
@@ -5,7 +5,6 @@ Coordinates all modules and provides simple CLI interface for testing
 """
 
 import sys
-import os
 from pathlib import Path
 
 # Add project root to Python path
@@ -17,6 +16,7 @@ from easy_reels.core.config_manager import config
 from easy_reels.core.instagram_downloader import InstagramDownloader
 from easy_reels.core.ai_content_generator import AIContentGenerator  
 from easy_reels.core.video_processor import VideoProcessor
+from easy_reels.core.media_store import media_store
 
 
 def test_complete_workflow():
@@ -49,6 +49,7 @@ def test_complete_workflow():
 
 def process_single_reel(url: str):
     """Process a single Instagram Reel through the complete pipeline."""
+    video_path = None
     try:
         print(f"\n🎬 PROCESSING REEL: {url}")
         print("-" * 50)
@@ -94,10 +95,6 @@ def process_single_reel(url: str):
 
         print(f"   ✅ Final video: {final_video}")
 
-        # Cleanup temp file
-        if os.path.exists(video_path):
-            os.remove(video_path)
-
         print("\n🎉 PROCESSING COMPLETE!")
         print(f"Final video saved to: {final_video}")
 
@@ -107,6 +104,10 @@ def process_single_reel(url: str):
         print(f"\n❌ Error processing reel: {e}")
         return None
 
+    finally:
+        # Cleanup temp file and release its pin (stored downloads are kept for re-processing)
+        media_store.remove_if_unmanaged(video_path)
+
 
 def main():
     """Main entry point."""
@@ -0,0 +1,152 @@
+"""
+Download benchmark and fixture recorder for the local Instagram stand-in.
+
+`benchmark_download_reel` runs InstagramDownloader.download_reel against the stand-in
+with a private session, rate limiter, media store and metadata cache in a temporary
+directory, so the process-wide instances (and the real temp/ caches) are never
+touched. `record_standin_fixture` records a real post as a stand-in fixture.
+
+    python -m easy_reels.utils.download_benchmark [count] [concurrency]
+"""
+
+import sys
+import json
+import math
+import time
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List
+
+from ..core.instagram_downloader import InstagramDownloader, parse_instagram_url
+from ..core.instagram_session import InstagramSession, instagram_session
+from ..core.media_fetcher import media_fetcher
+from ..core.media_store import MediaStore
+from ..core.post_metadata_cache import PostMetadataCache
+from ..core.rate_limiter import AdaptiveRateLimiter
+from .standin_server import FIXTURES_DIR, StandInServer, route_instagram_to
+
+# Post fields kept in a recorded fixture (no signed URLs or viewer data)
+FIXTURE_FIELDS = (
+    "__typename", "id", "shortcode", "is_video", "video_duration", "video_view_count",
+    "dimensions", "edge_media_to_caption", "taken_at_timestamp", "product_type"
+)
+
+
+def record_standin_fixture(url: str, fixtures_dir: str = None, session: InstagramSession = None) -> str:
+    """
+    Record the metadata of a real post as a stand-in fixture (needs a login).
+    Only FIXTURE_FIELDS and the owner's id/username are kept; the media size is
+    taken from the CDN's Content-Length so the stand-in serves a file of the same size.
+    """
+    shortcode = parse_instagram_url(url)
+    post = (session or instagram_session).get_post(shortcode)
+    node = {key: value for key, value in post._full_metadata.items() if key in FIXTURE_FIELDS}
+    node["__typename"] = "XDT" + node.get("__typename", "GraphVideo")
+    owner = post._full_metadata.get("owner", {})
+    node["owner"] = {"id": owner.get("id"), "username": owner.get("username")}
+    node["video_url"] = "https://scontent.cdninstagram.com/v/t50/REDACTED.mp4"
+
+    media_kb = 2048
+    try:
+        with media_fetcher.session.head(post.video_url, allow_redirects=True, timeout=media_fetcher.timeout) as r:
+            media_kb = max(1, int(r.headers.get("Content-Length") or 0) // 1024) or media_kb
+    except Exception as e:
+        print(f"--> Could not read media size, using {media_kb} KB: {e}")
+
+    fixtures_dir = Path(fixtures_dir or FIXTURES_DIR)
+    fixtures_dir.mkdir(parents=True, exist_ok=True)
+    fixture_path = fixtures_dir / f"{shortcode}.json"
+    with open(fixture_path, "w", encoding="utf-8") as f:
+        json.dump({"shortcode": shortcode, "media_kb": media_kb, "node": node}, f, indent=2, ensure_ascii=False)
+    print(f"✅ Recorded fixture: {fixture_path}")
+    return str(fixture_path)
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile (q in 0..1)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))]
+
+
+def standin_downloader(work_dir: str, metadata_rps: float = 50.0) -> InstagramDownloader:
+    """
+    A downloader with its own anonymous session (no instaloader sleeps, the stand-in
+    needs no login), rate limiter, media store and metadata cache under `work_dir`.
+    """
+    work_dir = Path(work_dir)
+    session = InstagramSession(rate_limiter=AdaptiveRateLimiter(name="stand-in metadata", max_rate=metadata_rps))
+    L = session.create_loader()
+    L.context.sleep = False
+    session.loader = L
+    return InstagramDownloader(
+        session=session,
+        store=MediaStore(str(work_dir / "media")),
+        metadata_cache=PostMetadataCache(str(work_dir / "post_metadata.sqlite3")),
+        download_dir=str(work_dir)
+    )
+
+
+def benchmark_download_reel(count: int = 12, concurrency: int = 4, metadata_rps: float = 50.0,
+                            **server_options) -> Dict:
+    """
+    Run `count` download_reel calls (`concurrency` at a time) against the local stand-in:
+    instaloader's metadata query and the media fetch both go to it, unmodified.
+    `server_options` set the stand-in's faults (bandwidth_kbps, latency, throttle_rate,
+    drop_rate, url_ttl, media_size_kb). Returns throughput and latency percentiles.
+    """
+    work_dir = tempfile.mkdtemp(prefix="standin_bench_")
+    latencies, failures = [], []
+    try:
+        downloader = standin_downloader(work_dir, metadata_rps)
+        with StandInServer(**server_options) as server:
+            # Recorded fixtures first, then synthesized posts
+            shortcodes = (list(server.fixtures) + [f"Bench{i}" for i in range(count)])[:count]
+
+            def timed_download(shortcode):
+                started = time.perf_counter()
+                try:
+                    downloader.download_reel(f"https://www.instagram.com/reel/{shortcode}/")
+                    latencies.append(time.perf_counter() - started)
+                except Exception as e:
+                    failures.append(f"{shortcode}: {e}")
+
+            with route_instagram_to(server.url):
+                started = time.perf_counter()
+                with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+                    list(executor.map(timed_download, shortcodes))
+                elapsed = time.perf_counter() - started
+            server_stats = server.get_stats()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    results = {
+        "downloads": len(latencies),
+        "failures": failures,
+        "seconds": elapsed,
+        "mb_per_s": server_stats["media_bytes"] / (1024 * 1024) / elapsed if elapsed > 0 else 0,
+        "reels_per_s": len(latencies) / elapsed if elapsed > 0 else 0,
+        "p50": percentile(latencies, 0.50),
+        "p95": percentile(latencies, 0.95),
+        "p99": percentile(latencies, 0.99),
+        "server": server_stats
+    }
+    print(f"{len(latencies)}/{len(shortcodes)} reels in {elapsed:.2f}s ({results['mb_per_s']:.1f} MB/s, "
+          f"{results['reels_per_s']:.2f} reels/s) latency p50 {results['p50']:.2f}s "
+          f"p95 {results['p95']:.2f}s p99 {results['p99']:.2f}s | server {server_stats}")
+    for failure in failures:
+        print(f"  failed: {failure}")
+    return results
+
+
+if __name__ == "__main__":
+    # python -m easy_reels.utils.download_benchmark [count] [concurrency]
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 12
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    print("Clean network:")
+    benchmark_download_reel(n, workers)
+    print("Slow, lossy and throttled network:")
+    benchmark_download_reel(n, workers, bandwidth_kbps=4096, latency=0.05, drop_rate=0.2, throttle_rate=5)
@@ -0,0 +1,349 @@
+"""
+Local HTTP stand-in for Instagram, used to benchmark and regression-test downloads
+without touching the real service or needing credentials.
+
+- Media: deterministic pseudo-random payloads at /media/<size_kb>/<name>.mp4 (or the
+  CDN-style /v/t50/<size_kb>/<name>.mp4) with Content-Length, ETag, byte ranges
+  (Range/If-Range) and HTTP/1.1 keep-alive, like the CDN does.
+- Metadata: POST /graphql/query answers the doc_id query `Post.from_shortcode` sends,
+  with a recorded fixture for the shortcode (see fixtures/instagram) or a synthesized
+  post, in both the xdt_shortcode_media shape (instaloader <= 4.14) and the
+  shortcode web_info shape (4.15+). /api/post/<shortcode> answers with plain JSON.
+- Faults: per-connection bandwidth, latency, 429 + Retry-After above `throttle_rate`
+  metadata requests per second, connections dropped mid-body with `drop_rate`, and
+  403 for media URLs older than `url_ttl` seconds (signed URL expiry).
+
+`route_instagram_to(server.url)` sends every requests.Session call for Instagram hosts
+(www/i.instagram.com, the CDN) to the stand-in, so instaloader and the media fetcher
+run unmodified against it.
+"""
+
+import os
+import re
+import json
+import time
+import zlib
+import random
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from urllib.parse import urlsplit, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# 1 MiB block repeated to build any payload size without keeping it all in memory
+_BLOCK = os.urandom(1024 * 1024)
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures" / "instagram"
+INSTAGRAM_HOSTS = ("instagram.com", "cdninstagram.com", "fbcdn.net")
+ORIGINAL_HOST_HEADER = "X-Standin-Original-Host"
+MEDIA_PATH = re.compile(r"^/(?:media|v/t50)/(\d+)/([^/]+)$")
+WRITE_PIECE = 64 * 1024
+
+
+def load_fixtures(fixtures_dir=FIXTURES_DIR) -> dict:
+    """Recorded post metadata by shortcode (see record_standin_fixture in download_benchmark)."""
+    fixtures = {}
+    for path in sorted(Path(fixtures_dir).glob("*.json")):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                fixture = json.load(f)
+            fixtures[fixture["shortcode"]] = fixture
+        except Exception as e:
+            print(f"--> Skipping fixture {path.name}: {e}")
+    return fixtures
+
+
+def web_info_item(node: dict) -> dict:
+    """The same post as a v1 media item (the shape newer instaloader versions parse)."""
+    edges = node["edge_media_to_caption"]["edges"]
+    dimensions = node.get("dimensions", {})
+    return {
+        "code": node["shortcode"],
+        "pk": node["id"],
+        "media_type": 2 if node.get("is_video") else 1,
+        "product_type": node.get("product_type", "clips"),
+        "taken_at": node.get("taken_at_timestamp", int(time.time())),
+        "user": {"pk": node["owner"]["id"], "username": node["owner"]["username"]},
+        "caption": {"text": edges[0]["node"]["text"]} if edges else None,
+        "video_versions": [{"url": node["video_url"], "width": dimensions.get("width"),
+                            "height": dimensions.get("height")}],
+        "video_duration": node.get("video_duration"),
+        "view_count": node.get("video_view_count", 0),
+        "original_width": dimensions.get("width"),
+        "original_height": dimensions.get("height")
+    }
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server.standin
+        server.delay()
+        path = urlsplit(self.path).path
+        parts = path.strip("/").split("/")
+        if len(parts) == 3 and parts[:2] == ["api", "post"]:
+            self.send_post_metadata(parts[2])
+            return
+        match = MEDIA_PATH.match(path)
+        if not match:
+            self.send_error(404)
+            return
+        self.send_media(int(match.group(1)), match.group(2))
+
+    def do_POST(self):
+        server = self.server.standin
+        server.delay()
+        length = int(self.headers.get("Content-Length") or 0)
+        form = parse_qs(self.rfile.read(length).decode("utf-8")) if length else {}
+        if urlsplit(self.path).path.rstrip("/") != "/graphql/query" or "doc_id" not in form:
+            self.send_error(404)
+            return
+        if not server.allow_request():
+            self.send_json(429, {"message": "Please wait a few minutes before you try again.", "status": "fail"},
+                           {"Retry-After": server.retry_after})
+            return
+        shortcode = json.loads(form.get("variables", ["{}"])[0]).get("shortcode", "")
+        node = server.post_node(shortcode, cdn_urls=bool(self.headers.get(ORIGINAL_HOST_HEADER)))
+        self.send_json(200, {
+            "data": {
+                "xdt_shortcode_media": node,
+                "xdt_api__v1__media__shortcode__web_info": {"items": [web_info_item(node)]}
+            },
+            "extensions": {},
+            "status": "ok"
+        })
+
+    def send_json(self, status: int, payload: dict, headers: dict = None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, str(value))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_post_metadata(self, shortcode: str):
+        server = self.server.standin
+        if not server.allow_request():
+            self.send_json(429, {"message": "Please wait a few minutes before you try again."},
+                           {"Retry-After": server.retry_after})
+            return
+        node = server.post_node(shortcode, cdn_urls=bool(self.headers.get(ORIGINAL_HOST_HEADER)))
+        edges = node["edge_media_to_caption"]["edges"]
+        self.send_json(200, {
+            "shortcode": shortcode,
+            "caption": edges[0]["node"]["text"] if edges else "",
+            "is_video": True,
+            "video_url": node["video_url"]
+        })
+
+    def send_media(self, size_kb: int, name: str):
+        server = self.server.standin
+        if server.url_ttl is not None:
+            expires = parse_qs(urlsplit(self.path).query).get("oe", [None])[0]
+            if expires and int(expires, 16) < time.time():
+                self.send_error(403, "URL signature expired")
+                return
+
+        size = size_kb * 1024
+        etag = f'"{size_kb}-{name}"'
+        start, end = 0, size
+
+        range_match = re.match(r"bytes=(\d+)-(\d*)$", self.headers.get("Range", ""))
+        if_range = self.headers.get("If-Range")
+        if range_match and (not if_range or if_range == etag):
+            start = int(range_match.group(1))
+            if range_match.group(2):
+                end = min(size, int(range_match.group(2)) + 1)
+            if start >= size:
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{size}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end - 1}/{size}")
+        else:
+            self.send_response(200)
+
+        self.send_header("Content-Type", "video/mp4")
+        self.send_header("Content-Length", str(end - start))
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("ETag", etag)
+        self.end_headers()
+
+        drop_at = server.drop_point(start, end)
+        self.write_payload(start, drop_at if drop_at is not None else end, seed=zlib.crc32(name.encode()))
+        if drop_at is not None:
+            # Close without sending the rest, like a reset connection
+            self.close_connection = True
+
+    def write_payload(self, start: int, end: int, seed: int = 0):
+        """Write bytes [start, end) of the payload for `seed`, paced to the server's bandwidth."""
+        server = self.server.standin
+        started = time.perf_counter()
+        position = start
+        while position < end:
+            offset = (position + seed) % len(_BLOCK)
+            piece = _BLOCK[offset:offset + min(len(_BLOCK) - offset, end - position, WRITE_PIECE)]
+            self.wfile.write(piece)
+            position += len(piece)
+            server.count("media_bytes", len(piece))
+            if server.bandwidth_kbps:
+                ahead = (position - start) / (server.bandwidth_kbps * 1024) - (time.perf_counter() - started)
+                if ahead > 0:
+                    time.sleep(ahead)
+
+
+class StandInServer:
+    """Runs the stand-in on a background thread. Usable as a context manager."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, handler=StandInHandler,
+                 throttle_rate: float = None, retry_after: float = 1, media_size_kb: int = 2048,
+                 bandwidth_kbps: float = None, latency: float = 0.0, drop_rate: float = 0.0,
+                 url_ttl: float = None, fixtures_dir=FIXTURES_DIR, seed: int = 0):
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self.httpd.standin = self
+        self.thread = None
+
+        self.media_size_kb = media_size_kb
+        self.bandwidth_kbps = bandwidth_kbps  # per connection, None = unlimited
+        self.latency = latency  # seconds before each response (+/- 50% jitter)
+        self.drop_rate = drop_rate  # share of media responses cut off mid-body
+        self.url_ttl = url_ttl  # media URLs expire after this many seconds (403)
+        self.fixtures = load_fixtures(fixtures_dir) if fixtures_dir else {}
+        self.random = random.Random(seed)
+
+        # Server-side token bucket for the metadata endpoints (None = never throttle)
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.tokens = 1.0
+        self.last_refill = time.monotonic()
+        self.lock = threading.Lock()
+        self.stats = {"requests": 0, "throttled": 0, "dropped": 0, "media_bytes": 0}
+
+    def count(self, name: str, amount: int = 1):
+        with self.lock:
+            self.stats[name] += amount
+
+    def allow_request(self) -> bool:
+        with self.lock:
+            self.stats["requests"] += 1
+            if not self.throttle_rate:
+                return True
+            now = time.monotonic()
+            self.tokens = min(1.0, self.tokens + (now - self.last_refill) * self.throttle_rate)
+            self.last_refill = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            self.stats["throttled"] += 1
+            return False
+
+    def delay(self):
+        if self.latency:
+            with self.lock:
+                jitter = self.random.uniform(0.5, 1.5)
+            time.sleep(self.latency * jitter)
+
+    def drop_point(self, start: int, end: int):
+        """Byte offset at which to cut this response off, or None to send it whole."""
+        with self.lock:
+            if end - start < 2 or self.random.random() >= self.drop_rate:
+                return None
+            self.stats["dropped"] += 1
+            return self.random.randrange(start + 1, end)
+
+    def post_node(self, shortcode: str, cdn_urls: bool = False) -> dict:
+        """The xdt_shortcode_media node for a shortcode: its fixture, or a synthesized reel."""
+        fixture = self.fixtures.get(shortcode, {})
+        node = json.loads(json.dumps(fixture.get("node", {})))
+        size_kb = fixture.get("media_kb", self.media_size_kb)
+        expires = int(time.time() + (self.url_ttl if self.url_ttl is not None else 86400))
+        base = "https://scontent.cdninstagram.com/v/t50" if cdn_urls else f"{self.url}/media"
+
+        node.setdefault("__typename", "XDTGraphVideo")
+        node.setdefault("id", str(zlib.crc32(shortcode.encode())))
+        node.setdefault("is_video", True)
+        node.setdefault("video_duration", 30.0)
+        node.setdefault("dimensions", {"height": 1920, "width": 1080})
+        node.setdefault("edge_media_to_caption", {"edges": [{"node": {"text": f"Stand-in caption for {shortcode}"}}]})
+        node.setdefault("owner", {"id": "1", "username": "standin"})
+        node["shortcode"] = shortcode
+        node["video_url"] = f"{base}/{size_kb}/{shortcode}.mp4?oe={expires:X}"
+        return node
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def media_url(self, size_kb: int, name: str = "reel") -> str:
+        return f"{self.url}/media/{size_kb}/{name}.mp4"
+
+    def post_url(self, shortcode: str) -> str:
+        return f"{self.url}/api/post/{shortcode}"
+
+    def get_stats(self) -> dict:
+        with self.lock:
+            return dict(self.stats)
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def is_instagram_host(url: str) -> bool:
+    host = urlsplit(url).hostname or ""
+    return any(host == domain or host.endswith("." + domain) for domain in INSTAGRAM_HOSTS)
+
+
+@contextmanager
+def route_instagram_to(standin_url: str):
+    """
+    While active, every requests.Session sends Instagram-host requests to the stand-in
+    (instaloader creates throwaway sessions per query, so this is applied to the class).
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    target = urlsplit(standin_url)
+
+    class StandInAdapter(HTTPAdapter):
+        def send(self, request, **kwargs):
+            original = urlsplit(request.url)
+            request.headers[ORIGINAL_HOST_HEADER] = original.hostname
+            request.url = original._replace(scheme=target.scheme, netloc=target.netloc).geturl()
+            return super().send(request, **kwargs)
+
+    adapter = StandInAdapter(pool_connections=16, pool_maxsize=16)
+    original_get_adapter = requests.Session.get_adapter
+
+    def get_adapter(session, url):
+        if is_instagram_host(url):
+            return adapter
+        return original_get_adapter(session, url)
+
+    requests.Session.get_adapter = get_adapter
+    try:
+        yield adapter
+    finally:
+        requests.Session.get_adapter = original_get_adapter
+        adapter.close()
@@ -2,6 +2,7 @@
 Easy Reels - Direct Batch Mode Launcher
 """
 import sys
+import multiprocessing
 from pathlib import Path
 
 # Add project root to path
@@ -21,4 +22,6 @@ def main():
         input("Press Enter to exit...")
 
 if __name__ == "__main__":
+    # Render pools use worker processes (needed for frozen Windows builds)
+    multiprocessing.freeze_support()
     main()
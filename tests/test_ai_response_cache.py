@@ -0,0 +1,52 @@
+"""
+Cached AI completions must expire after AI_CACHE_TTL_HOURS, and the least recently
+used ones must be dropped beyond AI_CACHE_MAX_ENTRIES.
+
+Run with: python -m pytest tests
+"""
+
+import time
+
+from easy_reels.core.ai_response_cache import AIResponseCache
+
+
+def age(cache: AIResponseCache, request_key: str, hours: float):
+    with cache.db.transaction() as conn:
+        conn.execute("UPDATE ai_responses SET created = created - ? WHERE request_key = ?",
+                     (hours * 3600, request_key))
+
+
+def test_expired_entry_is_a_miss(tmp_path, monkeypatch):
+    monkeypatch.setenv("AI_CACHE_TTL_HOURS", "1")
+    cache = AIResponseCache(str(tmp_path / "ai.sqlite3"))
+    cache.put("fresh", "fresh reply", latency=1.5)
+    cache.put("old", "old reply", latency=1.5)
+    age(cache, "old", hours=2)
+
+    assert cache.get("fresh") == "fresh reply"
+    assert cache.get("old") is None
+    stats = cache.get_stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+    assert stats["saved_seconds"] == 1.5
+
+
+def test_least_recently_used_entry_is_trimmed(tmp_path, monkeypatch):
+    monkeypatch.setenv("AI_CACHE_MAX_ENTRIES", "2")
+    cache = AIResponseCache(str(tmp_path / "ai.sqlite3"))
+    for request_key in ("a", "b"):
+        cache.put(request_key, f"reply {request_key}", latency=1.0)
+        time.sleep(0.01)
+    cache.get("a")
+    time.sleep(0.01)
+    cache.put("c", "reply c", latency=1.0)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "reply a"
+    assert cache.get("c") == "reply c"
+
+
+def test_bypass_never_reads_the_cache(tmp_path):
+    cache = AIResponseCache(str(tmp_path / "ai.sqlite3"))
+    cache.put("key", "reply", latency=1.0)
+    assert cache.get("key", bypass=True) is None
+    assert cache.get_stats()["bypassed"] == 1
@@ -0,0 +1,70 @@
+"""
+The async generation queue must keep at most `concurrency` requests in flight, give
+every job its own result, and record a failed generation instead of raising it into
+the batch thread.
+
+Run with: python -m pytest tests
+"""
+
+import threading
+import time
+
+import pytest
+
+from easy_reels.core import async_generation
+from easy_reels.core.async_generation import AsyncGenerationQueue
+from easy_reels.core.groq_key_pool import GroqKeyPool
+
+
+class SlowGenerator:
+    """Stands in for AIContentGenerator: each generation takes a while, 'boom' fails."""
+
+    def __init__(self, seconds: float = 0.05):
+        self.seconds = seconds
+        self.lock = threading.Lock()
+        self.calls = 0
+
+    def generate_complete_content(self, original_caption, ocr_text="", template_id=None,
+                                  combined_reply=None, bypass_cache=False):
+        with self.lock:
+            self.calls += 1
+        time.sleep(self.seconds)
+        if original_caption == "boom":
+            raise RuntimeError("generation failed")
+        return {'title': f"title for {original_caption}", 'caption': original_caption}
+
+
+@pytest.fixture(autouse=True)
+def no_api_keys(monkeypatch):
+    """Without keys the combined async request is skipped; the generator answers."""
+    monkeypatch.setattr(async_generation, "groq_key_pool", GroqKeyPool())
+
+
+def test_concurrency_is_capped():
+    generator = SlowGenerator()
+    with AsyncGenerationQueue(generator, concurrency=2) as queue:
+        results = queue.generate_all({i: {'original_caption': f"reel {i}"} for i in range(6)})
+        stats = queue.get_stats()
+
+    assert [results[i]['ai_content']['caption'] for i in range(6)] == [f"reel {i}" for i in range(6)]
+    assert stats["completed"] == 6 and stats["failed"] == 0
+    assert stats["max_in_flight"] == 2
+
+
+def test_submitting_a_key_again_reuses_its_request():
+    generator = SlowGenerator()
+    with AsyncGenerationQueue(generator, concurrency=2) as queue:
+        first = queue.submit("reel", "caption")
+        assert queue.submit("reel", "caption") is first
+        first.result()
+    assert generator.calls == 1
+
+
+def test_failed_generation_is_recorded():
+    with AsyncGenerationQueue(SlowGenerator(), concurrency=2) as queue:
+        queue.submit("ok", "caption")
+        queue.submit("bad", "boom")
+        assert queue.result("ok")['error'] is None
+        assert queue.result("bad")['error'] == "generation failed"
+        assert queue.result("never submitted") is None
+        assert queue.get_stats()["failed"] == 1
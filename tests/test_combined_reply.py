@@ -0,0 +1,37 @@
+"""
+The combined title + caption reply must be read however the model wraps the JSON,
+and a reply with only one of the two parts must not count as complete (it is not
+cached, and the missing part is asked for separately).
+
+Run with: python -m pytest tests
+"""
+
+from easy_reels.core.ai_content_generator import combined_reply_complete, parse_combined_reply
+
+
+def test_code_fences_are_ignored():
+    reply = '```json\n{"title": "Morning routine", "caption": "Start slow."}\n```'
+    assert parse_combined_reply(reply) == ("Morning routine", "Start slow.")
+
+
+def test_text_around_the_object_is_ignored():
+    reply = 'Sure! Here it is:\n{"title": "Morning routine", "caption": "Start slow."}\nEnjoy.'
+    assert parse_combined_reply(reply) == ("Morning routine", "Start slow.")
+
+
+def test_title_keeps_its_first_line_without_quotes():
+    reply = '{"title": "\\"Morning routine\\"\\nsecond line", "caption": "Start slow."}'
+    assert parse_combined_reply(reply) == ("Morning routine", "Start slow.")
+
+
+def test_only_one_field_present():
+    assert parse_combined_reply('{"title": "Morning routine"}') == ("Morning routine", None)
+    assert parse_combined_reply('{"caption": "Start slow.", "title": ""}') == (None, "Start slow.")
+    assert not combined_reply_complete('{"title": "Morning routine"}')
+    assert combined_reply_complete('{"title": "Morning routine", "caption": "Start slow."}')
+
+
+def test_unusable_reply():
+    assert parse_combined_reply("") == (None, None)
+    assert parse_combined_reply("no json here") == (None, None)
+    assert parse_combined_reply('["title", "caption"]') == (None, None)
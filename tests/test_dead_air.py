@@ -0,0 +1,43 @@
+"""
+Dead-air detection must find the live span between a black intro and a frozen outro
+from the small frames ffmpeg samples.
+
+Run with: python -m pytest tests
+"""
+
+import subprocess
+
+import cv2
+import numpy as np
+import pytest
+
+from easy_reels.core.video_processor import detect_dead_air, get_ffmpeg_exe
+
+FPS = 30
+
+
+def ffmpeg_available() -> bool:
+    try:
+        return subprocess.run([get_ffmpeg_exe(), "-version"], capture_output=True).returncode == 0
+    except OSError:
+        return False
+
+
+@pytest.mark.skipif(not ffmpeg_available(), reason="ffmpeg not available")
+def test_black_intro_and_frozen_outro_are_found(tmp_path):
+    path = str(tmp_path / "clip.mp4")
+    width, height = 180, 320
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), FPS, (width, height))
+    yy, xx = np.mgrid[0:height, 0:width]
+    frame = np.zeros((height, width, 3), np.uint8)
+    for i in range(8 * FPS):
+        if 1.5 * FPS <= i < 6 * FPS:  # moving between 1.5s and 6s, then frozen
+            frame = np.zeros((height, width, 3), np.uint8)
+            frame[..., 0] = (xx + i * 8) % 256
+            frame[..., 1] = (yy + i * 4) % 256
+        writer.write(frame)
+    writer.release()
+
+    live = detect_dead_air(path)
+    assert live['start'] == pytest.approx(1.5, abs=0.3)
+    assert live['end'] == pytest.approx(6.0, abs=0.3)
@@ -0,0 +1,101 @@
+"""
+The fan-out frame pipeline must encode every frame of the shared decode into each
+variant, and when one variant's worker fails (or the run is stopped) the whole
+pipeline must stop: no stage process left running and the shared frame ring released.
+
+Run with: python -m pytest tests
+"""
+
+import multiprocessing as mp
+import os
+import subprocess
+import threading
+
+import cv2
+import pytest
+
+from easy_reels.core import frame_pipeline
+from easy_reels.core.frame_pipeline import make_test_clip, render_variants_with_frame_pipeline
+from easy_reels.core.video_processor import SCREEN_SIZE, get_ffmpeg_exe
+
+FPS = 10
+SECONDS = 1
+
+
+def ffmpeg_available() -> bool:
+    try:
+        return subprocess.run([get_ffmpeg_exe(), "-version"], capture_output=True).returncode == 0
+    except OSError:
+        return False
+
+
+pytestmark = pytest.mark.skipif(not ffmpeg_available(), reason="ffmpeg not available")
+
+
+@pytest.fixture
+def clip(tmp_path):
+    return make_test_clip(str(tmp_path / "source.mp4"), seconds=SECONDS, size=(180, 320), fps=FPS)
+
+
+@pytest.fixture
+def shared_rings(monkeypatch):
+    """Names of the shared-memory rings the pipeline creates."""
+    names = []
+    original = frame_pipeline.shared_memory.SharedMemory
+
+    def tracking(*args, **kwargs):
+        shm = original(*args, **kwargs)
+        names.append(shm.name)
+        return shm
+
+    monkeypatch.setattr(frame_pipeline.shared_memory, "SharedMemory", tracking)
+    return names
+
+
+def frames_and_size(path: str):
+    cap = cv2.VideoCapture(path)
+    count = 0
+    while cap.read()[0]:
+        count += 1
+    size = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+    cap.release()
+    return count, size
+
+
+def test_two_variants_get_every_frame(clip, tmp_path):
+    variants = [{'output_path': str(tmp_path / f"variant_{i}.mp4")} for i in range(2)]
+
+    outputs = render_variants_with_frame_pipeline(clip, variants, {'preset': 'ultrafast', 'pipeline_slots': 3})
+
+    assert outputs == [v['output_path'] for v in variants]
+    for output in outputs:
+        assert frames_and_size(output) == (SECONDS * FPS, SCREEN_SIZE)
+
+
+def test_failed_worker_stops_the_pipeline(clip, tmp_path, shared_rings):
+    variants = [
+        {'output_path': str(tmp_path / "variant_ok.mp4")},
+        {'output_path': str(tmp_path / "missing_dir" / "variant_broken.mp4")},
+    ]
+
+    with pytest.raises(Exception, match="fan-out failed"):
+        render_variants_with_frame_pipeline(clip, variants, {'preset': 'ultrafast', 'pipeline_slots': 2})
+
+    assert not mp.active_children()
+    with pytest.raises(FileNotFoundError):
+        frame_pipeline.shared_memory.SharedMemory(name=shared_rings[0])
+
+
+def test_stop_terminates_the_workers(clip, tmp_path, shared_rings):
+    variants = [{'output_path': str(tmp_path / f"variant_{i}.mp4")} for i in range(2)]
+    stop_event = threading.Event()
+    stop_event.set()
+
+    with pytest.raises(Exception, match="fan-out stopped"):
+        render_variants_with_frame_pipeline(clip, variants, {'preset': 'ultrafast', 'pipeline_slots': 2},
+                                            stop_event=stop_event)
+
+    assert not mp.active_children()
+    assert not any(os.path.exists(v['output_path']) for v in variants)
+    with pytest.raises(FileNotFoundError):
+        frame_pipeline.shared_memory.SharedMemory(name=shared_rings[0])
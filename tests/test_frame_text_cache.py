@@ -0,0 +1,125 @@
+"""
+The OCR frame-text cache and within-video frame dedupe must never hand one caption's
+text to a frame showing another: two captions on the same background can have the
+same perceptual hash.
+
+Run with: python -m pytest tests
+"""
+
+import time
+
+import cv2
+import numpy as np
+import pytest
+
+from easy_reels.core import ocr_extractor
+from easy_reels.core.ocr_extractor import FRAME_DEDUPE_DISTANCE, FrameTextCache, OCRExtractor, same_text
+from easy_reels.core.video_fingerprint import hamming, phash
+
+from text_fixtures import background
+
+FRAME = (540, 960)  # width, height
+
+
+def captioned(text: str, noise_seed: int = None) -> np.ndarray:
+    """The same gradient background with an outlined caption; optional mild noise (compression)."""
+    frame = cv2.resize(background("gradient", np.random.default_rng(0)), FRAME)
+    letters = np.zeros(frame.shape[:2], np.uint8)
+    cv2.putText(letters, text, (40, 760), cv2.FONT_HERSHEY_DUPLEX, 1.1, 255, 2)
+    frame[cv2.dilate(letters, np.ones((5, 5), np.uint8)) > 0] = 0
+    frame[letters > 0] = 255
+    if noise_seed is not None:
+        noise = np.random.default_rng(noise_seed).integers(-6, 7, frame.shape)
+        frame = np.clip(frame.astype(int) + noise, 0, 255).astype(np.uint8)
+    return frame
+
+
+def region_images(frame: np.ndarray) -> list:
+    return OCRExtractor().prepare_frame(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY))[1]
+
+
+def write_video(path, frame: np.ndarray, count: int = 12) -> str:
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"mp4v"), 10, FRAME)
+    for _ in range(count):
+        writer.write(frame)
+    writer.release()
+    return str(path)
+
+
+def test_captions_with_equal_phash_are_kept_apart():
+    first, second = captioned("Follow for more"), captioned("POV: you forgot")
+    gray_first, gray_second = (cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) for frame in (first, second))
+    assert hamming(phash(gray_first), phash(gray_second)) == 0 <= FRAME_DEDUPE_DISTANCE
+
+    images_first, images_second = region_images(first), region_images(second)
+    assert images_first and images_second
+    assert FrameTextCache.key(images_first) != FrameTextCache.key(images_second)
+    assert not same_text(images_first, images_second)
+
+
+def test_one_changed_letter_is_different_text():
+    assert not same_text(region_images(captioned("Wait for the end")), region_images(captioned("Wait for the enc")))
+
+
+def test_noisy_copy_is_the_same_text():
+    assert same_text(region_images(captioned("Wait for the end")),
+                     region_images(captioned("Wait for the end", noise_seed=1)))
+
+
+def test_cache_answers_only_identical_regions(tmp_path):
+    cache = FrameTextCache(str(tmp_path / "frames.sqlite3"))
+    cache.put(FrameTextCache.key(region_images(captioned("Wait for the end"))), "Wait for the end")
+    assert cache.get(FrameTextCache.key(region_images(captioned("Wait for the end")))) == "Wait for the end"
+    assert cache.get(FrameTextCache.key(region_images(captioned("POV: you forgot")))) is None
+
+
+def test_cache_keeps_the_most_recently_used_entries(tmp_path, monkeypatch):
+    monkeypatch.setenv("OCR_CACHE_MAX_ENTRIES", "2")
+    cache = FrameTextCache(str(tmp_path / "frames.sqlite3"))
+    cache.put("first", "one")
+    time.sleep(0.01)
+    cache.put("second", "two")
+    time.sleep(0.01)
+    assert cache.get("first") == "one"  # now used more recently than "second"
+    time.sleep(0.01)
+    cache.put("third", "three")
+    assert [cache.get(key) for key in ("first", "second", "third")] == ["one", None, "three"]
+
+
+def test_cache_entries_expire(tmp_path, monkeypatch):
+    cache = FrameTextCache(str(tmp_path / "frames.sqlite3"))
+    cache.put("frame", "text")
+    monkeypatch.setenv("OCR_CACHE_TTL_HOURS", "0")
+    time.sleep(0.01)
+    assert cache.get("frame") is None
+    monkeypatch.delenv("OCR_CACHE_TTL_HOURS")
+    assert cache.get("frame") is None  # deleted, not just hidden
+
+
+@pytest.fixture
+def recording_ocr(tmp_path, monkeypatch):
+    """A fresh frame cache, and an OCR pool that returns one label per image it is asked to read."""
+    calls = []
+
+    def recognize_groups(groups):
+        calls.append(sum(len(images) for images in groups))
+        return [[f"reading {len(calls)}-{g}-{i}" for i in range(len(images))] for g, images in enumerate(groups)]
+
+    monkeypatch.setattr(ocr_extractor, "frame_text_cache", FrameTextCache(str(tmp_path / "frames.sqlite3")))
+    monkeypatch.setattr(ocr_extractor.ocr_pool, "recognize_groups", recognize_groups)
+    return calls
+
+
+def test_other_reel_with_same_background_is_read_again(tmp_path, recording_ocr):
+    # The two captions give frames with exactly the same pHash
+    extractor = OCRExtractor()
+    first = extractor.extract_text_from_frames(write_video(tmp_path / "a.mp4", captioned("Follow for more")), 6)
+    second = extractor.extract_text_from_frames(write_video(tmp_path / "b.mp4", captioned("POV: you forgot")), 6)
+
+    assert first['status'] == second['status'] == 'success'
+    assert second['cache_hits'] == 0 and second['frames_read'] == 1
+    assert second['text'] != first['text']
+
+    again = extractor.extract_text_from_frames(write_video(tmp_path / "c.mp4", captioned("Follow for more")), 6)
+    assert again['cache_hits'] == 1 and again['text'] == first['text']
+    assert sum(recording_ocr) == 2  # region images read: none for the third reel
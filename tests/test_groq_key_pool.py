@@ -0,0 +1,71 @@
+"""
+The key pool must route requests around a throttled or rejected key, and say how
+long to wait once every key is rate limited.
+
+Run with: python -m pytest tests
+"""
+
+import groq
+import httpx
+import pytest
+
+from easy_reels.core.groq_key_pool import AIKeyUnavailableError, GroqKeyPool
+from easy_reels.core.groq_retry import AIAuthError, AIRateLimitError
+
+REQUEST = httpx.Request("POST", "https://api.groq.com/openai/v1/chat/completions")
+
+
+def api_error(error_class, status: int, headers: dict = None):
+    response = httpx.Response(status, headers=headers or {}, request=REQUEST)
+    return error_class(f"status {status}", response=response, body=None)
+
+
+def pool_of(*key_ids) -> GroqKeyPool:
+    pool = GroqKeyPool()
+    pool.set_keys({key_id: {'name': key_id, 'key': f"gsk_{key_id}"} for key_id in key_ids})
+    return pool
+
+
+def test_requests_are_spread_over_idle_keys():
+    pool = pool_of("a", "b")
+    assert {pool.acquire()[0], pool.acquire()[0]} == {"a", "b"}
+
+
+def test_throttled_key_is_skipped_until_its_reset():
+    pool = pool_of("a", "b")
+    key_id, _ = pool.acquire()
+    error = pool.failed(key_id, api_error(groq.RateLimitError, 429, {"retry-after": "60"}))
+
+    # Another key is free, so the retry goes there at once
+    assert isinstance(error, AIKeyUnavailableError) and error.retry_after == 0.0
+    other = {"a": "b", "b": "a"}[key_id]
+    assert [pool.acquire()[0] for _ in range(3)] == [other] * 3
+
+
+def test_rejected_key_is_not_used_again():
+    pool = pool_of("a", "b")
+    pool.failed(pool.acquire()[0], api_error(groq.AuthenticationError, 401))
+    usage = {entry['id']: entry['status'] for entry in pool.get_usage()}
+    assert sorted(usage.values()) == ["invalid", "ok"]
+    valid = next(key_id for key_id, status in usage.items() if status == "ok")
+    assert pool.acquire()[0] == valid
+
+
+def test_all_keys_throttled():
+    pool = pool_of("a", "b")
+    for _ in range(2):
+        key_id, _ = pool.acquire()
+        error = pool.failed(key_id, api_error(groq.RateLimitError, 429, {"retry-after": "30"}))
+    # The last key had nowhere to send the retry: the throttle itself is returned
+    assert isinstance(error, AIRateLimitError) and not isinstance(error, AIKeyUnavailableError)
+
+    with pytest.raises(AIRateLimitError) as raised:
+        pool.acquire()
+    assert 25 < raised.value.retry_after <= 30
+
+
+def test_no_valid_key():
+    pool = pool_of("a")
+    pool.failed(pool.acquire()[0], api_error(groq.AuthenticationError, 401))
+    with pytest.raises(AIAuthError):
+        pool.acquire()
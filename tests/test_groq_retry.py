@@ -0,0 +1,83 @@
+"""
+Groq errors must be classified by whether a retry can help, waits must follow the
+server's rate-limit headers, and no retry may start that the request's time budget
+cannot fit.
+
+Run with: python -m pytest tests
+"""
+
+import time
+
+import groq
+import httpx
+import pytest
+
+from easy_reels.core.groq_retry import (
+    AIAuthError, AIRateLimitError, AIServerError, AITimeoutError, RetryPolicy,
+    classify_error, parse_reset, rate_limit_delay
+)
+
+REQUEST = httpx.Request("POST", "https://api.groq.com/openai/v1/chat/completions")
+
+
+def api_error(error_class, status: int, headers: dict = None):
+    response = httpx.Response(status, headers=headers or {}, request=REQUEST)
+    return error_class(f"status {status}", response=response, body=None)
+
+
+@pytest.mark.parametrize("value, seconds", [
+    ("7.66s", 7.66), ("2m59.56s", 179.56), ("850ms", 0.85), ("1h", 3600.0), ("3", 3.0),
+    (None, None), ("soon", None),
+])
+def test_parse_reset(value, seconds):
+    assert parse_reset(value) == (pytest.approx(seconds) if seconds is not None else None)
+
+
+def test_rate_limit_delay_uses_the_exhausted_quota():
+    assert rate_limit_delay({"retry-after": "4"}) == 4.0
+    assert rate_limit_delay({
+        "x-ratelimit-remaining-requests": "12", "x-ratelimit-reset-requests": "2s",
+        "x-ratelimit-remaining-tokens": "0", "x-ratelimit-reset-tokens": "7.5s",
+    }) == 7.5
+    assert rate_limit_delay({"x-ratelimit-remaining-requests": "3", "x-ratelimit-reset-requests": "2s"}) is None
+    assert rate_limit_delay(None) is None
+
+
+def test_classify_error():
+    throttled = classify_error(api_error(groq.RateLimitError, 429, {"retry-after": "2"}))
+    assert isinstance(throttled, AIRateLimitError) and throttled.retryable and throttled.retry_after == 2.0
+
+    invalid_key = classify_error(api_error(groq.AuthenticationError, 401))
+    assert isinstance(invalid_key, AIAuthError) and not invalid_key.retryable
+
+    server = classify_error(api_error(groq.InternalServerError, 503))
+    assert isinstance(server, AIServerError) and server.retryable and server.status == 503
+
+    timeout = classify_error(groq.APITimeoutError(request=REQUEST))
+    assert isinstance(timeout, AITimeoutError) and timeout.retryable
+
+
+def test_next_delay_stays_within_the_budget():
+    policy = RetryPolicy(max_attempts=5)
+    deadline = time.monotonic() + 10
+
+    assert 2.0 <= policy.next_delay(AIRateLimitError("429", 429, 2.0), 1, deadline) <= 2.5
+    assert 0.75 <= policy.next_delay(AIServerError("503", 503), 1, deadline) <= 1.25
+    # A wait that would leave no time for the attempt itself is not taken
+    assert policy.next_delay(AIRateLimitError("429", 429, 30.0), 1, deadline) is None
+    assert policy.next_delay(AIServerError("503", 503), 5, deadline) is None
+    assert policy.next_delay(AIAuthError("401", 401), 1, deadline) is None
+
+
+def test_call_raises_the_last_error_when_the_budget_is_spent():
+    policy = RetryPolicy(budget=2.0, max_attempts=5, base_backoff=0.1)
+    attempts = []
+
+    def request(timeout):
+        attempts.append(timeout)
+        raise api_error(groq.InternalServerError, 500)
+
+    with pytest.raises(AIServerError, match="budget"):
+        policy.call(request)
+    assert 1 < len(attempts) < 5
+    assert policy.get_stats()["failed"] == 1
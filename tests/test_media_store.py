@@ -0,0 +1,102 @@
+"""
+Eviction must never remove a stored reel that a job still uses: download_reel pins
+the file it hands out, and the job's remove_if_unmanaged releases it. Pins live in
+the shared index, so another process's eviction sees them. Importing the
+store and the other disk caches must not create any files.
+
+Run with: python -m pytest tests
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from easy_reels.core.media_store import MediaStore
+
+
+def download(tmp_path, name: str, size: int = 1024) -> str:
+    path = tmp_path / f"reel_{name}.mp4"
+    path.write_bytes(os.urandom(size))
+    return str(path)
+
+
+def test_pinned_file_is_not_evicted(tmp_path):
+    store = MediaStore(str(tmp_path / "media"), budget_mb=0)
+    queued = store.put("first", download(tmp_path, "first"), pin=True)
+    store.put("second", download(tmp_path, "second"))
+
+    assert os.path.exists(queued['video_path'])
+    assert store.get("first") is not None
+
+    store.remove_if_unmanaged(queued['video_path'])
+    store.put("third", download(tmp_path, "third"))
+    assert not os.path.exists(queued['video_path'])
+    assert store.get("first") is None
+
+
+def test_each_job_holds_its_own_pin(tmp_path):
+    store = MediaStore(str(tmp_path / "media"), budget_mb=0)
+    first_job = store.put("reel", download(tmp_path, "reel"), pin=True)
+    second_job = store.get("reel", pin=True)
+
+    store.remove_if_unmanaged(first_job['video_path'])
+    store.put("other", download(tmp_path, "other"))
+    assert os.path.exists(second_job['video_path'])
+
+    store.remove_if_unmanaged(second_job['video_path'])
+    store.put("another", download(tmp_path, "another"))
+    assert not os.path.exists(second_job['video_path'])
+
+
+def test_pin_is_seen_by_another_process(tmp_path):
+    store = MediaStore(str(tmp_path / "media"), budget_mb=0)
+    render_worker = MediaStore(str(tmp_path / "media"), budget_mb=0)
+    queued = store.put("first", download(tmp_path, "first"), pin=True)
+
+    render_worker.put("second", download(tmp_path, "second"))
+    assert os.path.exists(queued['video_path'])
+
+    store.remove_if_unmanaged(queued['video_path'])
+    render_worker.put("third", download(tmp_path, "third"))
+    assert not os.path.exists(queued['video_path'])
+
+
+def test_unreleased_pin_expires(tmp_path, monkeypatch):
+    monkeypatch.setenv("MEDIA_PIN_LEASE_HOURS", "0")
+    store = MediaStore(str(tmp_path / "media"), budget_mb=0)
+    crashed_job = store.put("first", download(tmp_path, "first"), pin=True)
+
+    store.put("second", download(tmp_path, "second"))
+    assert not os.path.exists(crashed_job['video_path'])
+
+
+def test_index_is_only_rewritten_on_a_change(tmp_path):
+    store = MediaStore(str(tmp_path / "media"))
+    store.put("reel", download(tmp_path, "reel"))
+    written = store.index_file.read_text()
+
+    assert store.get("reel") is not None
+    assert store.index_file.read_text() == written
+
+    store.flush()
+    assert store.index_file.read_text() != written
+
+
+def test_changes_from_another_process_are_merged(tmp_path):
+    store = MediaStore(str(tmp_path / "media"))
+    worker = MediaStore(str(tmp_path / "media"))
+    stored = store.put("reel", download(tmp_path, "reel"))
+    digest = worker.hash_for_path(stored['video_path'])
+
+    worker.put_artefact(digest, "probe", {"fps": 30})
+    assert store.cached_artefact(stored['video_path'], "probe", lambda: None) == {"fps": 30}
+
+
+def test_importing_the_caches_creates_no_files(tmp_path):
+    modules = ("media_store", "mezzanine_cache", "post_metadata_cache", "video_fingerprint",
+               "ai_response_cache", "ocr_extractor")
+    code = "; ".join(f"import easy_reels.core.{name}" for name in modules)
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([str(Path(__file__).parent.parent)] + sys.path))
+    subprocess.run([sys.executable, "-c", code], cwd=tmp_path, env=env, check=True, capture_output=True)
+    assert not list(tmp_path.iterdir())
@@ -0,0 +1,31 @@
+"""
+A mezzanine track is keyed by the content hash recorded when the job was first
+rendered, so it is found again after the download was evicted; without a track,
+a missing source must fail with a clear error instead of a new key.
+
+Run with: python -m pytest tests
+"""
+
+import hashlib
+
+import pytest
+
+from easy_reels.core.mezzanine_cache import MezzanineCache, content_hash_for
+
+
+def test_key_depends_on_content_and_trim_only(tmp_path):
+    source = tmp_path / "reel.mp4"
+    source.write_bytes(b"video bytes")
+    content_hash = content_hash_for(str(source))
+    assert content_hash == hashlib.sha256(b"video bytes").hexdigest()
+
+    options = {'max_duration': 30, 'trim_dead_air': True}
+    key = MezzanineCache.make_key(content_hash, options)
+    source.unlink()
+    assert MezzanineCache.make_key(content_hash, dict(options, output_path="other.mp4")) == key
+    assert MezzanineCache.make_key(content_hash, dict(options, max_duration=15)) != key
+
+
+def test_missing_source_fails_clearly(tmp_path):
+    with pytest.raises(FileNotFoundError, match="process the reel again"):
+        content_hash_for(str(tmp_path / "evicted.mp4"))
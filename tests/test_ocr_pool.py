@@ -0,0 +1,80 @@
+"""
+The Tesseract CLI backend of the OCR pool must start one process per frame, however
+many text regions the frame has, and still return each region's own text. With
+tesserocr and its language data installed, the pool's kept-loaded engines must read
+each region as well.
+
+Run with: python -m pytest tests
+"""
+
+import os
+import subprocess
+
+import cv2
+import numpy as np
+import pytest
+
+from easy_reels.core import ocr_pool as ocr_pool_module
+from easy_reels.core.ocr_pool import OCRWorkerPool
+
+TSV_HEADER = "level\tpage_num\tblock_num\tpar_num\tline_num\tword_num\tleft\ttop\twidth\theight\tconf\ttext"
+
+
+def region(label: str) -> np.ndarray:
+    image = np.full((40, 60 + 20 * len(label)), 255, np.uint8)
+    cv2.putText(image, label, (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.8, 0, 2)
+    return image
+
+
+@pytest.fixture
+def fake_tesseract(monkeypatch):
+    """
+    Stands in for the tesseract CLI: reports one TSV word per inked row band of the
+    image it is given ("line0", "line1", ... top to bottom), and records each call.
+    """
+    calls = []
+
+    def run(command, input=None, **kwargs):
+        calls.append(command)
+        image = cv2.imdecode(np.frombuffer(input, np.uint8), cv2.IMREAD_GRAYSCALE)
+        inked = (image < 128).any(axis=1)
+        rows, top = [TSV_HEADER], None
+        for y, ink in enumerate(list(inked) + [False]):
+            if ink and top is None:
+                top = y
+            elif not ink and top is not None:
+                line = len(rows)
+                rows.append(f"5\t1\t1\t1\t{line}\t1\t10\t{top}\t50\t{y - top}\t95\tline{line - 1}")
+                top = None
+        stdout = "\n".join(rows).encode() if "tsv" in command else b"line0\n"
+        return subprocess.CompletedProcess(command, 0, stdout=stdout, stderr=b"")
+
+    monkeypatch.setattr(ocr_pool_module.subprocess, "run", run)
+    return calls
+
+
+def test_one_cli_call_per_frame(fake_tesseract):
+    pool = OCRWorkerPool(workers=2)
+    pool.backend = "cli"
+    frames = [[region("top"), region("middle"), region("bottom")], [region("one")], []]
+
+    texts = pool.recognize_groups(frames)
+    pool.shutdown()
+
+    assert texts == [["line0", "line1", "line2"], ["line0"], []]
+    assert len(fake_tesseract) == 2
+    assert pool.get_stats()["images"] == 4
+
+
+def test_tessdata_prefix_is_used(tmp_path, monkeypatch):
+    monkeypatch.setenv("TESSDATA_PREFIX", str(tmp_path))
+    assert ocr_pool_module.tessdata_path() == os.path.join(str(tmp_path), "")
+
+
+@pytest.mark.skipif(not ocr_pool_module.tesserocr_ready("eng"), reason="tesserocr or its English data not installed")
+def test_tesserocr_backend_reads_each_region():
+    pool = OCRWorkerPool(workers=2)
+    assert pool.backend == "tesserocr"
+    texts = pool.recognize_groups([[region("HELLO"), region("WORLD")], [region("AGAIN")]])
+    pool.shutdown()
+    assert texts == [["HELLO", "WORLD"], ["AGAIN"]]
@@ -0,0 +1,56 @@
+"""
+The adaptive rate limiter against the local stand-in with throttling on.
+
+Run with: python -m pytest tests
+"""
+
+import json
+import urllib.error
+import urllib.request
+
+import instaloader
+import pytest
+from instaloader.exceptions import TooManyRequestsException
+
+from easy_reels.core.instagram_session import InstagramSession
+from easy_reels.core.rate_limiter import AdaptiveRateLimiter, throttle_signal
+from easy_reels.utils.standin_server import StandInServer, route_instagram_to
+
+
+def fetch(url):
+    with urllib.request.urlopen(url) as response:
+        return json.loads(response.read())
+
+
+def test_stand_in_429_is_a_throttle_signal_with_retry_after():
+    with StandInServer(throttle_rate=0.01, retry_after=2) as server:
+        fetch(server.post_url("SC0"))
+        with pytest.raises(urllib.error.HTTPError) as raised:
+            fetch(server.post_url("SC1"))
+    assert throttle_signal(raised.value) == (True, 2.0)
+
+
+def test_limiter_completes_a_throttled_batch():
+    requests_count = 12
+    with StandInServer(throttle_rate=4.0, retry_after=1) as server:
+        limiter = AdaptiveRateLimiter(name="stand-in", max_rate=20.0, burst=1, increase_step=0.5)
+        results = [limiter.call(fetch, server.post_url(f"SC{i}"), max_attempts=8)
+                   for i in range(requests_count)]
+        server_stats = server.get_stats()
+
+    stats = limiter.get_stats()
+    assert len(results) == requests_count
+    assert server_stats["throttled"] > 0
+    assert stats["throttled"] == server_stats["throttled"]
+    # Each throttle halved the rate, so it ends below the ceiling
+    assert stats["rate"] < stats["max_rate"]
+
+
+def test_instaloader_429_carries_retry_after():
+    with StandInServer(throttle_rate=0.01, retry_after=3) as server:
+        L = InstagramSession().create_loader()
+        L.context.sleep = False
+        with route_instagram_to(server.url), pytest.raises(TooManyRequestsException) as raised:
+            for i in range(5):
+                instaloader.Post.from_shortcode(L.context, f"SC{i}")
+    assert throttle_signal(raised.value) == (True, 3.0)
@@ -0,0 +1,45 @@
+"""
+The proxy preview and the final render share a video's crop and title assets from
+different threads: a render finishing must not delete a title image another render
+of the same video is still reading.
+
+Run with: python -m pytest tests
+"""
+
+import os
+
+import pytest
+
+from easy_reels.core.video_processor import VideoProcessor
+
+
+@pytest.fixture
+def processor(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return VideoProcessor()
+
+
+def test_title_image_outlives_the_first_release(processor):
+    processor.acquire_render_assets("reel.mp4")  # proxy preview
+    proxy = processor.prepare_render_assets("reel.mp4", "Old title", detect_crop=False)
+    processor.acquire_render_assets("reel.mp4")  # final render with an edited title
+    final = processor.prepare_render_assets("reel.mp4", "New title", detect_crop=False)
+    assert proxy['title_image'] != final['title_image']
+
+    processor.release_render_assets("reel.mp4")
+    assert os.path.exists(proxy['title_image']) and os.path.exists(final['title_image'])
+
+    processor.release_render_assets("reel.mp4", forget=False)
+    assert not os.path.exists(proxy['title_image']) and not os.path.exists(final['title_image'])
+    assert "reel.mp4" not in processor.render_assets
+
+
+def test_proxy_assets_are_kept_for_the_final_render(processor):
+    processor.acquire_render_assets("reel.mp4")
+    proxy = processor.prepare_render_assets("reel.mp4", "Title", detect_crop=False)
+    processor.release_render_assets("reel.mp4", forget=False)
+
+    processor.acquire_render_assets("reel.mp4")
+    assert processor.prepare_render_assets("reel.mp4", "Title", detect_crop=False) == proxy
+    processor.release_render_assets("reel.mp4")
+    assert not os.path.exists(proxy['title_image'])
@@ -0,0 +1,47 @@
+"""
+A reel claims its place in the run index when it is prepared; if its job then
+fails, the claim is released so a repost of it later in the same run is rendered
+instead of being skipped as a duplicate of a reel that never made it.
+
+Run with: python -m pytest tests
+"""
+
+from easy_reels.core import batch_pipeline, video_fingerprint
+from easy_reels.core.batch_pipeline import BatchPipeline
+from easy_reels.core.video_fingerprint import FingerprintIndex
+
+HASHES = [0x0F0F0F0F0F0F0F0F, 0x00FF00FF00FF00FF, 0x3333333333333333, 0x5555555555555555]
+
+
+def test_released_claim_is_no_longer_a_duplicate():
+    index = FingerprintIndex(path=None)
+    assert index.claim("first", HASHES) is None
+    assert index.claim("repost", HASHES)['key'] == "first"
+
+    index.release("first")
+    assert index.claim("repost", HASHES) is None
+    assert index.get_stats()['videos'] == 1
+
+
+class FailingGenerator:
+    def generate_complete_content(self, caption, ocr_text=None):
+        raise RuntimeError("AI generation failed")
+
+
+class FakeDownloader:
+    def download_reel(self, url):
+        return {'video_path': url, 'original_caption': "caption", 'original_title': ""}
+
+
+def test_failed_job_releases_its_claim(monkeypatch):
+    monkeypatch.setattr(batch_pipeline, "InstagramDownloader", FakeDownloader)
+    monkeypatch.setattr(batch_pipeline.media_store, "cached_artefact", lambda path, name, compute: {})
+    monkeypatch.setattr(video_fingerprint, "get_fingerprint", lambda path: list(HASHES))
+    monkeypatch.setattr(video_fingerprint.fingerprint_index, "find_duplicate", lambda hashes: None)
+
+    pipeline = BatchPipeline(FailingGenerator(), skip_duplicates=True)
+    first = pipeline.prepare_job(0, "https://www.instagram.com/reel/first/")
+    assert first['status'] == 'failed'
+
+    repost = pipeline.prepare_job(1, "https://www.instagram.com/reel/repost/", generate_ai=False)
+    assert repost['status'] == 'generating'
@@ -0,0 +1,37 @@
+"""
+Recall of the OCR text-presence check on the synthetic frames of
+tests/text_fixtures.py: skipping OCR must never drop a captioned frame.
+Retune LOOSE_CHAIN, MIN_STROKE_CONTRAST or the character filters in ocr_extractor
+against these tests.
+
+Run with: python -m pytest tests
+"""
+
+import cv2
+import pytest
+
+from easy_reels.core.ocr_extractor import text_likelihood
+
+from text_fixtures import synthetic_frames
+
+SEEDS = (7, 11)
+
+
+@pytest.fixture(scope="module")
+def checked_frames():
+    """(seed, background kind, caption or None, text_likelihood result) for 400 frames per seed."""
+    return [(seed, kind, caption, text_likelihood(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)))
+            for seed in SEEDS
+            for kind, caption, frame in synthetic_frames(400, seed)]
+
+
+def test_every_captioned_frame_keeps_ocr(checked_frames):
+    missed = [(seed, kind, caption, check) for seed, kind, caption, check in checked_frames
+              if caption and not check['likely']]
+    assert not missed
+
+
+def test_text_free_smooth_frames_skip_ocr(checked_frames):
+    kept = [(seed, kind, check) for seed, kind, caption, check in checked_frames
+            if not caption and kind in ("smooth", "gradient") and check['likely']]
+    assert not kept
@@ -0,0 +1,104 @@
+"""
+Synthetic reel frames for checking the OCR text-presence check (text_likelihood).
+
+Deterministic 1080x1920 frames on five kinds of background, half of them with a
+burned-in caption in one of the styles reels use: white text with a dark outline,
+dark text on a white box, and plain text. Plain text is drawn light on dark
+backgrounds and dark on light ones, and gets an outline on mid-gray ones - the check
+and Tesseract both work on grayscale, so text without luminance contrast is
+unreadable to OCR either way.
+
+Backgrounds:
+- smooth: blurred colour blobs (scenery without detail); text-free frames must be skipped
+- gradient: a vertical light ramp; text-free frames must be skipped
+- blocky: large pixelated noise (compression blocks)
+- noise: per-pixel noise (grain, foliage)
+- shapes: circles and lines of every size
+"""
+
+from typing import Iterator, Optional, Tuple
+
+import cv2
+import numpy as np
+
+FRAME_SIZE = (1080, 1920)  # width, height
+BACKGROUNDS = ("smooth", "gradient", "blocky", "noise", "shapes")
+CAPTION_STYLES = ("outlined", "boxed", "plain")
+FONTS = (cv2.FONT_HERSHEY_SIMPLEX, cv2.FONT_HERSHEY_DUPLEX,
+         cv2.FONT_HERSHEY_TRIPLEX, cv2.FONT_HERSHEY_COMPLEX)
+WORDS = ("top five hacks you never knew wait for the end follow for more "
+         "part two best moments pov when your friend says").split()
+
+
+def background(kind: str, rng: np.random.Generator) -> np.ndarray:
+    width, height = FRAME_SIZE
+    if kind == "smooth":
+        blobs = (rng.random((24, 14, 3)) * 255).astype(np.uint8)
+        return cv2.resize(blobs, (width, height))
+    if kind == "gradient":
+        ramp = np.linspace(0, 255, height).astype(np.uint8)[:, None, None]
+        return np.repeat(np.repeat(ramp, width, 1), 3, 2).copy()
+    if kind == "blocky":
+        blocks = (rng.random((192, 108, 3)) * 255).astype(np.uint8)
+        return cv2.resize(blocks, (width, height), interpolation=cv2.INTER_NEAREST)
+    if kind == "noise":
+        return (rng.random((height, width, 3)) * 255).astype(np.uint8)
+    frame = np.full((height, width, 3), rng.integers(0, 255, 3), np.uint8)
+    for _ in range(60):
+        color = tuple(int(v) for v in rng.integers(0, 255, 3))
+        if rng.random() < 0.5:
+            center = (int(rng.integers(0, width)), int(rng.integers(0, height)))
+            cv2.circle(frame, center, int(rng.integers(10, 200)), color, -1)
+        else:
+            start = (int(rng.integers(0, width)), int(rng.integers(0, height)))
+            end = (int(rng.integers(0, width)), int(rng.integers(0, height)))
+            cv2.line(frame, start, end, color, int(rng.integers(1, 15)))
+    return cv2.GaussianBlur(frame, (5, 5), 0)
+
+
+def add_caption(frame: np.ndarray, style: str, rng: np.random.Generator) -> str:
+    """Draw a random caption line on the frame (in place); returns its text."""
+    width, height = FRAME_SIZE
+    font = FONTS[rng.integers(0, len(FONTS))]
+    scale = float(rng.uniform(0.9, 3.0))
+    thickness = int(max(1, scale * 2))
+    text = " ".join(rng.choice(WORDS, int(rng.integers(2, 5))))
+    (text_width, text_height), _ = cv2.getTextSize(text, font, scale, thickness)
+    x = int(rng.integers(0, max(1, width - text_width)))
+    y = int(rng.integers(text_height + 10, height - 20))
+
+    area = frame[max(0, y - text_height):y + 1, x:x + text_width]
+    luminance = cv2.cvtColor(area, cv2.COLOR_BGR2GRAY).mean()
+    if style == "plain" and 80 < luminance < 175:
+        style = "outlined"  # plain text is only readable on a clearly dark or light background
+
+    if style == "boxed":
+        cv2.rectangle(frame, (x - 10, y - text_height - 10), (x + text_width + 10, y + 10), (255, 255, 255), -1)
+        cv2.putText(frame, text, (x, y), font, scale, (0, 0, 0), thickness)
+    elif style == "outlined":
+        # The outline grows the letters' mask (putText's thickness is not honoured by every OpenCV build)
+        letters = np.zeros(frame.shape[:2], np.uint8)
+        cv2.putText(letters, text, (x, y), font, scale, 255, thickness)
+        radius = max(2, int(scale * 2.5))
+        outline = cv2.dilate(letters, cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (2 * radius + 1, 2 * radius + 1)))
+        frame[outline > 0] = 0
+        frame[letters > 0] = 255
+    else:
+        light = ((255, 255, 255), (0, 230, 255))[rng.integers(0, 2)]  # white or yellow
+        cv2.putText(frame, text, (x, y), font, scale, light if luminance <= 80 else (0, 0, 0), thickness)
+    return text
+
+
+def synthetic_frames(count: int = 400, seed: int = 7) -> Iterator[Tuple[str, Optional[str], np.ndarray]]:
+    """
+    (background kind, caption or None, BGR frame) for `count` frames: backgrounds in
+    turn, alternating five without and five with a caption, caption styles in turn.
+    """
+    rng = np.random.default_rng(seed)
+    for i in range(count):
+        kind = BACKGROUNDS[i % len(BACKGROUNDS)]
+        frame = background(kind, rng)
+        caption = None
+        if (i // len(BACKGROUNDS)) % 2:
+            caption = add_caption(frame, CAPTION_STYLES[(i // (2 * len(BACKGROUNDS))) % len(CAPTION_STYLES)], rng)
+        yield kind, caption, frame